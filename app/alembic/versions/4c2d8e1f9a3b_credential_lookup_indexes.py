@@ -0,0 +1,32 @@
+# pylint: skip-file
+"""credential lookup indexes
+
+Revision ID: 4c2d8e1f9a3b
+Revises: b76214e4849d
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4c2d8e1f9a3b"
+down_revision = "b76214e4849d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("user_credential", sa.Column("credential_id_hash", sa.LargeBinary(length=32), nullable=True))
+    op.execute("UPDATE user_credential SET credential_id_hash = sha256(credential_id)")
+    op.alter_column("user_credential", "credential_id_hash", nullable=False)
+    op.create_index(
+        op.f("ix_user_credential_credential_id_hash"), "user_credential", ["credential_id_hash"], unique=True
+    )
+    op.create_index(op.f("ix_user_credential_user_id"), "user_credential", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_credential_user_id"), table_name="user_credential")
+    op.drop_index(op.f("ix_user_credential_credential_id_hash"), table_name="user_credential")
+    op.drop_column("user_credential", "credential_id_hash")
@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Dict
+from typing import Set
+
+from fastapi import Request
+from fastapi import Response
+from starlette import status
+
+from app.core import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip is always available
+    brotli = None
+
+
+def accepted_encodings(accept_encoding: str) -> Set[str]:
+    """Content codings of an ``Accept-Encoding`` header that are not refused with a zero or malformed q-value."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """File loaded and precompressed once, served without file I/O per request."""
+
+    body: bytes
+    media_type: str
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, media_type: str) -> "StaticAsset":
+        """Read and precompress a file."""
+        body = path.read_bytes()
+        encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body, quality=11)
+        return cls(body=body, media_type=media_type, etag=hashlib.sha256(body).hexdigest()[:32], encoded=encoded)
+
+    def _etag(self, encoding: str = "") -> str:
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+    def _not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return any(self._etag(encoding) in tags for encoding in ("", *self.encoded))
+
+    def _negotiate(self, request: Request) -> str:
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        return next((encoding for encoding in ("br", "gzip") if encoding in self.encoded and encoding in accepted), "")
+
+    def response(self, request: Request) -> Response:
+        """Build a response honouring ``If-None-Match`` and ``Accept-Encoding``."""
+        encoding = self._negotiate(request)
+        headers = {
+            "ETag": self._etag(encoding),
+            "Cache-Control": f"public, max-age={settings.STATIC_ASSETS_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if self._not_modified(request):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(self.encoded[encoding], media_type=self.media_type, headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
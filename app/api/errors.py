@@ -23,6 +23,13 @@ class InvalidTokenException(BasicException):
     detail: str = "Invalid token - signature verification failed"
 
 
+class PermissionDeniedException(BasicException):
+    """Permission Denied Exception"""
+
+    status_code: status = status.HTTP_403_FORBIDDEN
+    detail: str = "Not enough permissions"
+
+
 class InvalidCredentialException(BasicException):
     """Invalid Credential Exception"""
 
@@ -30,6 +37,20 @@ class InvalidCredentialException(BasicException):
     detail: str = "Invalid or not found credential"
 
 
+class SignCountException(BasicException):
+    """Sign Count Exception"""
+
+    status_code: status = status.HTTP_401_UNAUTHORIZED
+    detail: str = "Sign count did not increase, the credential may be cloned or replayed"
+
+
+class InvalidRefreshTokenException(BasicException):
+    """Invalid Refresh Token Exception"""
+
+    status_code: status = status.HTTP_401_UNAUTHORIZED
+    detail: str = "Refresh token is invalid, expired or already used"
+
+
 class UserAlreadyExistsException(BasicException):
     """User Already Exists Exception"""
 
@@ -42,3 +63,39 @@ class UserCredentialsNotFound(BasicException):
 
     status_code: status = status.HTTP_404_NOT_FOUND
     detail: str = "User credentials not configured or not found"
+
+
+class InvalidChallengeException(BasicException):
+    """Invalid Challenge Exception"""
+
+    status_code: status = status.HTTP_400_BAD_REQUEST
+    detail: str = "Challenge expired, already used or not requested"
+
+
+class InvalidAssertionException(BasicException):
+    """Invalid Assertion Exception"""
+
+    status_code: status = status.HTTP_401_UNAUTHORIZED
+    detail: str = "Assertion could not be verified"
+
+
+class ServiceBusyException(BasicException):
+    """Service Busy Exception"""
+
+    status_code: status = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail: str = "Service is busy, try again later"
+
+    def __init__(self, detail: Optional[str] = None, status_code: Optional[status] = None, retry_after: int = 1):
+        super().__init__(detail=detail, status_code=status_code)
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+class RateLimitedException(BasicException):
+    """Rate Limited Exception"""
+
+    status_code: status = status.HTTP_429_TOO_MANY_REQUESTS
+    detail: str = "Too many requests, try again later"
+
+    def __init__(self, detail: Optional[str] = None, status_code: Optional[status] = None, retry_after: int = 1):
+        super().__init__(detail=detail, status_code=status_code)
+        self.headers = {"Retry-After": str(retry_after)}
@@ -0,0 +1,50 @@
+from typing import List
+from typing import Optional
+
+from pydantic import BaseModel  # pylint: disable=no-name-in-module
+
+
+class ImportRowError(BaseModel):
+    """Schema for a rejected import row"""
+
+    line: int
+    username: Optional[str]
+    error: str
+
+
+class ImportReportSchema(BaseModel):
+    """Schema for an import report"""
+
+    class Config:
+        """Config for import report schema"""
+
+        title = "ImportReport"
+
+    processed: int
+    created: int
+    conflicts: List[ImportRowError]
+    invalid: List[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class TransferRowError(BaseModel):
+    """Schema for a rejected credential transfer record"""
+
+    id: Optional[str]
+    error: str
+
+
+class TransferReportSchema(BaseModel):
+    """Schema for a credential import report"""
+
+    class Config:
+        """Config for credential import report schema"""
+
+        title = "TransferReport"
+
+    processed: int
+    upserted: int
+    invalid: List[TransferRowError]
+    elapsed_seconds: float
+    rows_per_second: float
@@ -45,6 +45,13 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: Optional[str]
+
+
+class RefreshTokenSchema(BaseModel):
+    """Schema for a refresh token"""
+
+    refresh_token: str
 
 
 class MessageResponse(BaseModel):
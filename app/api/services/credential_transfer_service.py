@@ -0,0 +1,247 @@
+import base64
+import io
+import json
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import AsyncIterable
+from typing import AsyncIterator
+from typing import Dict
+from typing import List
+from typing import Union
+from uuid import UUID
+
+import cbor2
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.services.user_import_service import iter_lines
+from app.core import settings
+from app.db.dialects import greatest
+from app.db.dialects import upsert
+from app.models import User
+from app.models import UserCredential
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CBOR_SEQ_MEDIA_TYPE = "application/cbor-seq"
+EXPORTED_COLUMNS = ("id", "user_id", "credential_id", "public_key", "sign_count")
+BINARY_COLUMNS = ("credential_id", "public_key")
+
+
+@dataclass
+class TransferReport:
+    """Outcome of a credential import."""
+
+    processed: int = 0
+    upserted: int = 0
+    invalid: List[Dict[str, Any]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the report as a dictionary."""
+        return {
+            "processed": self.processed,
+            "upserted": self.upserted,
+            "invalid": self.invalid,
+            "elapsed_seconds": self.elapsed_seconds,
+            "rows_per_second": self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0,
+        }
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def _binary(value: Union[bytes, str]) -> bytes:
+    """Binary field of a record, raw in CBOR and base64url in NDJSON."""
+    if isinstance(value, str):
+        return base64.urlsafe_b64decode(value)
+    if not isinstance(value, bytes):
+        raise TypeError(f"Expected bytes or a base64url string, got {type(value).__name__}")
+    return value
+
+
+async def encode_ndjson(records: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode records as NDJSON with base64url binary fields."""
+    async for record in records:
+        record = {**record, **{column: _b64encode(record[column]) for column in BINARY_COLUMNS}}
+        yield json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+async def encode_cbor(records: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode records as a CBOR sequence (RFC 8742)."""
+    async for record in records:
+        yield cbor2.dumps(record)
+
+
+async def decode_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Decode NDJSON records, yielding the error in place of a line that is not valid JSON."""
+    async for line in iter_lines(chunks):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield exc
+
+
+async def decode_cbor(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Decode a CBOR sequence, buffering only the current incomplete item.
+
+    A malformed or truncated item ends the sequence, as the following items cannot be located, and is yielded as
+    the error in place of a record.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        while buffer:
+            stream = io.BytesIO(buffer)
+            try:
+                record = cbor2.CBORDecoder(stream).decode()
+            except cbor2.CBORDecodeEOF:
+                break
+            except cbor2.CBORDecodeError as exc:
+                yield exc
+                return
+            consumed = stream.tell()
+            buffer = buffer[consumed:]
+            yield record
+    if buffer:
+        yield ValueError("Truncated CBOR sequence")
+
+
+ENCODERS = {"ndjson": (encode_ndjson, NDJSON_MEDIA_TYPE), "cbor": (encode_cbor, CBOR_SEQ_MEDIA_TYPE)}
+DECODERS = {"ndjson": decode_ndjson, "cbor": decode_cbor}
+
+
+class CredentialTransferService:
+    """Stream credentials out of and into the database in constant memory."""
+
+    @staticmethod
+    async def export_records(
+        db: AsyncSession, batch_size: int = settings.CREDENTIAL_TRANSFER_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every credential, fetched ``batch_size`` rows at a time through a server-side cursor."""
+        statement = (
+            select(*(getattr(UserCredential, column) for column in EXPORTED_COLUMNS))
+            .order_by(UserCredential.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream(statement)
+        async for partition in result.partitions(batch_size):
+            for row in partition:
+                yield {
+                    "id": str(row.id),
+                    "user_id": str(row.user_id),
+                    "credential_id": row.credential_id,
+                    "public_key": row.public_key,
+                    "sign_count": row.sign_count or 0,
+                }
+
+    @staticmethod
+    def _validate(record: Any) -> Dict[str, Any]:
+        """Return the columns of a decoded record, raising ``ValueError`` or ``TypeError`` when it is malformed."""
+        if isinstance(record, ValueError):
+            raise record
+        if not isinstance(record, dict):
+            raise TypeError(f"Expected a record, got {type(record).__name__}")
+        try:
+            return {
+                "id": UUID(str(record["id"])),
+                "user_id": UUID(str(record["user_id"])),
+                "credential_id": _binary(record["credential_id"]),
+                "public_key": _binary(record["public_key"]),
+                "sign_count": int(record.get("sign_count") or 0),
+            }
+        except KeyError as exc:
+            raise ValueError(f"Missing field {exc}") from exc
+
+    @staticmethod
+    async def _upsert_batch(db: AsyncSession, batch: List[Dict[str, Any]], report: TransferReport) -> None:
+        """Upsert a batch keyed on the credential ID digest, reporting records that conflict with other credentials.
+
+        Credentials of unknown users are skipped, as are records whose credential is owned by another user or whose
+        id is taken by another credential, in the database or earlier in the batch.
+        """
+        for record in batch:
+            record["credential_id_hash"] = UserCredential.hash_credential_id(record["credential_id"])
+        user_ids = {record["user_id"] for record in batch}
+        existing_user_ids = set((await db.scalars(select(User.id).where(User.id.in_(user_ids)))).all())
+        existing = await db.execute(
+            select(UserCredential.id, UserCredential.user_id, UserCredential.credential_id_hash).where(
+                or_(
+                    UserCredential.credential_id_hash.in_({record["credential_id_hash"] for record in batch}),
+                    UserCredential.id.in_({record["id"] for record in batch}),
+                )
+            )
+        )
+        owners: Dict[bytes, UUID] = {}
+        hashes: Dict[UUID, bytes] = {}
+        for row in existing:
+            owners[row.credential_id_hash] = row.user_id
+            hashes[row.id] = row.credential_id_hash
+
+        # A statement may not update a row twice, so a credential repeated within the batch is merged into its first
+        # record, keeping the greatest sign count as an upsert in a later batch would.
+        rows: Dict[bytes, Dict[str, Any]] = {}
+        for record in batch:
+            credential_id_hash = record["credential_id_hash"]
+            if record["user_id"] not in existing_user_ids:
+                error = "User does not exist"
+            elif owners.get(credential_id_hash, record["user_id"]) != record["user_id"]:
+                error = "Credential belongs to another user"
+            elif hashes.get(record["id"], credential_id_hash) != credential_id_hash:
+                error = "Id belongs to another credential"
+            elif credential_id_hash in rows:
+                row = rows[credential_id_hash]
+                row["sign_count"] = max(row["sign_count"], record["sign_count"])
+                continue
+            else:
+                owners[credential_id_hash], hashes[record["id"]] = record["user_id"], credential_id_hash
+                rows[credential_id_hash] = record
+                continue
+            report.invalid.append({"id": str(record["id"]), "error": error})
+
+        if rows:
+            statement = upsert(db, UserCredential).values(list(rows.values()))
+            statement = statement.on_conflict_do_update(
+                index_elements=[UserCredential.credential_id_hash],
+                set_={"sign_count": greatest(UserCredential.sign_count, statement.excluded.sign_count)},
+            )
+            await db.execute(statement)
+            await db.commit()
+            report.upserted += len(rows)
+
+    async def import_records(
+        self,
+        db: AsyncSession,
+        records: AsyncIterable[Any],
+        batch_size: int = settings.CREDENTIAL_TRANSFER_BATCH_SIZE,
+    ) -> TransferReport:
+        """Import credentials with batched upserts.
+
+        Importing the same export twice is a no-op, sign counts only ever move forward. Malformed records are reported
+        without aborting the import.
+        """
+        report = TransferReport()
+        batch: List[Dict[str, Any]] = []
+        async for record in records:
+            report.processed += 1
+            try:
+                batch.append(self._validate(record))
+            except (TypeError, ValueError) as exc:
+                record_id = record.get("id") if isinstance(record, dict) else None
+                report.invalid.append({"id": None if record_id is None else str(record_id), "error": str(exc)})
+            if len(batch) >= batch_size:
+                await self._upsert_batch(db, batch, report)
+                batch.clear()
+
+        if batch:
+            await self._upsert_batch(db, batch, report)
+        report.elapsed_seconds = time.perf_counter() - report.started_at
+        return report
+
+
+credential_transfer_service = CredentialTransferService()
@@ -0,0 +1,120 @@
+import secrets
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Optional
+from typing import Tuple
+
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.errors import InvalidRefreshTokenException
+from app.core import settings
+from app.models import RefreshToken
+from app.models import User
+
+
+class RefreshTokenService:
+    """Issue and rotate opaque, single-use refresh tokens."""
+
+    def __init__(self, lifetime: timedelta):
+        self.lifetime = lifetime
+
+    def _add(self, db: AsyncSession, user_id: uuid.UUID, family_id: uuid.UUID, now: datetime) -> str:
+        """Add a new refresh token to the session and return its opaque value."""
+        token = secrets.token_urlsafe(32)
+        db.add(
+            RefreshToken(
+                user_id=user_id,
+                family_id=family_id,
+                token_hash=RefreshToken.hash_token(token),
+                created_at=now,
+                expires_at=now + self.lifetime,
+            )
+        )
+        return token
+
+    async def issue(self, db: AsyncSession, user: User) -> str:
+        """Start a new token family for a fresh login."""
+        token = self._add(db, user.id, uuid.uuid4(), datetime.now(timezone.utc))
+        await db.commit()
+        return token
+
+    async def rotate(self, db: AsyncSession, token: str) -> Tuple[User, str]:
+        """Consume a refresh token and return its user together with the successor token.
+
+        Consuming is a single conditional update on the token digest, so two concurrent refreshes cannot both win.
+        A token that was already consumed revokes its whole family.
+        """
+        now = datetime.now(timezone.utc)
+        token_hash = RefreshToken.hash_token(token)
+        # Core statement, as the ORM cannot return the username subquery. The username is selected in RETURNING since
+        # SQLite cannot return columns of the table joined by an UPDATE ... FROM.
+        username = select(User.username).where(User.id == RefreshToken.user_id).scalar_subquery()
+        consumed = (
+            await db.execute(
+                update(RefreshToken.__table__)  # pylint: disable=no-member
+                .where(
+                    RefreshToken.token_hash == token_hash,
+                    RefreshToken.used_at.is_(None),
+                    RefreshToken.revoked_at.is_(None),
+                    RefreshToken.expires_at > now,
+                )
+                .values(used_at=now)
+                .returning(RefreshToken.family_id, RefreshToken.user_id, username.label("username"))
+            )
+        ).one_or_none()
+        if consumed is None:
+            await self._detect_reuse(db, token_hash, now)
+            raise InvalidRefreshTokenException
+
+        successor = self._add(db, consumed.user_id, consumed.family_id, now)
+        await db.commit()
+        return User(id=consumed.user_id, username=consumed.username), successor
+
+    async def _detect_reuse(self, db: AsyncSession, token_hash: bytes, now: datetime) -> None:
+        """Revoke the family of a token that is presented again after it was consumed."""
+        family_id: Optional[uuid.UUID] = await db.scalar(
+            select(RefreshToken.family_id).where(
+                RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_not(None)
+            )
+        )
+        if family_id is None:
+            await db.rollback()
+            return
+        await self._revoke_family_id(db, family_id, now)
+
+    async def revoke_family(self, db: AsyncSession, token: str) -> None:
+        """Revoke every token descending from the same login as ``token``."""
+        family_id = await db.scalar(
+            select(RefreshToken.family_id).where(RefreshToken.token_hash == RefreshToken.hash_token(token))
+        )
+        if family_id is None:
+            raise InvalidRefreshTokenException
+        await self._revoke_family_id(db, family_id, datetime.now(timezone.utc))
+
+    async def revoke_user(self, db: AsyncSession, user_id: uuid.UUID) -> None:
+        """Revoke the not yet revoked tokens of every login of a user."""
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    @staticmethod
+    async def _revoke_family_id(db: AsyncSession, family_id: uuid.UUID, now: datetime) -> None:
+        """Revoke the not yet revoked tokens of a family."""
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+refresh_token_service = RefreshTokenService(lifetime=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
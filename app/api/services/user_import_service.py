@@ -0,0 +1,156 @@
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import AsyncIterable
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.auth import NewUser
+from app.core import settings
+from app.core.auth import AuthBase
+from app.db.dialects import upsert
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImportReport:
+    """Progress and outcome of a bulk user import."""
+
+    processed: int = 0
+    created: int = 0
+    conflicts: List[Dict[str, Any]] = field(default_factory=list)
+    invalid: List[Dict[str, Any]] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Import throughput."""
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the report as a dictionary."""
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "conflicts": self.conflicts,
+            "invalid": self.invalid,
+            "elapsed_seconds": self.elapsed_seconds,
+            "rows_per_second": self.rows_per_second,
+        }
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks into lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+class UserImportService(AuthBase):
+    """Bulk user import from NDJSON records in the ``NewUser`` shape."""
+
+    @staticmethod
+    def _parse(line_number: int, line: bytes, report: ImportReport) -> Optional[NewUser]:
+        try:
+            return NewUser(**json.loads(line))
+        except (ValueError, TypeError, ValidationError) as exc:
+            report.invalid.append({"line": line_number, "error": str(exc)})
+            return None
+
+    async def _insert_batch(self, db: AsyncSession, batch: List[Tuple[int, NewUser]], report: ImportReport) -> None:
+        """Hash the batch on the worker pool and insert it with a single multi-row statement."""
+        hashed_passwords = await self.hashing_engine.hash_many([new_user.password for _, new_user in batch])
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "username": new_user.username,
+                "email": new_user.email,
+                "hashed_password": hashed_password,
+                "first_name": new_user.first_name,
+                "last_name": new_user.last_name,
+                "is_active": True,
+                "is_superuser": False,
+            }
+            for (_, new_user), hashed_password in zip(batch, hashed_passwords)
+        ]
+        # Rows are matched back to their lines by the generated id, so a record conflicting with an earlier line of the
+        # same batch is reported as well, not only those conflicting with existing users.
+        created = set(
+            (await db.execute(upsert(db, User).values(rows).on_conflict_do_nothing().returning(User.id))).scalars()
+        )
+        await db.commit()
+
+        report.created += len(created)
+        for (line_number, new_user), row in zip(batch, rows):
+            if row["id"] not in created:
+                report.conflicts.append(
+                    {"line": line_number, "username": new_user.username, "error": "Username or email already exists"}
+                )
+
+    async def import_users(
+        self,
+        db: AsyncSession,
+        lines: AsyncIterable[bytes],
+        batch_size: int = settings.USER_IMPORT_BATCH_SIZE,
+        on_progress: Optional[Callable[[ImportReport], None]] = None,
+    ) -> ImportReport:
+        """Import users streamed as NDJSON lines.
+
+        Invalid records and rows conflicting with existing users are reported per line without aborting the batch.
+        """
+        report = ImportReport()
+        batch: List[Tuple[int, NewUser]] = []
+        line_number = 0
+
+        async def flush() -> None:
+            await self._insert_batch(db, batch, report)
+            batch.clear()
+            report.elapsed_seconds = time.perf_counter() - report.started_at
+            logger.info(
+                "Imported %s users (%s created, %s conflicts, %s invalid), %.0f rows/s",
+                report.processed,
+                report.created,
+                len(report.conflicts),
+                len(report.invalid),
+                report.rows_per_second,
+            )
+            if on_progress is not None:
+                on_progress(report)
+
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            report.processed += 1
+            new_user = self._parse(line_number, line, report)
+            if new_user is not None:
+                batch.append((line_number, new_user))
+            if len(batch) >= batch_size:
+                await flush()
+
+        if batch:
+            await flush()
+        report.elapsed_seconds = time.perf_counter() - report.started_at
+        return report
+
+
+user_import_service = UserImportService()
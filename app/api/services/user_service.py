@@ -1,31 +1,58 @@
+from typing import Any
 from typing import Dict
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.errors import InvalidTokenException
 from app.core.auth import AuthBase
+from app.core.recent_writes import recent_writes
+from app.core.user_cache import user_cache
 from app.models import User
 
 
 class UserService(AuthBase):
     """User service."""
 
-    def _get_password_hash(self, password: str) -> str:
+    async def _get_password_hash(self, password: str) -> str:
         """Get password hash."""
-        return self.crypt_context.hash(password)
+        return await self.hashing_engine.hash(password)
 
-    def create_user(self, db: Session, user_data: Dict[str, str]) -> User:
+    async def create_user(self, db: AsyncSession, user_data: Dict[str, str]) -> User:
         """Create user."""
         user: User = User(
             username=user_data["username"],
             email=user_data["email"],
-            hashed_password=self._get_password_hash(user_data["password"]),
+            hashed_password=await self._get_password_hash(user_data["password"]),
             first_name=user_data["first_name"],
             last_name=user_data["last_name"],
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        await user_cache.invalidate(user.id)
+        await recent_writes.mark(user.id)
         return user
 
+    async def update_user(self, db: AsyncSession, user: User, changes: Dict[str, Any]) -> User:
+        """Update user.
+
+        Users served from the identity cache are transient copies, so the row is loaded by id and changed instead.
+        """
+        stored = await db.get(User, user.id)
+        if stored is None:
+            raise InvalidTokenException
+        for field, value in changes.items():
+            if field == "password":
+                field, value = "hashed_password", await self._get_password_hash(value)
+            setattr(stored, field, value)
+        await db.commit()
+        await db.refresh(stored)
+        await user_cache.invalidate(stored.id)
+        return stored
+
+    async def deactivate_user(self, db: AsyncSession, user: User) -> User:
+        """Deactivate user."""
+        return await self.update_user(db, user, {"is_active": False})
+
 
 user_service = UserService()
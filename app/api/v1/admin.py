@@ -0,0 +1,65 @@
+from typing import Literal
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.api.schemas.admin import ImportReportSchema
+from app.api.schemas.admin import TransferReportSchema
+from app.api.services.credential_transfer_service import CBOR_SEQ_MEDIA_TYPE
+from app.api.services.credential_transfer_service import DECODERS
+from app.api.services.credential_transfer_service import ENCODERS
+from app.api.services.credential_transfer_service import NDJSON_MEDIA_TYPE
+from app.api.services.credential_transfer_service import credential_transfer_service
+from app.api.services.user_import_service import iter_lines
+from app.api.services.user_import_service import user_import_service
+from app.dependencies.auth_db import get_db
+from app.dependencies.auth_token import get_current_superuser
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_current_superuser)])
+
+
+@router.post(
+    "/users/import",
+    response_model=ImportReportSchema,
+    status_code=status.HTTP_200_OK,
+    summary="Bulk import users",
+    openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}}},
+)
+async def import_users(request: Request, db: AsyncSession = Depends(get_db)):
+    """Import users from an NDJSON request body with one ``NewUser`` record per line."""
+    report = await user_import_service.import_users(db, iter_lines(request.stream()))
+    return report.as_dict()
+
+
+@router.get(
+    "/credentials/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export credentials",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, CBOR_SEQ_MEDIA_TYPE: {}}}},
+)
+async def export_credentials(output_format: Literal["ndjson", "cbor"] = "ndjson", db: AsyncSession = Depends(get_db)):
+    """Stream every credential as NDJSON or as a CBOR sequence."""
+    encode, media_type = ENCODERS[output_format]
+    return StreamingResponse(encode(credential_transfer_service.export_records(db)), media_type=media_type)
+
+
+@router.post(
+    "/credentials/import",
+    response_model=TransferReportSchema,
+    status_code=status.HTTP_200_OK,
+    summary="Import credentials",
+    openapi_extra={
+        "requestBody": {"content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}, CBOR_SEQ_MEDIA_TYPE: {}}}
+    },
+)
+async def import_credentials(request: Request, db: AsyncSession = Depends(get_db)):
+    """Import credentials from an export, upserting on the credential ID."""
+    input_format = "cbor" if request.headers.get("content-type", "").startswith(CBOR_SEQ_MEDIA_TYPE) else "ndjson"
+    records = DECODERS[input_format](request.stream())
+    report = await credential_transfer_service.import_records(db, records)
+    return report.as_dict()
@@ -1,32 +1,47 @@
+from typing import Any
 from typing import Dict
 
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from app.api.common import FastJSONResponse
 from app.api.errors import UserAlreadyExistsException
 from app.api.schemas.auth import MessageResponse
 from app.api.schemas.auth import NewUser
 from app.api.schemas.auth import PydanticUser
+from app.api.schemas.auth import RefreshTokenSchema
 from app.api.schemas.auth import Token
 from app.api.schemas.auth import UserLoginSchema
+from app.api.services.refresh_token_service import refresh_token_service
 from app.api.services.user_service import user_service
 from app.core.auth import user_auth
 from app.dependencies.auth_db import get_db
 from app.dependencies.auth_token import get_current_user
+from app.dependencies.auth_token import get_token_claims
+from app.dependencies.rate_limit import limit_login
+from app.dependencies.rate_limit import limit_signup
 from app.models import User
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/signup", response_model=MessageResponse, status_code=status.HTTP_201_CREATED, summary="Sign up")
-async def sign_up(new_user: NewUser, db: Session = Depends(get_db)) -> Dict[str, str]:
+@router.post(
+    "/signup",
+    response_model=MessageResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Sign up",
+    # Route dependencies run before the endpoint's own, so throttled requests never reach hashing or the database.
+    dependencies=[Depends(limit_signup)],
+    responses={status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Too many requests, try again later"}},
+)
+async def sign_up(new_user: NewUser, db: AsyncSession = Depends(get_db)) -> Dict[str, str]:
     """Sign up a new user."""
     try:
-        user_service.create_user(db, new_user.dict())
+        await user_service.create_user(db, new_user.dict())
     except IntegrityError as e:
         raise UserAlreadyExistsException from e
     return {"message": "Created user successfully!"}
@@ -37,22 +52,84 @@ async def sign_up(new_user: NewUser, db: Session = Depends(get_db)) -> Dict[str,
     response_model=Token,
     status_code=status.HTTP_200_OK,
     summary="Login",
+    dependencies=[Depends(limit_login)],
     responses={
         status.HTTP_400_BAD_REQUEST: {"description": "Incorrect username or password"},
+        status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Too many requests, try again later"},
     },
 )
-async def login(form_data: UserLoginSchema, db: Session = Depends(get_db)):
+async def login(form_data: UserLoginSchema, db: AsyncSession = Depends(get_db)):
     """Login user."""
-    user: User = user_auth.authenticate_user(db, form_data.username, form_data.password)
+    user: User = await user_auth.authenticate_user(db, form_data.username, form_data.password)
     if user:
         access_token = user_auth.create_access_token(user=user)
-        return {"access_token": access_token, "token_type": "bearer"}
+        refresh_token = await refresh_token_service.issue(db, user)
+        return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username or password")
 
 
+@router.post(
+    "/refresh",
+    response_model=Token,
+    status_code=status.HTTP_200_OK,
+    summary="Refresh access token",
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {"description": "Refresh token is invalid, expired or already used"},
+    },
+)
+async def refresh(body: RefreshTokenSchema, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a new refresh token."""
+    user, refresh_token = await refresh_token_service.rotate(db, body.refresh_token)
+    access_token = user_auth.create_access_token(user=user)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post(
+    "/refresh/revoke",
+    response_model=MessageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Revoke refresh tokens",
+)
+async def revoke_refresh_tokens(body: RefreshTokenSchema, db: AsyncSession = Depends(get_db)) -> Dict[str, str]:
+    """Revoke the refresh token and every token rotated from the same login."""
+    await refresh_token_service.revoke_family(db, body.refresh_token)
+    return {"message": "Refresh tokens revoked successfully!"}
+
+
+@router.post(
+    "/logout",
+    response_model=MessageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Logout",
+)
+async def logout(
+    claims: Dict[str, Any] = Depends(get_token_claims), db: AsyncSession = Depends(get_db)
+) -> Dict[str, str]:
+    """Revoke the access token of the request."""
+    current_user = await user_auth.retrieve_token_user(db, claims)
+    await user_auth.revocation_list.revoke(db, current_user.id, claims)
+    return {"message": "Logged out successfully!"}
+
+
+@router.post(
+    "/logout/all",
+    response_model=MessageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Logout everywhere",
+)
+async def logout_everywhere(
+    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+) -> Dict[str, str]:
+    """Revoke every access token and refresh token issued to the user so far."""
+    await refresh_token_service.revoke_user(db, current_user.id)
+    await user_auth.revocation_list.revoke_all(db, current_user.id)
+    return {"message": "Logged out everywhere successfully!"}
+
+
 @router.get("/me", response_model=PydanticUser, status_code=status.HTTP_200_OK, summary="User information.")
 async def get_current_user_information(
     current_user: User = Depends(get_current_user),
-) -> User:
+) -> FastJSONResponse:
     """Get current user information."""
-    return current_user
+    # The user row is already validated by the database, so it is serialized directly instead of through the model.
+    return FastJSONResponse({field: getattr(current_user, field) for field in PydanticUser.__fields__})
@@ -1,4 +1,3 @@
-import base64
 from pathlib import Path
 from typing import List
 
@@ -7,8 +6,12 @@ from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Request
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
+from starlette.concurrency import run_in_threadpool
+from webauthn.authentication.verify_authentication_response import VerifiedAuthentication
+from webauthn.helpers import bytes_to_base64url
+from webauthn.helpers.exceptions import InvalidAuthenticationResponse
 from webauthn.helpers.structs import AuthenticatorAttachment
 from webauthn.helpers.structs import AuthenticatorSelectionCriteria
 from webauthn.helpers.structs import AuthenticatorTransport
@@ -19,38 +22,78 @@ from webauthn.helpers.structs import ResidentKeyRequirement
 from webauthn.helpers.structs import UserVerificationRequirement
 from webauthn.registration.verify_registration_response import VerifiedRegistration
 
+from app.api.assets import StaticAsset
 from app.api.common import CustomAuthenticationCredential
 from app.api.common import CustomRegistrationCredential
 from app.api.common import JavascriptResponse
+from app.api.common import WebAuthnOptionsResponse
+from app.api.errors import InvalidAssertionException
+from app.api.errors import InvalidChallengeException
 from app.api.schemas.auth import MessageResponse
+from app.api.schemas.auth import Token
+from app.api.services.refresh_token_service import refresh_token_service
 from app.core import settings
+from app.core.auth import user_auth
+from app.core.challenge_store import challenge_store
+from app.core.credential_keys import assertion_challenge
+from app.core.credential_keys import credential_key_cache
+from app.core.credential_keys import verify_authentication_response
+from app.core.metrics import timed
 from app.dependencies.auth_db import get_db
 from app.dependencies.auth_token import get_current_user
 from app.dependencies.authn import get_current_user_credential
 from app.dependencies.authn import get_current_user_credentials
+from app.dependencies.authn import get_passkey_credential
+from app.dependencies.rate_limit import limit_passkey_login
 from app.models import User
 from app.models import UserCredential
 
 router = APIRouter(prefix="/authn", tags=["authn"])
 
+RESOURCES_DIR = Path(__file__).parent / "resources"
+index_html = StaticAsset.load(RESOURCES_DIR / "authn_html.html", HTMLResponse.media_type)
+client_javascript = StaticAsset.load(RESOURCES_DIR / "webauthn_client.js", JavascriptResponse.media_type)
+
+
+async def verify_assertion(
+    credential: CustomAuthenticationCredential,
+    user_credential: UserCredential,
+    expected_challenge: bytes,
+    require_user_verification: bool = False,
+) -> VerifiedAuthentication:
+    """Verify an assertion against the credential's cached public key."""
+    public_key = credential_key_cache.get(user_credential.credential_id_hash, user_credential.public_key)
+    with timed("webauthn_verify_authentication"):
+        try:
+            # cryptography releases the GIL while verifying, so the signature check runs in the threadpool.
+            return await run_in_threadpool(
+                verify_authentication_response,
+                credential=credential,
+                expected_challenge=expected_challenge,
+                expected_rp_id=settings.RP_ID,
+                expected_origin=settings.EXPECTED_ORIGIN,
+                credential_public_key=public_key,
+                credential_current_sign_count=user_credential.sign_count,
+                require_user_verification=require_user_verification,
+            )
+        except InvalidAuthenticationResponse as exc:
+            raise InvalidAssertionException from exc
+
 
 @router.get("/", response_class=HTMLResponse)
-async def index():
+async def index(request: Request):
     """Index."""
-    with open("app/api/v1/resources/authn_html.html", "r", encoding="utf8") as f:
-        html_string = f.read()
-        return html_string
+    return index_html.response(request)
 
 
 @router.get("/webauthn_client.js", response_class=JavascriptResponse)
-async def client_js():
+async def client_js(request: Request):
     """Client JS."""
-    return Path("app/api/v1/resources/webauthn_client.js").read_bytes()
+    return client_javascript.response(request)
 
 
 @router.get("/register/public_key", response_model=PublicKeyCredentialCreationOptions, status_code=status.HTTP_200_OK)
 async def get_user_register_public_key(
-    request: Request,
     user: User = Depends(get_current_user),
 ):
     """Get user public key."""
@@ -62,37 +105,40 @@ async def get_user_register_public_key(
         user_display_name=user.username,
         authenticator_selection=AuthenticatorSelectionCriteria(
             authenticator_attachment=AuthenticatorAttachment.CROSS_PLATFORM,
-            resident_key=ResidentKeyRequirement.DISCOURAGED,
+            # Discoverable credentials also sign in without a username, see /authn/passkey.
+            resident_key=ResidentKeyRequirement.PREFERRED,
             user_verification=UserVerificationRequirement.DISCOURAGED,
         ),
     )
-    request.session["webauthn_register_challenge"] = base64.b64encode(public_key.challenge).decode()
-    return public_key
+    await challenge_store.save("register", str(user.id), public_key.challenge)
+    return WebAuthnOptionsResponse(public_key)
 
 
 @router.post("/register", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_user_credential(
-    request: Request,
     credential: CustomRegistrationCredential,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create user credential."""
-    expected_challenge = base64.b64decode(request.session["webauthn_register_challenge"].encode())
-    registration: VerifiedRegistration = webauthn.verify_registration_response(
-        credential=credential,
-        expected_challenge=expected_challenge,
-        expected_rp_id=settings.RP_ID,
-        expected_origin=settings.EXPECTED_ORIGIN,
-    )
-    UserCredential.create_credential(db, user, registration)
+    expected_challenge = await challenge_store.consume("register", str(user.id))
+    if expected_challenge is None:
+        raise InvalidChallengeException
+    with timed("webauthn_verify_registration"):
+        registration: VerifiedRegistration = await run_in_threadpool(
+            webauthn.verify_registration_response,
+            credential=credential,
+            expected_challenge=expected_challenge,
+            expected_rp_id=settings.RP_ID,
+            expected_origin=settings.EXPECTED_ORIGIN,
+        )
+    await UserCredential.create_credential(db, user, registration)
     return {"message": "User credential created"}
 
 
 @router.get("/auth/public_key", response_model=PublicKeyCredentialRequestOptions, status_code=status.HTTP_200_OK)
 async def get_user_auth_credential(
-    request: Request,
-    user: User = Depends(get_current_user),  # pylint: disable=unused-argument
+    user: User = Depends(get_current_user),
     user_credentials: List[UserCredential] = Depends(get_current_user_credentials),
 ):
     """Get user auth credential."""
@@ -106,27 +152,68 @@ async def get_user_auth_credential(
         ],
         user_verification=UserVerificationRequirement.DISCOURAGED,
     )
-    request.session["webauthn_auth_challenge"] = base64.b64encode(public_key.challenge).decode()
-    return public_key
+    await challenge_store.save("auth", str(user.id), public_key.challenge)
+    return WebAuthnOptionsResponse(public_key)
 
 
 @router.post("/auth", response_model=MessageResponse, status_code=status.HTTP_200_OK)
 async def auth_post(
-    request: Request,
     credential: CustomAuthenticationCredential,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),  # pylint: disable=unused-argument
+    db: AsyncSession = Depends(get_db),
     user_credential: UserCredential = Depends(get_current_user_credential),
 ):
     """Auth post."""
-    expected_challenge = base64.b64decode(request.session["webauthn_auth_challenge"].encode())
-    auth = webauthn.verify_authentication_response(
-        credential=credential,
-        expected_challenge=expected_challenge,
-        expected_rp_id=settings.RP_ID,
-        expected_origin=settings.EXPECTED_ORIGIN,
-        credential_public_key=user_credential.public_key,
-        credential_current_sign_count=user_credential.sign_count,
-    )
-    user_credential.update_sign_count(db, auth.new_sign_count)
+    expected_challenge = await challenge_store.consume("auth", str(user_credential.user_id))
+    if expected_challenge is None:
+        raise InvalidChallengeException
+    auth = await verify_assertion(credential, user_credential, expected_challenge)
+    await user_credential.update_sign_count(db, auth.new_sign_count)
     return {"message": "OK"}
+
+
+@router.get(
+    "/passkey/public_key",
+    response_model=PublicKeyCredentialRequestOptions,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_passkey_login)],
+    responses={status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Too many requests, try again later"}},
+)
+async def get_passkey_public_key():
+    """Get passkey login options, the authenticator picks one of its discoverable credentials for the RP."""
+    public_key = webauthn.generate_authentication_options(
+        rp_id=settings.RP_ID,
+        user_verification=UserVerificationRequirement.REQUIRED,
+    )
+    # No user is known yet, so the challenge is stored under itself and found again through the client data.
+    await challenge_store.save("passkey", bytes_to_base64url(public_key.challenge), public_key.challenge)
+    return WebAuthnOptionsResponse(public_key)
+
+
+@router.post(
+    "/passkey",
+    response_model=Token,
+    status_code=status.HTTP_200_OK,
+    summary="Login with a passkey",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Challenge expired, already used or not requested"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Assertion could not be verified"},
+        status.HTTP_404_NOT_FOUND: {"description": "Invalid or not found credential"},
+    },
+)
+async def passkey_login(
+    credential: CustomAuthenticationCredential,
+    db: AsyncSession = Depends(get_db),
+    user_credential: UserCredential = Depends(get_passkey_credential),
+):
+    """Login with a user verifying passkey instead of a username and password."""
+    challenge = assertion_challenge(credential)
+    expected_challenge = await challenge_store.consume("passkey", bytes_to_base64url(challenge)) if challenge else None
+    if expected_challenge is None:
+        raise InvalidChallengeException
+    auth = await verify_assertion(credential, user_credential, expected_challenge, require_user_verification=True)
+    # Copied before the sign count commit expires the loaded user, reading it afterwards would reload it on the loop.
+    user = User(id=user_credential.user.id, username=user_credential.user.username)
+    await user_credential.update_sign_count(db, auth.new_sign_count)
+    access_token = user_auth.create_access_token(user=user)
+    refresh_token = await refresh_token_service.issue(db, user)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
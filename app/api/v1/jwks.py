@@ -0,0 +1,23 @@
+import json
+import math
+
+from fastapi import APIRouter
+from fastapi import Response
+
+from app.core import settings
+from app.core.auth import user_auth
+
+router = APIRouter(prefix="/.well-known", tags=["keys"])
+
+
+@router.get("/jwks.json", summary="Token verification keys")
+def jwks() -> Response:
+    """Publish the public token keys, so other services can verify access tokens locally."""
+    key_ring = user_auth.key_ring
+    # Never let caches hold the key set past the next scheduled rotation.
+    max_age = math.ceil(min(settings.JWKS_MAX_AGE, key_ring.next_change() - key_ring.clock()))
+    return Response(
+        content=json.dumps(key_ring.jwks(), separators=(",", ":")),
+        media_type="application/jwk-set+json",
+        headers={"Cache-Control": f"public, max-age={max_age}"},
+    )
@@ -43,7 +43,7 @@ async function createPublicKey(publicKey, type = 'create') {
 }
 
 async function fidoPost(path, creds, expectedStatus = 201) {
-    const {attestationObject, clientDataJSON, signature, authenticatorData} = creds.response
+    const {attestationObject, clientDataJSON, signature, authenticatorData, userHandle} = creds.response
     const data = {
         id: creds.id,
         rawId: asBase64(creds.rawId),
@@ -56,6 +56,9 @@ async function fidoPost(path, creds, expectedStatus = 201) {
         data.response.signature = asBase64(signature)
         data.response.authenticatorData = asBase64(authenticatorData)
     }
+    if (userHandle) {
+        data.response.userHandle = asBase64(userHandle)
+    }
     const r2 = await fetch(`/${apiPrefix}/${path}`, {
         method: 'POST',
         body: JSON.stringify(data),
@@ -64,6 +67,7 @@ async function fidoPost(path, creds, expectedStatus = 201) {
     if (r2.status !== expectedStatus) {
         error(`Unexpected response ${r2.status}: ${await r2.text()}`)
     }
+    return await r2.json()
 }
 
 async function fidoRegister() {
@@ -88,6 +92,17 @@ async function fidoAuthenticate() {
     log('authentication successful')
 }
 
+async function passkeyLogin() {
+    const publicKey = await getPublicKey('authn/passkey/public_key')
+    console.log('passkey get response:', publicKey)
+    publicKey.challenge = asArrayBuffer(publicKey.challenge)
+    let creds = await createPublicKey(publicKey, 'get')
+    const response = await fidoPost('authn/passkey', creds, 200)
+    userToken = response.access_token
+    document.getElementById('authn').style.display = 'block'
+    log('passkey login successful')
+}
+
 async function authRequest(path, data, expectedStatus = 200) {
     const response = await fetch(`/${apiPrefix}/${path}`, {
         method: 'POST',
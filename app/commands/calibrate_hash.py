@@ -0,0 +1,25 @@
+"""Pick the password hash cost that meets a target latency on this host.
+
+Usage: python -m app.commands.calibrate_hash [--scheme sha256_crypt] [--target-ms 250] [--memory-cost 65536]
+
+Prints the matching settings, to be added to the environment of the hosts that run the app.
+"""
+import argparse
+
+from app.core import settings
+from app.core.hashing import calibrate_profile
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the password hash cost for a target latency.")
+    parser.add_argument("--scheme", default=settings.PASSWORD_HASH_SCHEME, help="passlib scheme, e.g. bcrypt or argon2")
+    parser.add_argument("--target-ms", type=float, default=250, help="target time to hash one password")
+    parser.add_argument("--memory-cost", type=int, default=settings.PASSWORD_HASH_MEMORY_COST, help="argon2 KiB")
+    parser.add_argument("--samples", type=int, default=3, help="hashes measured per candidate cost")
+    args = parser.parse_args()
+
+    profile, elapsed = calibrate_profile(args.scheme, args.target_ms / 1000, args.memory_cost, args.samples)
+    print(f"# {elapsed * 1000:.0f} ms per hash on this host")
+    print(f"PASSWORD_HASH_SCHEME={profile.scheme}")
+    print(f"PASSWORD_HASH_ROUNDS={profile.rounds}")
+    if profile.memory_cost:
+        print(f"PASSWORD_HASH_MEMORY_COST={profile.memory_cost}")
@@ -0,0 +1,77 @@
+"""Export or import user credentials as NDJSON or as a CBOR sequence.
+
+Usage:
+    python -m app.commands.credentials export [--format ndjson|cbor] [--output credentials.ndjson]
+    python -m app.commands.credentials import credentials.ndjson [--format ndjson|cbor]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from typing import BinaryIO
+
+from app.api.services.credential_transfer_service import DECODERS
+from app.api.services.credential_transfer_service import ENCODERS
+from app.api.services.credential_transfer_service import credential_transfer_service
+from app.core import settings
+from app.dependencies.auth_db import get_db
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def read_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    """Yield a file in fixed-size chunks."""
+    while chunk := file.read(CHUNK_SIZE):
+        yield chunk
+
+
+async def export_credentials(output: BinaryIO, output_format: str, batch_size: int) -> int:
+    """Write every credential to ``output`` and return the number of records."""
+    encode, _ = ENCODERS[output_format]
+    exported = 0
+    async with asynccontextmanager(get_db)() as db:
+        async for chunk in encode(credential_transfer_service.export_records(db, batch_size)):
+            output.write(chunk)
+            exported += 1
+    output.flush()
+    return exported
+
+
+async def import_credentials(file: BinaryIO, input_format: str, batch_size: int) -> dict:
+    """Import the credentials in ``file`` and return the report."""
+    async with asynccontextmanager(get_db)() as db:
+        report = await credential_transfer_service.import_records(
+            db, DECODERS[input_format](read_chunks(file)), batch_size
+        )
+    return report.as_dict()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import user credentials.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="stream every credential to a file or stdout")
+    export_parser.add_argument("--output", default="-", help="output file, or - for stdout")
+    import_parser = subparsers.add_parser("import", help="upsert credentials from an export")
+    import_parser.add_argument("path", help="export file, or - for stdin")
+    for subparser in (export_parser, import_parser):
+        subparser.add_argument("--format", choices=sorted(ENCODERS), default="ndjson")
+        subparser.add_argument("--batch-size", type=int, default=settings.CREDENTIAL_TRANSFER_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        if args.output == "-":
+            count = asyncio.run(export_credentials(sys.stdout.buffer, args.format, args.batch_size))
+        else:
+            with open(args.output, "wb") as output_file:
+                count = asyncio.run(export_credentials(output_file, args.format, args.batch_size))
+        print(f"{count} credentials exported", file=sys.stderr)
+    else:
+        if args.path == "-":
+            result = asyncio.run(import_credentials(sys.stdin.buffer, args.format, args.batch_size))
+        else:
+            with open(args.path, "rb") as input_file:
+                result = asyncio.run(import_credentials(input_file, args.format, args.batch_size))
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
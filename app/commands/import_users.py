@@ -0,0 +1,54 @@
+"""Bulk import users from an NDJSON file.
+
+Usage: python -m app.commands.import_users users.ndjson [--batch-size 1000]
+"""
+import argparse
+import asyncio
+import json
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from typing import BinaryIO
+
+from app.api.services.user_import_service import ImportReport
+from app.api.services.user_import_service import user_import_service
+from app.core import settings
+from app.core.hashing import hashing_engine
+from app.dependencies.auth_db import get_db
+
+
+async def read_lines(file: BinaryIO) -> AsyncIterator[bytes]:
+    """Yield the lines of a file."""
+    for line in file:
+        yield line
+
+
+def print_progress(report: ImportReport) -> None:
+    """Print import progress to stderr."""
+    print(
+        f"{report.processed} processed, {report.created} created, {len(report.conflicts)} conflicts, "
+        f"{len(report.invalid)} invalid, {report.rows_per_second:.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+async def main(path: str, batch_size: int) -> ImportReport:
+    """Import the users and return the report."""
+    async with asynccontextmanager(get_db)() as db:
+        if path == "-":
+            return await user_import_service.import_users(db, read_lines(sys.stdin.buffer), batch_size, print_progress)
+        with open(path, "rb") as file:
+            return await user_import_service.import_users(db, read_lines(file), batch_size, print_progress)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users from NDJSON records in the NewUser shape.")
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument("--batch-size", type=int, default=settings.USER_IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    try:
+        result = asyncio.run(main(args.path, args.batch_size))
+    finally:
+        hashing_engine.shutdown()
+    json.dump(result.as_dict(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -1,88 +1,178 @@
+import hashlib
+import hmac
+import uuid
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
 from typing import Any
 from typing import Dict
 from typing import Optional
 from typing import Union
+from uuid import UUID
 
-from jose import JWTError
-from jose import jwt
-from jwt import DecodeError
-from jwt import ExpiredSignatureError
-from jwt import InvalidAudienceError
-from jwt import InvalidIssuerError
-from jwt import InvalidSignatureError
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+import jwt
+from sqlalchemy import ColumnElement
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.errors import InvalidTokenException
+from app.core import hashing
+from app.core import keys
+from app.core import revocation
 from app.core import settings
+from app.core.cache import TTLCache
+from app.core.keys import KeyRing
+from app.core.metrics import timed
+from app.core.revocation import RevocationList
+from app.core.user_cache import user_cache
+from app.db.routing import read_your_writes
 from app.models.user import User
 
 
 class AuthBase:
     """Base class for authentication."""
 
-    crypt_context = CryptContext(schemes=["sha256_crypt", "md5_crypt"])
+    crypt_context = hashing.crypt_context
+    hashing_engine = hashing.hashing_engine
 
 
 class TokenHandler:
     """Token handler."""
 
-    @staticmethod
+    token_cache: TTLCache[bytes, Dict[str, Any]] = TTLCache(
+        maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS
+    )
+    key_ring: KeyRing = keys.key_ring
+    revocation_list: RevocationList = revocation.revocation_list
+
+    @classmethod
+    def _token_cache_key(cls, access_token: str) -> bytes:
+        """Digest of the token keyed with the key ring fingerprint, so a key change never hits old entries."""
+        return hmac.new(cls.key_ring.fingerprint, access_token.encode(), hashlib.sha256).digest()
+
+    @classmethod
     def create_access_token(
+        cls,
         user: User,
         expires_delta: timedelta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     ) -> str:
-        """Create access token."""
-        to_encode: Dict[str, Union[str, int, Dict[str, str]]] = {
+        """Create access token.
+
+        ``iat`` keeps fractional seconds, so a logout everywhere revokes exactly the tokens issued before it.
+        """
+        now = datetime.now(timezone.utc)
+        to_encode: Dict[str, Union[str, int, float, Dict[str, str]]] = {
             "sub": user.username,
-            "exp": int((datetime.utcnow() + expires_delta).timestamp()),
+            "uid": str(user.id),
+            "jti": str(uuid.uuid4()),
+            "exp": int((now + expires_delta).timestamp()),
             "iss": settings.ISSUER,
             "aud": settings.AUDIENCE,
-            "iat": int(datetime.utcnow().timestamp()),
+            "iat": now.timestamp(),
         }
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        key = cls.key_ring.signing_key()
+        with timed("jwt_encode"):
+            encoded_jwt = jwt.encode(
+                to_encode, key.signing_key, algorithm=key.algorithm, headers={"kid": key.kid} if key.kid else None
+            )
         return encoded_jwt
 
-    @staticmethod
-    def validate_access_token(access_token: str) -> Dict[str, Any]:
-        """Validate access token."""
+    @classmethod
+    def validate_access_token(cls, access_token: str) -> Dict[str, Any]:
+        """Validate access token.
+
+        Verified claims are cached until the token expires, its signing key retires or the cache TTL passes.
+        """
+        cache_key = cls._token_cache_key(access_token)
+        cached_token = cls.token_cache.get(cache_key)
+        if cached_token is not None:
+            return dict(cached_token)
+
         try:
-            decoded_token = jwt.decode(
-                access_token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM],
-                audience=settings.AUDIENCE,
-                issuer=settings.ISSUER,
-                options={
-                    "verify_signature": True,
-                    "require": ["exp", "iss", "sub", "aud"],
-                    "verify_iss": True,
-                    "verify_aud": True,
-                    "verify_exp": True,
-                },
-            )
-        except (
-            InvalidSignatureError,
-            DecodeError,
-            InvalidIssuerError,
-            ExpiredSignatureError,
-            InvalidAudienceError,
-            JWTError,
-        ) as exc:
+            key = cls.key_ring.verification_key(jwt.get_unverified_header(access_token).get("kid"))
+            if key is None:
+                raise InvalidTokenException
+            with timed("jwt_decode"):
+                decoded_token = jwt.decode(
+                    access_token,
+                    key.verifying_key,
+                    algorithms=[key.algorithm],
+                    audience=settings.AUDIENCE,
+                    issuer=settings.ISSUER,
+                    options={
+                        "verify_signature": True,
+                        "require": ["exp", "iss", "sub", "aud"],
+                        "verify_iss": True,
+                        "verify_aud": True,
+                        "verify_exp": True,
+                    },
+                )
+        except jwt.PyJWTError as exc:
             raise InvalidTokenException from exc
 
+        expires_at = min(decoded_token["exp"], cls.key_ring.retires_at(key))
+        cls.token_cache.set(cache_key, dict(decoded_token), expires_at=expires_at)
+        return decoded_token
+
+    @classmethod
+    async def verify_access_token(cls, db: AsyncSession, access_token: str) -> Dict[str, Any]:
+        """Validate an access token and reject it when it was revoked.
+
+        The revocation check runs against the in-process snapshot, only a token flagged by its filter costs a query.
+        """
+        decoded_token = cls.validate_access_token(access_token)
+        if await cls.revocation_list.is_revoked(db, decoded_token):
+            raise InvalidTokenException
         return decoded_token
 
-    def retrieve_user(self, db: Session, access_token: str) -> Union[User, None]:
+    @staticmethod
+    def _user_id(decoded_token: Dict[str, Any]) -> Optional[UUID]:
+        """Return the user id carried by the token, if any."""
+        if not decoded_token.get("uid"):
+            return None
+        try:
+            return UUID(decoded_token["uid"])
+        except ValueError as exc:
+            raise InvalidTokenException from exc
+
+    def user_clause(self, decoded_token: Dict[str, Any]) -> ColumnElement[bool]:
+        """SQL criterion selecting the user the token was issued to."""
+        user_id = self._user_id(decoded_token)
+        if user_id is not None:
+            return User.id == user_id
+        if not decoded_token["sub"]:
+            raise InvalidTokenException
+        return User.username == decoded_token["sub"]
+
+    async def retrieve_user(self, db: AsyncSession, access_token: str) -> Union[User, None]:
         """Retrieve user."""
-        decoded_token: Dict[str, Any] = self.validate_access_token(access_token)
+        decoded_token: Dict[str, Any] = await self.verify_access_token(db, access_token)
+        return await self.retrieve_token_user(db, decoded_token)
+
+    async def retrieve_token_user(self, db: AsyncSession, decoded_token: Dict[str, Any]) -> User:
+        """Retrieve the user of verified access token claims.
 
+        Tokens carrying a ``uid`` claim are resolved through the identity cache and a primary key lookup,
+        older tokens fall back to a lookup by username.
+        """
         if not decoded_token["sub"]:
             raise InvalidTokenException
 
-        user: Union[User, None] = db.query(User).filter(User.username == decoded_token["sub"]).scalar()
+        user: Union[User, None]
+        user_id = self._user_id(decoded_token)
+        if user_id is not None:
+            user = await user_cache.get(user_id)
+            if user is None:
+                user = await read_your_writes(db, lambda: db.get(User, user_id, execution_options={"replica": True}))
+                if user:
+                    await user_cache.set(user)
+        else:
+            user = await read_your_writes(
+                db,
+                lambda: db.scalar(
+                    select(User).where(User.username == decoded_token["sub"]).execution_options(replica=True)
+                ),
+            )
 
         if not user:
             raise InvalidTokenException
@@ -99,17 +189,25 @@ class TokenHandler:
 class UserAuth(AuthBase, TokenHandler):
     """User authentication."""
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify password."""
-        return self.crypt_context.verify(plain_password, hashed_password)
+        return await self.hashing_engine.verify(plain_password, hashed_password)
 
-    def authenticate_user(self, db: Session, username: str, password: str) -> Optional[User]:
+    async def authenticate_user(self, db: AsyncSession, username: str, password: str) -> Optional[User]:
         """Authenticate user."""
-        user = db.query(User).filter(User.username == username).first()
+        user = await read_your_writes(
+            db,
+            lambda: db.scalar(select(User).where(User.username == username).limit(1).execution_options(replica=True)),
+        )
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        verified, new_hash = await self.hashing_engine.verify_and_update(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+            await db.refresh(user)
         return user
 
 
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from typing import Dict
+from typing import Generic
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe bounded LRU cache with per-entry expiry.
+
+    Expiry times are absolute values of ``clock`` (wall-clock seconds by default), which lets callers cap an entry
+    at an externally given deadline such as a token ``exp`` claim. A ``maxsize`` of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Return a cached value, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if self.clock() < expires_at:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: K, value: V, expires_at: Optional[float] = None) -> None:
+        """Store a value until ``expires_at``, never longer than the cache TTL."""
+        if self.maxsize <= 0:
+            return
+        deadline = self.clock() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            self._data[key] = (deadline, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: K) -> None:
+        """Remove a value from the cache."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all values from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache counters."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data)}
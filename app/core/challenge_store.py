@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.core import settings
+from app.core.kv_store import KeyValueStore
+from app.core.kv_store import MemoryKeyValueStore
+from app.core.kv_store import create_kv_store
+
+logger = logging.getLogger(__name__)
+
+
+class ChallengeStore:
+    """Server-side store of pending WebAuthn challenges.
+
+    Challenges are stored per purpose and subject and can be consumed exactly once. With a shared key-value store
+    the challenge can be issued and verified by different workers or nodes.
+    """
+
+    key_prefix = "challenge:"
+
+    def __init__(self, store: KeyValueStore, ttl: float, cleanup_interval: float):
+        self.store = store
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    def _key(self, purpose: str, subject: str) -> str:
+        return f"{self.key_prefix}{purpose}:{subject}"
+
+    async def save(self, purpose: str, subject: str, challenge: bytes) -> None:
+        """Store a challenge, replacing any pending one for the same purpose and subject."""
+        await self.store.set(self._key(purpose, subject), challenge, self.ttl)
+
+    async def consume(self, purpose: str, subject: str) -> Optional[bytes]:
+        """Return and remove a pending challenge, or None when it is missing, expired or already used."""
+        return await self.store.pop(self._key(purpose, subject))
+
+    async def _cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            removed = self.store.purge_expired()
+            if removed:
+                logger.debug("Removed %s expired WebAuthn challenges", removed)
+
+    async def start_cleanup(self) -> None:
+        """Start purging expired challenges in the background, only needed for the in-memory store."""
+        if isinstance(self.store, MemoryKeyValueStore) and self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup())
+
+    async def stop_cleanup(self) -> None:
+        """Stop the background cleanup."""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            self._cleanup_task = None
+
+
+challenge_store = ChallengeStore(
+    store=create_kv_store(settings.KV_STORE_URL) or MemoryKeyValueStore(),
+    ttl=settings.WEBAUTHN_CHALLENGE_TTL_SECONDS,
+    cleanup_interval=settings.WEBAUTHN_CHALLENGE_CLEANUP_INTERVAL_SECONDS,
+)
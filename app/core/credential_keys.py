@@ -0,0 +1,140 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Any
+from typing import Optional
+
+from cryptography.exceptions import InvalidSignature
+from webauthn.authentication.verify_authentication_response import VerifiedAuthentication
+from webauthn.authentication.verify_authentication_response import expected_token_binding_statuses
+from webauthn.helpers import bytes_to_base64url
+from webauthn.helpers import decode_credential_public_key
+from webauthn.helpers import decoded_public_key_to_cryptography
+from webauthn.helpers import parse_authenticator_data
+from webauthn.helpers import parse_backup_flags
+from webauthn.helpers import parse_client_data_json
+from webauthn.helpers import verify_signature
+from webauthn.helpers.cose import COSEAlgorithmIdentifier
+from webauthn.helpers.exceptions import InvalidAuthenticationResponse
+from webauthn.helpers.exceptions import InvalidClientDataJSONStructure
+from webauthn.helpers.structs import AuthenticationCredential
+from webauthn.helpers.structs import ClientDataType
+from webauthn.helpers.structs import PublicKeyCredentialType
+
+from app.core import settings
+from app.core.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class ParsedPublicKey:
+    """A credential public key decoded from COSE into a ``cryptography`` key object."""
+
+    cose_key: bytes
+    public_key: Any
+    algorithm: COSEAlgorithmIdentifier
+
+    @classmethod
+    def parse(cls, cose_key: bytes) -> "ParsedPublicKey":
+        """Decode a COSE public key."""
+        decoded = decode_credential_public_key(cose_key)
+        return cls(cose_key, decoded_public_key_to_cryptography(decoded), decoded.alg)
+
+
+class CredentialKeyCache:
+    """Bounded cache of parsed credential public keys, keyed by the credential ID digest.
+
+    Entries remember the COSE bytes they were parsed from and are only used while the stored key still matches, so a
+    credential re-registered under the same ID can never be verified with a stale key.
+    """
+
+    def __init__(self, cache: TTLCache[bytes, ParsedPublicKey]):
+        self.cache = cache
+
+    def get(self, credential_id_hash: bytes, cose_key: bytes) -> ParsedPublicKey:
+        """Return the parsed key of a credential, parsing and caching it on a miss."""
+        parsed: Optional[ParsedPublicKey] = self.cache.get(credential_id_hash)
+        if parsed is None or parsed.cose_key != cose_key:
+            parsed = ParsedPublicKey.parse(cose_key)
+            self.cache.set(credential_id_hash, parsed)
+        return parsed
+
+    def invalidate(self, credential_id_hash: bytes) -> None:
+        """Drop the parsed key of a credential."""
+        self.cache.delete(credential_id_hash)
+
+
+credential_key_cache = CredentialKeyCache(
+    TTLCache(maxsize=settings.WEBAUTHN_KEY_CACHE_SIZE, ttl=settings.WEBAUTHN_KEY_CACHE_TTL_SECONDS)
+)
+
+
+def assertion_challenge(credential: AuthenticationCredential) -> Optional[bytes]:
+    """Return the challenge an assertion answers, or None when its client data is malformed."""
+    try:
+        return parse_client_data_json(credential.response.client_data_json).challenge
+    except (InvalidClientDataJSONStructure, ValueError):
+        return None
+
+
+def verify_authentication_response(  # pylint: disable=too-many-arguments
+    credential: AuthenticationCredential,
+    expected_challenge: bytes,
+    expected_rp_id: str,
+    expected_origin: str,
+    credential_public_key: ParsedPublicKey,
+    credential_current_sign_count: int,
+    require_user_verification: bool = False,
+) -> VerifiedAuthentication:
+    """Verify an assertion against an already parsed public key.
+
+    Performs the checks of ``webauthn.verify_authentication_response``, which only accepts raw COSE bytes and
+    decodes them on every call.
+    """
+    if bytes_to_base64url(credential.raw_id) != credential.id:
+        raise InvalidAuthenticationResponse("id and raw_id were not equivalent")
+    if credential.type != PublicKeyCredentialType.PUBLIC_KEY:
+        raise InvalidAuthenticationResponse(f'Unexpected credential type "{credential.type}", expected "public-key"')
+
+    response = credential.response
+    client_data = parse_client_data_json(response.client_data_json)
+    if client_data.type != ClientDataType.WEBAUTHN_GET:
+        raise InvalidAuthenticationResponse(f'Unexpected client data type "{client_data.type}"')
+    if expected_challenge != client_data.challenge:
+        raise InvalidAuthenticationResponse("Client data challenge was not expected challenge")
+    if expected_origin != client_data.origin:
+        raise InvalidAuthenticationResponse(f'Unexpected client data origin "{client_data.origin}"')
+    if client_data.token_binding and client_data.token_binding.status not in expected_token_binding_statuses:
+        raise InvalidAuthenticationResponse(f'Unexpected token_binding status "{client_data.token_binding.status}"')
+
+    auth_data = parse_authenticator_data(response.authenticator_data)
+    if auth_data.rp_id_hash != hashlib.sha256(expected_rp_id.encode("utf-8")).digest():
+        raise InvalidAuthenticationResponse("Unexpected RP ID hash")
+    if not auth_data.flags.up:
+        raise InvalidAuthenticationResponse("User was not present during authentication")
+    if require_user_verification and not auth_data.flags.uv:
+        raise InvalidAuthenticationResponse("User verification is required but user was not verified")
+    if (
+        auth_data.sign_count > 0 or credential_current_sign_count > 0
+    ) and auth_data.sign_count <= credential_current_sign_count:
+        raise InvalidAuthenticationResponse(
+            f"Response sign count of {auth_data.sign_count} was not greater than current count of "
+            f"{credential_current_sign_count}"
+        )
+
+    signature_base = response.authenticator_data + hashlib.sha256(response.client_data_json).digest()
+    try:
+        verify_signature(
+            public_key=credential_public_key.public_key,
+            signature_alg=credential_public_key.algorithm,
+            signature=response.signature,
+            data=signature_base,
+        )
+    except InvalidSignature as exc:
+        raise InvalidAuthenticationResponse("Could not verify authentication signature") from exc
+
+    backup_flags = parse_backup_flags(auth_data.flags)
+    return VerifiedAuthentication(
+        credential_id=credential.raw_id,
+        new_sign_count=auth_data.sign_count,
+        credential_device_type=backup_flags.credential_device_type,
+        credential_backed_up=backup_flags.credential_backed_up,
+    )
@@ -0,0 +1,289 @@
+import asyncio
+import logging
+import math
+import statistics
+import time
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from app.api.errors import ServiceBusyException
+from app.core import settings
+from app.core.metrics import operation_duration
+from app.core.metrics import registry
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_PASSWORD = "calibration-password"
+CALIBRATION_MAX_ITERATIONS = 6
+
+
+@dataclass(frozen=True)
+class HashProfile:
+    """Password hashing scheme and cost."""
+
+    scheme: str
+    rounds: int = 0
+    memory_cost: int = 0
+
+    def context_options(self) -> Dict[str, int]:
+        """Return the ``CryptContext`` options applying this cost to the scheme."""
+        options = {}
+        if self.rounds:
+            # Pinning both bounds makes needs_update() flag hashes of any other cost, cheaper or more expensive.
+            for option in ("default_rounds", "min_rounds", "max_rounds"):
+                options[f"{self.scheme}__{option}"] = self.rounds
+        if self.memory_cost:
+            options[f"{self.scheme}__memory_cost"] = self.memory_cost
+        return options
+
+
+def build_crypt_context(profile: HashProfile, legacy_schemes: Iterable[str] = ()) -> "CryptContext":
+    """Build a context hashing with ``profile`` that still verifies, and flags for update, the legacy schemes."""
+    from passlib.context import CryptContext  # pylint: disable=import-outside-toplevel
+
+    schemes = [profile.scheme] + [scheme for scheme in legacy_schemes if scheme and scheme != profile.scheme]
+    return CryptContext(schemes=schemes, default=profile.scheme, deprecated="auto", **profile.context_options())
+
+
+def measure_profile(profile: HashProfile, samples: int = 3) -> float:
+    """Return the median time in seconds to hash a password with ``profile`` on this host."""
+    context = build_crypt_context(profile)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(CALIBRATION_PASSWORD)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate_profile(
+    scheme: str,
+    target_seconds: float,
+    memory_cost: int = 0,
+    samples: int = 3,
+    tolerance: float = 0.1,
+) -> Tuple[HashProfile, float]:
+    """Find the rounds of ``scheme`` whose hash time on this host is closest to ``target_seconds``.
+
+    Returns the profile together with its measured hash time.
+    """
+    from passlib.registry import get_crypt_handler  # pylint: disable=import-outside-toplevel
+
+    handler = get_crypt_handler(scheme)
+    if "rounds" not in handler.setting_kwds:
+        raise ValueError(f"{scheme} has no configurable cost")
+
+    rounds = handler.default_rounds
+    for _ in range(CALIBRATION_MAX_ITERATIONS):
+        profile = HashProfile(scheme, rounds, memory_cost)
+        elapsed = measure_profile(profile, samples)
+        if abs(elapsed - target_seconds) <= tolerance * target_seconds:
+            break
+        scale = target_seconds / elapsed
+        if handler.rounds_cost == "log2":
+            next_rounds = rounds + round(math.log2(scale))
+        else:
+            next_rounds = round(rounds * scale)
+        next_rounds = min(max(next_rounds, handler.min_rounds), handler.max_rounds)
+        if next_rounds == rounds:
+            break
+        rounds = next_rounds
+    return profile, elapsed
+
+
+class LazyCryptContext:
+    """``CryptContext`` built on first use, so passlib and the hash backends are only imported to handle a password.
+
+    Attribute access is forwarded to the built context.
+    """
+
+    def __init__(self, profile: HashProfile, legacy_schemes: Iterable[str] = ()):
+        self.profile = profile
+        self.legacy_schemes = tuple(legacy_schemes)
+        self._context: Optional["CryptContext"] = None
+
+    def load(self) -> "CryptContext":
+        """Build the context unless it already is."""
+        if self._context is None:
+            self._context = build_crypt_context(self.profile, self.legacy_schemes)
+        return self._context
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+crypt_context = LazyCryptContext(
+    HashProfile(settings.PASSWORD_HASH_SCHEME, settings.PASSWORD_HASH_ROUNDS, settings.PASSWORD_HASH_MEMORY_COST),
+    settings.PASSWORD_HASH_LEGACY_SCHEMES,
+)
+
+
+def _timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Run ``func`` and return its result together with the CPU time spent in the worker."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _hash(password: str) -> Tuple[str, float]:
+    """Hash a password inside a worker."""
+    return _timed(crypt_context.hash, password)
+
+
+def _verify(password: str, hashed_password: str) -> Tuple[bool, float]:
+    """Verify a password inside a worker."""
+    return _timed(crypt_context.verify, password, hashed_password)
+
+
+def _load() -> None:
+    """Import passlib and build the context inside a worker."""
+    crypt_context.load()
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[Tuple[bool, Optional[str]], float]:
+    """Verify a password inside a worker, rehashing it when its scheme or cost is outdated."""
+    return _timed(crypt_context.verify_and_update, password, hashed_password)
+
+
+@dataclass
+class OperationStats:
+    """Timing statistics of a single hashing operation."""
+
+    count: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    worker_seconds: float = 0.0
+
+    def observe(self, elapsed: float, worker_elapsed: float) -> None:
+        """Record one completed operation."""
+        self.count += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self.worker_seconds += worker_elapsed
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return the statistics as a dictionary."""
+        return {
+            "count": self.count,
+            "rejected": self.rejected,
+            "total_seconds": self.total_seconds,
+            "max_seconds": self.max_seconds,
+            "avg_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "avg_worker_seconds": self.worker_seconds / self.count if self.count else 0.0,
+        }
+
+
+class HashingEngine:
+    """Run password hashing off the event loop on a bounded worker pool.
+
+    With ``workers`` set to 0 the default threadpool is used instead of a process pool.
+    Once ``max_pending`` operations are queued or running, new ones are rejected with ``ServiceBusyException``.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+        self._stats: Dict[str, OperationStats] = {"hash": OperationStats(), "verify": OperationStats()}
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """Lazily start the process pool, so importing the app does not fork workers."""
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _submit(self, operation: str, func: Callable[..., Tuple[Any, float]], *args: Any) -> Any:
+        """Submit an operation to the pool, rejecting it when the queue is full."""
+        stats = self._stats[operation]
+        if self.pending >= self.max_pending:
+            stats.rejected += 1
+            raise ServiceBusyException(retry_after=self.retry_after)
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            result, worker_elapsed = await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+        elapsed = time.perf_counter() - start
+        stats.observe(elapsed, worker_elapsed)
+        if registry.enabled:
+            operation_duration.observe(elapsed, f"password_{operation}")
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._submit("hash", _hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash."""
+        return await self._submit("verify", _verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password, also returning a new hash when the stored one needs an update."""
+        return await self._submit("verify", _verify_and_update, password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch of passwords spread over the whole pool, bypassing the per-request queue bound.
+
+        Meant for bulk jobs such as user imports, which bound their own batch size.
+        """
+        loop = asyncio.get_running_loop()
+        stats = self._stats["hash"]
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _hash, password) for password in passwords)
+        )
+        elapsed = (time.perf_counter() - start) / max(1, len(passwords))
+        for _, worker_elapsed in results:
+            stats.observe(elapsed, worker_elapsed)
+        return [hashed for hashed, _ in results]
+
+    async def warm_up(self) -> None:
+        """Start the workers and build the context in each, so the first password check does not pay for them.
+
+        A failure only logs a warning, the workers then start on demand as before.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self.executor, _load) for _ in range(max(1, self.workers))))
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Password hashing warm-up failed, loading on demand: %s", error)
+            return
+        logger.info("Warmed up %s password hashing workers in %.3fs", self.workers, time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-operation timing statistics."""
+        return {operation: stats.as_dict() for operation, stats in self._stats.items()}
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+hashing_engine = HashingEngine(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from jwt.algorithms import ECAlgorithm
+from jwt.algorithms import OKPAlgorithm
+
+from app.core import settings
+
+ASYMMETRIC_ALGORITHMS: Dict[str, Any] = {"ES256": ECAlgorithm, "EdDSA": OKPAlgorithm}
+
+
+@dataclass(frozen=True)
+class RingKey:
+    """A token signing key, parsed once when the ring is loaded."""
+
+    kid: Optional[str]
+    algorithm: str
+    signing_key: Any
+    verifying_key: Any
+    not_before: float = 0.0
+
+    @property
+    def is_asymmetric(self) -> bool:
+        """Whether the key can be published."""
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def material(self) -> bytes:
+        """Bytes identifying the key, the public key for asymmetric keys."""
+        if not self.is_asymmetric:
+            return self.verifying_key.encode()
+        return self.verifying_key.public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+
+    @cached_property
+    def public_jwk(self) -> Dict[str, str]:
+        """The public key as a JWK, serialized once per key."""
+        jwk = json.loads(ASYMMETRIC_ALGORITHMS[self.algorithm].to_jwk(self.verifying_key))
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class KeyRing:
+    """Signing keys ordered by the time they take over.
+
+    The newest key whose ``not_before`` has passed signs new tokens. Keys scheduled for the future are already
+    published, so verifiers can fetch them ahead of the switch. A superseded key is still accepted and published for
+    ``overlap_seconds`` after its successor takes over, so tokens it signed stay valid until they expire.
+    """
+
+    def __init__(self, keys: List[RingKey], overlap_seconds: float, clock: Callable[[], float] = time.time):
+        if not keys:
+            raise ValueError("The key ring needs at least one key")
+        self.keys = sorted(keys, key=lambda key: key.not_before)
+        self.overlap_seconds = overlap_seconds
+        self.clock = clock
+        self.by_kid = {key.kid: key for key in self.keys}
+        digest = hashlib.sha256()
+        for key in self.keys:
+            digest.update(f"{key.kid}:{key.algorithm}:{key.not_before}:".encode())
+            digest.update(key.material())
+        self.fingerprint = digest.digest()
+
+    @classmethod
+    def from_secret(cls, secret: str, algorithm: str = "HS256") -> "KeyRing":
+        """Single shared-secret key ring, tokens signed with it carry no ``kid``."""
+        return cls([RingKey(None, algorithm, secret, secret)], overlap_seconds=0)
+
+    @classmethod
+    def from_file(cls, path: str, overlap_seconds: float) -> "KeyRing":
+        """Load a JSON list of ``{"kid", "alg", "private_key" | "private_key_file", "not_before"}`` entries.
+
+        ``private_key`` is an inline PEM, ``private_key_file`` a PEM path relative to the key file and ``not_before``
+        an optional ISO 8601 timestamp.
+        """
+        key_file = Path(path)
+        keys = []
+        for entry in json.loads(key_file.read_text(encoding="utf-8")):
+            if entry["alg"] not in ASYMMETRIC_ALGORITHMS:
+                raise ValueError(f"Unsupported key ring algorithm {entry['alg']}")
+            pem = entry.get("private_key") or (key_file.parent / entry["private_key_file"]).read_text(encoding="utf-8")
+            private_key = serialization.load_pem_private_key(pem.encode(), password=None)
+            not_before = datetime.fromisoformat(entry["not_before"]).timestamp() if entry.get("not_before") else 0.0
+            keys.append(RingKey(entry["kid"], entry["alg"], private_key, private_key.public_key(), not_before))
+        return cls(keys, overlap_seconds)
+
+    def _successor(self, key: RingKey) -> Optional[RingKey]:
+        """Return the key taking over from ``key``."""
+        index = self.keys.index(key)
+        return self.keys[index + 1] if index + 1 < len(self.keys) else None
+
+    def retires_at(self, key: RingKey) -> float:
+        """Time after which tokens signed with ``key`` are no longer accepted."""
+        successor = self._successor(key)
+        return successor.not_before + self.overlap_seconds if successor else math.inf
+
+    def signing_key(self) -> RingKey:
+        """Return the key that signs new tokens."""
+        now = self.clock()
+        active = [key for key in self.keys if key.not_before <= now]
+        if not active:
+            raise RuntimeError("No signing key is active yet")
+        return active[-1]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[RingKey]:
+        """Return the key for a token's ``kid`` header, unless it is unknown or retired."""
+        key = self.by_kid.get(kid)
+        if key is None or self.retires_at(key) <= self.clock():
+            return None
+        return key
+
+    def published_keys(self) -> List[RingKey]:
+        """Return the asymmetric keys that are active, scheduled or still within their overlap window."""
+        now = self.clock()
+        return [key for key in self.keys if key.is_asymmetric and self.retires_at(key) > now]
+
+    def next_change(self) -> float:
+        """Time at which the signing key or the published key set changes next."""
+        now = self.clock()
+        boundaries = [key.not_before for key in self.keys] + [self.retires_at(key) for key in self.keys]
+        return min((boundary for boundary in boundaries if boundary > now), default=math.inf)
+
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        """Return the published keys as a JWK set."""
+        return {"keys": [key.public_jwk for key in self.published_keys()]}
+
+
+def create_key_ring() -> KeyRing:
+    """Create the key ring described by the settings."""
+    if settings.ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        return KeyRing.from_file(settings.JWT_KEYS_FILE, settings.JWT_KEY_OVERLAP_SECONDS)
+    return KeyRing.from_secret(settings.SECRET_KEY, settings.ALGORITHM)
+
+
+key_ring = create_key_ring()
@@ -0,0 +1,99 @@
+import abc
+import time
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+
+class KeyValueStore(abc.ABC):
+    """Minimal async key-value store interface shared by the in-process caches."""
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored under ``key``."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove ``key``."""
+
+    @abc.abstractmethod
+    async def pop(self, key: str) -> Optional[bytes]:
+        """Atomically return and remove the value stored under ``key``."""
+
+
+class MemoryKeyValueStore(KeyValueStore):
+    """Process-local key-value store, a stand-in for a shared store in tests and single-worker setups."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+
+    def _get_entry(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._get_entry(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def pop(self, key: str) -> Optional[bytes]:
+        value = self._get_entry(key)
+        self._data.pop(key, None)
+        return value
+
+    def purge_expired(self) -> int:
+        """Drop expired entries and return how many were removed."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if now >= expires_at]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisKeyValueStore(KeyValueStore):
+    """Key-value store shared between workers and nodes, backed by Redis."""
+
+    def __init__(self, url: str):
+        import redis.asyncio  # pylint: disable=import-outside-toplevel
+
+        self._redis = redis.asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def pop(self, key: str) -> Optional[bytes]:
+        return await self._redis.getdel(key)
+
+
+def create_kv_store(url: str) -> Optional[KeyValueStore]:
+    """Create a key-value store from a URL, or None when no URL is configured."""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryKeyValueStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisKeyValueStore(url)
+    raise ValueError(f"Unsupported key-value store URL: {url}")
@@ -0,0 +1,244 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextlib import nullcontext
+from typing import Callable
+from typing import ContextManager
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Sequence
+from typing import Tuple
+from typing import Type
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.core import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Prometheus histogram with fixed buckets."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(labelvalues, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> Iterator[str]:
+        """Render the histogram in the Prometheus text format."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Counter:
+    """Prometheus counter."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Increase the counter."""
+        with self._lock:
+            self._series[labelvalues] = self._series.get(labelvalues, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        """Render the counter in the Prometheus text format."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            series = list(self._series.items())
+        for labels, value in series:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge:
+    """Prometheus gauge, either set directly or read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, float] = {}
+        self._callbacks: Dict[LabelValues, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Increase the gauge."""
+        with self._lock:
+            self._series[labelvalues] = self._series.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Decrease the gauge."""
+        self.inc(*labelvalues, amount=-amount)
+
+    def get(self, *labelvalues: str) -> float:
+        """Return the current value of a series."""
+        callback = self._callbacks.get(labelvalues)
+        return callback() if callback else self._series.get(labelvalues, 0.0)
+
+    def set_callback(self, callback: Callable[[], float], *labelvalues: str) -> None:
+        """Read a series from ``callback`` at scrape time."""
+        self._callbacks[labelvalues] = callback
+
+    def render(self) -> Iterator[str]:
+        """Render the gauge in the Prometheus text format."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        with self._lock:
+            labels = list(self._series) + [labels for labels in self._callbacks if labels not in self._series]
+        for labelvalues in labels:
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {self.get(*labelvalues)}"
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered by the ``/metrics`` endpoint."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        """Register a metric, returning the already registered one with the same name."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"))
+)
+operation_duration = registry.register(
+    Histogram("operation_duration_seconds", "Latency of hot-path operations.", ("operation",))
+)
+db_pool_checkout_duration = registry.register(
+    Histogram("db_pool_checkout_duration_seconds", "Time spent waiting for a pooled database connection.")
+)
+db_pool_checked_out = registry.register(
+    Gauge("db_pool_checked_out", "Database connections currently checked out by engine.", ("engine",))
+)
+db_pool_saturation = registry.register(
+    Gauge("db_pool_saturation_ratio", "Checked out connections relative to pool size plus overflow.", ("engine",))
+)
+rate_limit_decisions = registry.register(
+    Counter("rate_limit_decisions_total", "Rate limiter decisions by rule.", ("rule", "decision"))
+)
+
+
+@contextmanager
+def _timer(operation: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        operation_duration.observe(time.perf_counter() - start, operation)
+
+
+def timed(operation: str) -> ContextManager[None]:
+    """Time a block as ``operation``; a shared no-op context when metrics are disabled."""
+    if not registry.enabled:
+        return nullcontext()
+    return _timer(operation)
+
+
+_pool_classes: Dict[Type[Pool], Type[Pool]] = {}
+
+
+def instrumented_pool_class(pool_class: Type[Pool]) -> Type[Pool]:
+    """Return a subclass of ``pool_class`` timing connection checkout, or the class itself when disabled."""
+    if not registry.enabled:
+        return pool_class
+    if pool_class not in _pool_classes:
+
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return pool_class.connect(self)
+            finally:
+                db_pool_checkout_duration.observe(time.perf_counter() - start)
+
+        _pool_classes[pool_class] = type(f"Instrumented{pool_class.__name__}", (pool_class,), {"connect": connect})
+    return _pool_classes[pool_class]
+
+
+def instrument_engine(engine: Engine, name: str, capacity: int) -> None:
+    """Track checked out connections and pool saturation of the engine labelled ``name`` through pool events."""
+    if not registry.enabled:
+        return
+
+    event.listen(engine, "checkout", lambda *args: db_pool_checked_out.inc(name))
+    event.listen(engine, "checkin", lambda *args: db_pool_checked_out.dec(name))
+    db_pool_saturation.set_callback(lambda: db_pool_checked_out.get(name) / capacity, name)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
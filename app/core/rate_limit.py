@@ -0,0 +1,169 @@
+import abc
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from app.api.errors import RateLimitedException
+from app.core import settings
+from app.core.metrics import rate_limit_decisions
+from app.core.metrics import registry
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Token bucket of ``capacity`` tokens, refilled at ``capacity`` tokens per ``period_seconds``."""
+
+    capacity: int
+    period_seconds: float
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["Rate"]:
+        """Parse a rate such as ``10/minute`` or ``10/60``; an empty value or a zero capacity disables the limit."""
+        if not value:
+            return None
+        capacity, _, period = value.partition("/")
+        if int(capacity) <= 0:
+            return None
+        return cls(int(capacity), PERIODS[period] if period in PERIODS else float(period))
+
+    @property
+    def refill_per_second(self) -> float:
+        """Tokens added back per second."""
+        return self.capacity / self.period_seconds
+
+
+class RateLimitBackend(abc.ABC):
+    """Storage of token buckets."""
+
+    @abc.abstractmethod
+    async def acquire(self, key: str, rate: Rate) -> float:
+        """Take one token from the bucket of ``key``, returning 0 or the seconds until a token is available."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Process-local buckets spread over lock-sharded LRU maps.
+
+    Each shard holds at most ``max_keys / shards`` buckets, so a flood of distinct keys evicts the idlest buckets
+    instead of growing without bound. An evicted bucket starts full again, which equals a bucket left idle long enough.
+    """
+
+    def __init__(self, shards: int, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self._shards: List[Tuple[threading.Lock, "OrderedDict[str, Tuple[float, float]]"]] = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+
+    def take(self, key: str, rate: Rate) -> float:
+        """Synchronous ``acquire``, the critical section only touches one shard."""
+        lock, buckets = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        now = self.clock()
+        with lock:
+            tokens, updated_at = buckets.pop(key, (rate.capacity, now))
+            tokens = min(rate.capacity, tokens + (now - updated_at) * rate.refill_per_second)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate.refill_per_second
+            buckets[key] = (tokens, now)
+            if len(buckets) > self.max_keys_per_shard:
+                buckets.popitem(last=False)
+        return wait
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        return self.take(key, rate)
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
+
+
+# Refills and takes a token atomically, using the Redis clock so that every app node agrees on the time.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill * 1000))
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared between workers and nodes, backed by Redis."""
+
+    key_prefix = "ratelimit:"
+
+    def __init__(self, url: str):
+        import redis.asyncio  # pylint: disable=import-outside-toplevel
+
+        self._redis = redis.asyncio.from_url(url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, key: str, rate: Rate) -> float:
+        wait = await self._script(keys=[self.key_prefix + key], args=[rate.capacity, rate.refill_per_second])
+        return float(wait)
+
+
+def create_rate_limit_backend(url: str) -> RateLimitBackend:
+    """Create the Redis backend for a ``redis://`` URL, in-process buckets otherwise."""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitBackend(url)
+    return MemoryRateLimitBackend(shards=settings.RATE_LIMIT_SHARDS, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+class RateLimiter:
+    """Admission control applying token bucket rules and counting their decisions."""
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def _count(self, rule: str, decision: str) -> None:
+        self._counts[rule, decision] = self._counts.get((rule, decision), 0) + 1
+        if registry.enabled:
+            rate_limit_decisions.inc(rule, decision)
+
+    async def check(self, rule: str, key: str, rate: Optional[Rate]) -> None:
+        """Take a token for ``key`` under ``rule``, raising ``RateLimitedException`` when its bucket is empty."""
+        if not self.enabled or rate is None:
+            return
+        wait = await self.backend.acquire(f"{rule}:{key}", rate)
+        if wait > 0:
+            self._count(rule, "throttled")
+            raise RateLimitedException(retry_after=math.ceil(wait))
+        self._count(rule, "allowed")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return allowed and throttled counts per rule."""
+        stats: Dict[str, Dict[str, int]] = {}
+        for (rule, decision), count in self._counts.items():
+            stats.setdefault(rule, {"allowed": 0, "throttled": 0})[decision] = count
+        return stats
+
+
+rate_limiter = RateLimiter(
+    backend=create_rate_limit_backend(settings.RATE_LIMIT_STORE_URL), enabled=settings.RATE_LIMIT_ENABLED
+)
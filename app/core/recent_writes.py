@@ -0,0 +1,54 @@
+from typing import Optional
+from typing import Union
+from uuid import UUID
+
+from app.core import settings
+from app.core.cache import TTLCache
+from app.core.kv_store import KeyValueStore
+from app.core.kv_store import create_kv_store
+
+# Writers remembered in-process, the oldest are dropped first.
+RECENT_WRITERS = 10000
+
+
+class RecentWrites:
+    """Users who wrote within the replica lag window, whose reads are served by the primary meanwhile.
+
+    Falling back to the primary on an empty replica result misses rows added next to ones the replica already has,
+    such as a second credential, so the writer is marked in-process and in the optional shared key-value store for
+    the other workers. A ``window`` of 0 disables the markers.
+    """
+
+    key_prefix = "wrote:"
+
+    def __init__(self, local: TTLCache[str, bool], shared: Optional[KeyValueStore], window: float):
+        self.local = local
+        self.shared = shared
+        self.window = window
+
+    async def mark(self, user_id: Union[UUID, str]) -> None:
+        """Record that a user just wrote."""
+        if self.window <= 0:
+            return
+        key = f"{self.key_prefix}{user_id}"
+        self.local.set(key, True)
+        if self.shared is not None:
+            await self.shared.set(key, b"1", self.window)
+
+    async def contains(self, user_id: Union[UUID, str]) -> bool:
+        """Return whether a user wrote within the lag window."""
+        if self.window <= 0:
+            return False
+        key = f"{self.key_prefix}{user_id}"
+        if self.local.get(key):
+            return True
+        return self.shared is not None and await self.shared.get(key) is not None
+
+
+recent_writes = RecentWrites(
+    local=TTLCache(maxsize=RECENT_WRITERS, ttl=settings.DATABASE_REPLICA_LAG_SECONDS),
+    shared=create_kv_store(settings.KV_STORE_URL),
+    window=settings.DATABASE_REPLICA_LAG_SECONDS
+    if settings.DATABASE_REPLICA_URLS or settings.ASYNC_DATABASE_REPLICA_URLS
+    else 0,
+)
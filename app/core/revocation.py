@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy import exc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.db.dialects import upsert
+from app.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Rows revoked shortly before the previous refresh are read again, covering clock skew between nodes and late commits.
+SYNC_OVERLAP_SECONDS = 5.0
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings.
+
+    Never misses an added item, and up to ``capacity`` items reports about ``error_rate`` of other items as present.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: bytes) -> Iterator[int]:
+        """Bit positions of an item, derived from two halves of a single digest."""
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, item: bytes) -> None:
+        """Add an item."""
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def as_utc(value: datetime) -> datetime:
+    """Attach UTC to the naive datetimes SQLite returns."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationList:
+    """In-process snapshot of the revoked access tokens, answering per request without the database.
+
+    Revoked token IDs are kept in a Bloom filter. A miss proves the token was not revoked by ID, a hit is confirmed
+    with a query, as it may be a false positive. Logouts everywhere are kept exactly, as the time from which each user's
+    earlier tokens are revoked, so they never cost a query. The snapshot is topped up with the rows revoked since the
+    previous refresh, and rebuilt from scratch periodically to drop revocations of tokens that have expired.
+    Revocations made by this process apply at once, those of other processes after their next refresh.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        capacity: int,
+        error_rate: float,
+        token_lifetime: timedelta,
+        refresh_interval: float,
+        rebuild_interval: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.clock = clock
+        self.filter = BloomFilter(capacity, error_rate)
+        self.cutoffs: Dict[UUID, float] = {}
+        self.confirmations = 0
+        self._synced_at: Optional[float] = None
+        self._rebuilt_at = 0.0
+        self._sync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(jti: Any) -> bytes:
+        return str(jti).encode()
+
+    @staticmethod
+    def _user_id(claims: Dict[str, Any]) -> Optional[UUID]:
+        try:
+            return UUID(claims["uid"]) if claims.get("uid") else None
+        except ValueError:
+            return None
+
+    def _remember(self, jti: Optional[UUID], user_id: UUID, revoked_at: datetime) -> None:
+        """Add a revocation row to the snapshot."""
+        if jti is not None:
+            self.filter.add(self._key(jti))
+        else:
+            self.cutoffs[user_id] = max(self.cutoffs.get(user_id, 0.0), as_utc(revoked_at).timestamp())
+
+    async def is_revoked(self, db: AsyncSession, claims: Dict[str, Any]) -> bool:
+        """Return whether a validated token was revoked, querying the database only when the filter flags its ID."""
+        if self.cutoffs and claims.get("iat", 0) < self.cutoffs.get(self._user_id(claims), 0.0):
+            return True
+        jti = claims.get("jti")
+        if not jti or self._key(jti) not in self.filter:
+            return False
+        self.confirmations += 1
+        # Read from the primary, a replica may not have the revocation yet.
+        return await db.scalar(select(RevokedToken.id).where(RevokedToken.jti == UUID(jti))) is not None
+
+    async def revoke(self, db: AsyncSession, user_id: UUID, claims: Dict[str, Any]) -> None:
+        """Revoke a single token until it expires.
+
+        Tokens issued before they carried a ``jti`` cannot be revoked one by one and are left to expire. Revoking a
+        token twice, here or in another process, keeps the first revocation.
+        """
+        if not claims.get("jti"):
+            return
+        jti = UUID(claims["jti"])
+        revoked_at = datetime.now(timezone.utc)
+        expires_at = datetime.fromtimestamp(claims["exp"], timezone.utc)
+        await db.execute(
+            upsert(db, RevokedToken)
+            .values(jti=jti, user_id=user_id, revoked_at=revoked_at, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        await db.commit()
+        self._remember(jti, user_id, revoked_at)
+
+    async def revoke_all(self, db: AsyncSession, user_id: UUID) -> None:
+        """Revoke every token issued to a user until now."""
+        revoked_at = datetime.now(timezone.utc)
+        expires_at = revoked_at + self.token_lifetime
+        db.add(RevokedToken(user_id=user_id, revoked_at=revoked_at, expires_at=expires_at))
+        await db.commit()
+        self._remember(None, user_id, revoked_at)
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Add the revocations made since the previous refresh, or rebuild the snapshot when it is due."""
+        now = self.clock()
+        rebuild = self._synced_at is None or now - self._rebuilt_at >= self.rebuild_interval
+        unexpired = RevokedToken.expires_at > datetime.fromtimestamp(now, timezone.utc)
+        statement = select(RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at).where(unexpired)
+        if not rebuild:
+            since = datetime.fromtimestamp(self._synced_at - SYNC_OVERLAP_SECONDS, timezone.utc)
+            statement = statement.where(RevokedToken.revoked_at >= since)
+        rows = (await db.execute(statement)).all()
+
+        if rebuild:
+            self.filter = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            self.cutoffs = {}
+            self._rebuilt_at = now
+        for jti, user_id, revoked_at in rows:
+            self._remember(jti, user_id, revoked_at)
+        self._synced_at = now
+
+        if rebuild:
+            await db.execute(delete(RevokedToken).where(~unexpired))
+            await db.commit()
+
+    async def _sync(self, session_factory: Callable[[], AsyncSession]) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self._refresh_with(session_factory)
+
+    async def _refresh_with(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Refresh in a session of its own, a database that cannot be reached keeps the current snapshot."""
+        db = session_factory()
+        try:
+            await self.refresh(db)
+        except (exc.SQLAlchemyError, OSError) as error:
+            logger.warning("Refreshing the revoked tokens failed: %s", error)
+        finally:
+            await db.close()
+
+    async def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Load the snapshot and keep refreshing it in the background."""
+        await self._refresh_with(session_factory)
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync(session_factory))
+
+    async def stop(self) -> None:
+        """Stop the background refresh."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    token_lifetime=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    refresh_interval=settings.REVOCATION_REFRESH_SECONDS,
+    rebuild_interval=settings.REVOCATION_REBUILD_SECONDS,
+)
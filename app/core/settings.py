@@ -1,23 +1,122 @@
+import os
+
+from decouple import Csv
 from decouple import config
 
 # App general settings
 API_PREFIX = "/api/v1"
 PROJECT_NAME = config("PROJECT_NAME", default="FIDO2 FastAPI")
 DEBUG = config("DEBUG", cast=bool, default=False)
+# Exposes /metrics in the Prometheus text format and enables hot-path instrumentation.
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=False)
+
+# Production server settings, see `python -m app.server`.
+# Number of worker processes, set by the launcher. Defaults to 1 so other entry points keep the full pools.
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", cast=int, default=1)
+SERVER_BIND = config("SERVER_BIND", default="0.0.0.0:8000")
+SERVER_PRELOAD = config("SERVER_PRELOAD", cast=bool, default=True)
+SERVER_GRACEFUL_TIMEOUT = config("SERVER_GRACEFUL_TIMEOUT", cast=int, default=30)
+SERVER_KEEPALIVE = config("SERVER_KEEPALIVE", cast=int, default=5)
+# Restart a worker after this many requests (with jitter), 0 never restarts.
+SERVER_MAX_REQUESTS = config("SERVER_MAX_REQUESTS", cast=int, default=0)
+# Load balancer addresses trusted to set X-Forwarded-For, comma separated or "*". Requests through them are attributed
+# to the forwarded client, so per-IP rate limits do not throttle all traffic behind a balancer together.
+FORWARDED_ALLOW_IPS = config("FORWARDED_ALLOW_IPS", default="127.0.0.1")
+
+# Cache lifetime of the authn HTML and JavaScript assets, revalidated through their ETags.
+STATIC_ASSETS_MAX_AGE = config("STATIC_ASSETS_MAX_AGE", cast=int, default=3600)
 
 # Database settings
 DATABASE_URL = config("DATABASE_URL")
-TEST_DATABASE_URL = config("TEST_DATABASE_URL")
-SQLALCHEMY_POOL_SIZE = config("SQLALCHEMY_POOL_SIZE", cast=int, default=20)
-SQLALCHEMY_MAX_OVERFLOW = config("SQLALCHEMY_MAX_OVERFLOW", cast=int, default=80)
+# "sync" runs the blocking driver in the threadpool, "async" uses a native asyncio driver.
+DATABASE_BACKEND = config("DATABASE_BACKEND", default="sync")
+ASYNC_DATABASE_URL = config(
+    "ASYNC_DATABASE_URL", default=DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+)
+# The tests run on a private in-memory SQLite database by default, a Postgres URL also runs the Postgres-only tests.
+TEST_DATABASE_URL = config("TEST_DATABASE_URL", default="sqlite://")
+# Pool sizes are totals for the host, split evenly between the WEB_CONCURRENCY worker processes.
+SQLALCHEMY_POOL_SIZE = max(1, config("SQLALCHEMY_POOL_SIZE", cast=int, default=20) // WEB_CONCURRENCY)
+SQLALCHEMY_MAX_OVERFLOW = config("SQLALCHEMY_MAX_OVERFLOW", cast=int, default=80) // WEB_CONCURRENCY
 SQLALCHEMY_POOL_TIMEOUT = config("SQLALCHEMY_POOL_TIMEOUT", cast=int, default=10)
+# Read replicas serving identity and credential lookups, each with its own pool of the sizes below.
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", cast=Csv(), default="")
+ASYNC_DATABASE_REPLICA_URLS = config(
+    "ASYNC_DATABASE_REPLICA_URLS",
+    cast=Csv(),
+    default=",".join(url.replace("postgresql://", "postgresql+asyncpg://", 1) for url in DATABASE_REPLICA_URLS),
+)
+SQLALCHEMY_REPLICA_POOL_SIZE = max(1, config("SQLALCHEMY_REPLICA_POOL_SIZE", cast=int, default=20) // WEB_CONCURRENCY)
+SQLALCHEMY_REPLICA_MAX_OVERFLOW = config("SQLALCHEMY_REPLICA_MAX_OVERFLOW", cast=int, default=80) // WEB_CONCURRENCY
+# Connections each worker opens per pool at startup, and whether they run the hot lookups once to prepare them.
+DATABASE_WARMUP_CONNECTIONS = config("DATABASE_WARMUP_CONNECTIONS", cast=int, default=4)
+DATABASE_WARMUP_PRIME = config("DATABASE_WARMUP_PRIME", cast=bool, default=True)
+# Seconds a replica that failed to connect is skipped, its reads go to the other replicas or the primary meanwhile.
+DATABASE_REPLICA_RETRY_SECONDS = config("DATABASE_REPLICA_RETRY_SECONDS", cast=float, default=30)
+# Seconds the reads of a user who just signed up or registered a credential stay on the primary, above replica lag.
+DATABASE_REPLICA_LAG_SECONDS = config("DATABASE_REPLICA_LAG_SECONDS", cast=float, default=5)
 
 # OAuth2 settings
 SECRET_KEY = config("SECRET_KEY")
+# HS256 signs with SECRET_KEY. ES256 and EdDSA sign with the key ring in JWT_KEYS_FILE, published at
+# /.well-known/jwks.json. A superseded key stays valid for JWT_KEY_OVERLAP_SECONDS after its successor takes over.
 ALGORITHM = config("ALGORITHM", default="HS256")
+JWT_KEYS_FILE = config("JWT_KEYS_FILE", default="")
 ACCESS_TOKEN_EXPIRE_MINUTES = config("ACCESS_TOKEN_EXPIRE_MINUTES", cast=int, default=30)
+REFRESH_TOKEN_EXPIRE_DAYS = config("REFRESH_TOKEN_EXPIRE_DAYS", cast=int, default=30)
+JWT_KEY_OVERLAP_SECONDS = config("JWT_KEY_OVERLAP_SECONDS", cast=int, default=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+JWKS_MAX_AGE = config("JWKS_MAX_AGE", cast=int, default=300)
 ISSUER = config("ISSUER", default="FIDO2 FastAPI")
 AUDIENCE = config("AUDIENCE", default="FIDO2 FastAPI")
+# Verified access token claims are cached in-process, 0 disables the cache.
+TOKEN_CACHE_SIZE = config("TOKEN_CACHE_SIZE", cast=int, default=10000)
+TOKEN_CACHE_TTL_SECONDS = config("TOKEN_CACHE_TTL_SECONDS", cast=int, default=300)
+# Revoked access tokens are checked against an in-process Bloom filter of their IDs, sized for the given capacity and
+# false positive rate, which only costs a query on a hit. Each process picks up revocations made elsewhere every
+# REVOCATION_REFRESH_SECONDS and rebuilds the filter without expired tokens every REVOCATION_REBUILD_SECONDS.
+REVOCATION_FILTER_CAPACITY = config("REVOCATION_FILTER_CAPACITY", cast=int, default=100000)
+REVOCATION_FILTER_ERROR_RATE = config("REVOCATION_FILTER_ERROR_RATE", cast=float, default=0.01)
+REVOCATION_REFRESH_SECONDS = config("REVOCATION_REFRESH_SECONDS", cast=float, default=5)
+REVOCATION_REBUILD_SECONDS = config("REVOCATION_REBUILD_SECONDS", cast=float, default=3600)
+
+# Cache settings
+# Shared key-value store for caches, e.g. redis://localhost:6379/0; empty keeps caches process-local.
+KV_STORE_URL = config("KV_STORE_URL", default="")
+# Users looked up by token are cached by id, 0 disables the cache.
+IDENTITY_CACHE_SIZE = config("IDENTITY_CACHE_SIZE", cast=int, default=10000)
+IDENTITY_CACHE_TTL_SECONDS = config("IDENTITY_CACHE_TTL_SECONDS", cast=int, default=60)
+
+# Password hashing settings
+# Number of hashing processes on the host, split between the worker processes. 0 runs hashing in the default
+# threadpool instead.
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=os.cpu_count() or 1)
+PASSWORD_HASH_WORKERS = max(1, PASSWORD_HASH_WORKERS // WEB_CONCURRENCY) if PASSWORD_HASH_WORKERS else 0
+# Start the hashing workers and load passlib in them in the background once the app starts serving.
+PASSWORD_HASH_PRELOAD = config("PASSWORD_HASH_PRELOAD", cast=bool, default=True)
+PASSWORD_HASH_MAX_PENDING = config("PASSWORD_HASH_MAX_PENDING", cast=int, default=64)
+PASSWORD_HASH_RETRY_AFTER = config("PASSWORD_HASH_RETRY_AFTER", cast=int, default=1)
+# Hash profile for new passwords, see `python -m app.commands.calibrate_hash`. Rounds and memory cost (argon2, KiB)
+# of 0 keep the passlib defaults. Hashes made with another scheme or cost are upgraded on the next login.
+PASSWORD_HASH_SCHEME = config("PASSWORD_HASH_SCHEME", default="sha256_crypt")
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", cast=int, default=0)
+PASSWORD_HASH_MEMORY_COST = config("PASSWORD_HASH_MEMORY_COST", cast=int, default=0)
+# Schemes still accepted for existing hashes.
+PASSWORD_HASH_LEGACY_SCHEMES = config("PASSWORD_HASH_LEGACY_SCHEMES", cast=Csv(), default="sha256_crypt,md5_crypt")
+
+# Rate limit settings
+# Token bucket rates as "<requests>/<second|minute|hour|day>", an empty value disables the rule.
+RATE_LIMIT_ENABLED = config("RATE_LIMIT_ENABLED", cast=bool, default=True)
+# Buckets are kept in process unless a redis:// URL shares them between workers.
+RATE_LIMIT_STORE_URL = config("RATE_LIMIT_STORE_URL", default=KV_STORE_URL)
+RATE_LIMIT_SHARDS = config("RATE_LIMIT_SHARDS", cast=int, default=64)
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", cast=int, default=100000)
+RATE_LIMIT_LOGIN_PER_IP = config("RATE_LIMIT_LOGIN_PER_IP", default="30/minute")
+RATE_LIMIT_LOGIN_PER_USERNAME = config("RATE_LIMIT_LOGIN_PER_USERNAME", default="10/minute")
+RATE_LIMIT_SIGNUP_PER_IP = config("RATE_LIMIT_SIGNUP_PER_IP", default="10/minute")
+
+# Bulk import settings
+USER_IMPORT_BATCH_SIZE = config("USER_IMPORT_BATCH_SIZE", cast=int, default=1000)
+CREDENTIAL_TRANSFER_BATCH_SIZE = config("CREDENTIAL_TRANSFER_BATCH_SIZE", cast=int, default=5000)
 
 # FIDO2 settings
 RP_ID = config("RP_ID", default="localhost")
@@ -25,3 +124,10 @@ RP_NAME = config("RP_NAME", default="FIDO2 FastAPI")
 USER_VERIFICATION = "preferred"
 AUTHENTICATOR_ATTACHMENT = "platform"
 EXPECTED_ORIGIN = config("EXPECTED_ORIGIN", default="http://localhost:8000")
+WEBAUTHN_CHALLENGE_TTL_SECONDS = config("WEBAUTHN_CHALLENGE_TTL_SECONDS", cast=int, default=300)
+# Parsed credential public keys kept in memory, so assertions skip COSE decoding.
+WEBAUTHN_KEY_CACHE_SIZE = config("WEBAUTHN_KEY_CACHE_SIZE", cast=int, default=10000)
+WEBAUTHN_KEY_CACHE_TTL_SECONDS = config("WEBAUTHN_KEY_CACHE_TTL_SECONDS", cast=int, default=3600)
+WEBAUTHN_CHALLENGE_CLEANUP_INTERVAL_SECONDS = config(
+    "WEBAUTHN_CHALLENGE_CLEANUP_INTERVAL_SECONDS", cast=int, default=60
+)
@@ -0,0 +1,72 @@
+import json
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Union
+from uuid import UUID
+
+from app.core import settings
+from app.core.cache import TTLCache
+from app.core.kv_store import KeyValueStore
+from app.core.kv_store import create_kv_store
+from app.models.user import User
+
+CACHED_USER_FIELDS = ("username", "email", "first_name", "last_name", "is_active", "is_superuser")
+
+
+class UserCache:
+    """Identity cache in front of primary key user lookups.
+
+    An in-process TTL layer is checked first, then the optional shared key-value store. Cached users are rebuilt as
+    transient ``User`` instances without the password hash.
+    """
+
+    key_prefix = "user:"
+
+    def __init__(self, local: TTLCache[str, Dict[str, Any]], shared: Optional[KeyValueStore], ttl: float):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+
+    @staticmethod
+    def _serialize(user: User) -> Dict[str, Any]:
+        data = {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+        data["id"] = str(user.id)
+        return data
+
+    @staticmethod
+    def _deserialize(data: Dict[str, Any]) -> User:
+        return User(**{**data, "id": UUID(data["id"])})
+
+    async def get(self, user_id: Union[UUID, str]) -> Optional[User]:
+        """Return the cached user."""
+        key = f"{self.key_prefix}{user_id}"
+        data = self.local.get(key)
+        if data is None and self.shared is not None:
+            raw = await self.shared.get(key)
+            if raw is not None:
+                data = json.loads(raw)
+                self.local.set(key, data)
+        return self._deserialize(data) if data is not None else None
+
+    async def set(self, user: User) -> None:
+        """Cache a user."""
+        key = f"{self.key_prefix}{user.id}"
+        data = self._serialize(user)
+        self.local.set(key, data)
+        if self.shared is not None:
+            await self.shared.set(key, json.dumps(data).encode(), self.ttl)
+
+    async def invalidate(self, user_id: Union[UUID, str]) -> None:
+        """Drop a user from every cache layer."""
+        key = f"{self.key_prefix}{user_id}"
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
+
+
+user_cache = UserCache(
+    local=TTLCache(maxsize=settings.IDENTITY_CACHE_SIZE, ttl=settings.IDENTITY_CACHE_TTL_SECONDS),
+    shared=create_kv_store(settings.KV_STORE_URL) if settings.IDENTITY_CACHE_SIZE else None,
+    ttl=settings.IDENTITY_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,53 @@
+from importlib import import_module
+from typing import Any
+from typing import Dict
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.functions import GenericFunction
+
+from app.core import settings
+
+# Dialects whose INSERT supports ON CONFLICT, the only dialect specific statements the app uses.
+UPSERT_DIALECTS = ("postgresql", "sqlite")
+
+
+def pool_options(url: str, **options: Any) -> Dict[str, Any]:
+    """Return the engine ``options`` for ``url``, or a pool of one connection for an in-memory SQLite database.
+
+    Every connection to ``sqlite://`` opens a new empty database, so all sessions and threads must share one. The pool
+    hands it to one session at a time, as sessions using it together would interleave their transactions and roll
+    back each other's writes. The database is private to its process and meant for the tests, so it is refused for
+    more than one ``WEB_CONCURRENCY`` worker.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        if settings.WEB_CONCURRENCY > 1:
+            raise ValueError("In-memory SQLite is private to each worker process, use a database server")
+        return {"poolclass": QueuePool, "pool_size": 1, "max_overflow": 0, "connect_args": {"check_same_thread": False}}
+    return options
+
+
+def upsert(db: Any, entity: Any) -> Any:
+    """Return an INSERT of ``entity`` supporting ``on_conflict_do_*`` for the dialect of the session's primary.
+
+    The dialect module is already loaded by the engine, the other dialects are never imported. Other dialects raise
+    ``ValueError``.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_DIALECTS:
+        raise ValueError(f"Unsupported dialect for upserts: {dialect}, expected one of {', '.join(UPSERT_DIALECTS)}")
+    return import_module(f"sqlalchemy.dialects.{dialect}").insert(entity)
+
+
+class greatest(GenericFunction):  # pylint: disable=invalid-name,too-many-ancestors
+    """The largest of its arguments, ``GREATEST`` on Postgres and the multi-argument ``MAX`` on SQLite."""
+
+    inherit_cache = True
+
+
+@compiles(greatest, "sqlite")
+def compile_greatest_sqlite(element: greatest, compiler: Any, **kwargs: Any) -> str:
+    """Render ``greatest`` as SQLite's scalar ``max``."""
+    return f"max({compiler.process(element.clauses, **kwargs)})"
@@ -0,0 +1,131 @@
+import itertools
+import logging
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TypeVar
+
+from sqlalchemy import event
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Execution option marking a read that may be served by a replica, e.g. ``select(...).execution_options(replica=True)``.
+REPLICA_OPTION = "replica"
+# Errors of an unreachable replica, asyncpg raises refused connections as plain OSErrors.
+REPLICA_CONNECTION_ERRORS = (exc.OperationalError, exc.InterfaceError, OSError)
+# Session info keys: the replica serving the session's reads, and whether the session is pinned to the primary.
+REPLICA_KEY = "replica"
+PRIMARY_KEY = "primary"
+
+
+class ReplicaSet:
+    """Read replica engines handed out round-robin, skipping replicas that recently failed to connect."""
+
+    def __init__(self, engines: List[Engine], retry_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._turn = itertools.count()
+        self._down_until: Dict[Engine, float] = {}
+
+    def choose(self) -> Optional[Engine]:
+        """Return the next healthy replica, or None when every replica is down."""
+        now = self.clock()
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._turn) % len(self.engines)]
+            if self._down_until.get(engine, 0.0) <= now:
+                return engine
+        return None
+
+    def mark_down(self, engine: Engine) -> None:
+        """Stop handing out ``engine`` for ``retry_seconds``."""
+        logger.warning("Read replica %s is unavailable, retrying in %ss", engine.url, self.retry_seconds)
+        self._down_until[engine] = self.clock() + self.retry_seconds
+
+
+class RoutingSession(Session):
+    """Session sending reads marked with the ``replica`` execution option to a read replica.
+
+    Everything else goes to the primary. The first replica read picks a replica that serves the session's remaining
+    replica reads, and a replica that cannot be reached is skipped in favour of the next one or the primary. Once the
+    session writes it is pinned to the primary, so it reads its own writes.
+    """
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._replica_bind: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        """Return the replica for marked reads and the primary for everything else."""
+        self._replica_bind = None
+        use_replica = kwargs.pop(REPLICA_OPTION, False)
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[PRIMARY_KEY] = True
+        elif use_replica and self.replicas is not None and not self.info.get(PRIMARY_KEY):
+            replica = self.info.get(REPLICA_KEY) or self.replicas.choose()
+            if replica is not None:
+                self.info[REPLICA_KEY] = self._replica_bind = replica
+                return replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _failover(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``method``, moving on to another replica or the primary when the replica's connection fails."""
+        while True:
+            try:
+                return method(*args, **kwargs)
+            except REPLICA_CONNECTION_ERRORS:
+                replica = self._replica_bind
+                if replica is None or self.replicas is None:
+                    raise
+                self.info.pop(REPLICA_KEY, None)
+                self.replicas.mark_down(replica)
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        """``Session.execute`` with replica failover."""
+        return self._failover(super().execute, *args, **kwargs)
+
+    def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        """``Session.scalar`` with replica failover."""
+        return self._failover(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args: Any, **kwargs: Any) -> Any:
+        """``Session.scalars`` with replica failover."""
+        return self._failover(super().scalars, *args, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def route_replica_reads(state: ORMExecuteState) -> None:
+    """Pass the ``replica`` execution option on to ``get_bind``."""
+    if state.is_select and state.execution_options.get(REPLICA_OPTION):
+        state.bind_arguments[REPLICA_OPTION] = True
+
+
+def pin_primary(info: Dict[str, Any]) -> bool:
+    """Pin a session to the primary, returning whether its reads were served by a replica until now."""
+    replica = info.pop(REPLICA_KEY, None)
+    info[PRIMARY_KEY] = True
+    return replica is not None
+
+
+async def read_your_writes(db: Any, read: Callable[[], Awaitable[T]]) -> T:
+    """Run a replica read, repeating it on the primary when the replica found nothing.
+
+    A user or credential created moments ago may not have reached the replicas yet, so only the primary is trusted to
+    say that a row does not exist.
+    """
+    result = await read()
+    if not result and pin_primary(db.info):
+        result = await read()
+    return result
@@ -1,7 +1,241 @@
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from typing import List
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import QueuePool
 
 from app.core import settings
+from app.core.metrics import instrument_engine
+from app.core.metrics import instrumented_pool_class
+from app.db.dialects import pool_options
+from app.db.routing import ReplicaSet
+from app.db.routing import RoutingSession
+from app.db.sync_adapter import SyncSessionAdapter
+from app.models import User
+from app.models import UserCredential
+
+logger = logging.getLogger(__name__)
+
+
+def create_db_engine(url: str, pool_size: int, max_overflow: int, metrics_name: Optional[str] = None) -> Engine:
+    """Create a pooled engine, every engine of the app is built here.
+
+    Engines given a ``metrics_name`` report their pool under that ``engine`` label.
+    """
+    db_engine = create_engine(
+        url,
+        **pool_options(
+            url,
+            poolclass=instrumented_pool_class(QueuePool) if metrics_name else QueuePool,
+            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,
+        ),
+    )
+    if metrics_name:
+        instrument_engine(db_engine, metrics_name, capacity=pool_size + max_overflow)
+    return db_engine
+
+
+def create_async_db_engine(
+    url: str, pool_size: int, max_overflow: int, metrics_name: Optional[str] = None
+) -> AsyncEngine:
+    """Create a pooled asyncio engine."""
+    db_engine = create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool) if metrics_name else AsyncAdaptedQueuePool,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,
+    )
+    if metrics_name:
+        instrument_engine(db_engine.sync_engine, metrics_name, capacity=pool_size + max_overflow)
+    return db_engine
+
+
+# Only the engines of the configured backend serve requests, so only theirs are instrumented.
+SYNC_BACKEND = settings.DATABASE_BACKEND != "async"
+engine: Engine = create_db_engine(
+    settings.DATABASE_URL,
+    settings.SQLALCHEMY_POOL_SIZE,
+    settings.SQLALCHEMY_MAX_OVERFLOW,
+    metrics_name="primary" if SYNC_BACKEND else None,
+)
+replica_engines: List[Engine] = [
+    create_db_engine(
+        url,
+        settings.SQLALCHEMY_REPLICA_POOL_SIZE,
+        settings.SQLALCHEMY_REPLICA_MAX_OVERFLOW,
+        metrics_name=f"replica-{index}" if SYNC_BACKEND else None,
+    )
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replicas=ReplicaSet(replica_engines, settings.DATABASE_REPLICA_RETRY_SECONDS) if replica_engines else None,
+)
+
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+async_replica_engines: List[AsyncEngine] = []
+if settings.DATABASE_BACKEND == "async":
+    async_engine = create_async_db_engine(
+        settings.ASYNC_DATABASE_URL,
+        settings.SQLALCHEMY_POOL_SIZE,
+        settings.SQLALCHEMY_MAX_OVERFLOW,
+        metrics_name="async",
+    )
+    async_replica_engines = [
+        create_async_db_engine(
+            url,
+            settings.SQLALCHEMY_REPLICA_POOL_SIZE,
+            settings.SQLALCHEMY_REPLICA_MAX_OVERFLOW,
+            metrics_name=f"async-replica-{index}",
+        )
+        for index, url in enumerate(settings.ASYNC_DATABASE_REPLICA_URLS)
+    ]
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        replicas=(
+            ReplicaSet(
+                [replica.sync_engine for replica in async_replica_engines], settings.DATABASE_REPLICA_RETRY_SECONDS
+            )
+            if async_replica_engines
+            else None
+        ),
+    )
+
+
+def new_session() -> AsyncSession:
+    """Open a session of the configured backend, a native ``AsyncSession`` or a wrapped blocking session."""
+    return AsyncSessionLocal() if AsyncSessionLocal is not None else SyncSessionAdapter(SessionLocal())
+
+
+@asynccontextmanager
+async def managed_session(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Use ``db``, rolling it back when the block fails and closing it afterwards."""
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+def prime_connection(connection: Connection) -> None:
+    """Run the hot lookups once with keys matching nothing.
+
+    This fills the engine's compiled statement cache and, with asyncpg, the connection's prepared statement cache.
+    The statements mirror the lookups of ``authenticate_user``, ``retrieve_user`` and the credential dependencies.
+    """
+    missing = uuid.UUID(int=0)
+    with Session(bind=connection) as session:
+        session.scalar(select(User).where(User.username == "").limit(1))
+        session.get(User, missing)
+        session.scalars(select(UserCredential).where(UserCredential.user_id == missing)).all()
+        session.scalar(
+            select(UserCredential)
+            .join(UserCredential.user)
+            .options(contains_eager(UserCredential.user))
+            .where(User.id == missing, UserCredential.credential_id_hash == b"")
+        )
+
+
+def warm_up_engine(db_engine: Engine, connections: int, prime: bool) -> int:
+    """Open up to ``connections`` pooled connections at once, never more than the pool keeps, and prime each of them.
+
+    Returns the number of distinct database connections opened.
+    """
+    opened = []
+    try:
+        for _ in range(min(connections, db_engine.pool.size())):
+            opened.append(db_engine.connect())
+        for connection in opened:
+            if prime:
+                prime_connection(connection)
+        return len({id(connection.connection.dbapi_connection) for connection in opened})
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def warm_up_async_engine(db_engine: AsyncEngine, connections: int, prime: bool) -> int:
+    """Open up to ``connections`` pooled connections concurrently, never more than the pool keeps, and prime each one.
+
+    Returns the number of distinct database connections opened.
+    """
+    connections = min(connections, db_engine.pool.size())
+    results = await asyncio.gather(*(db_engine.connect() for _ in range(connections)), return_exceptions=True)
+    opened = [result for result in results if not isinstance(result, BaseException)]
+    try:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        for connection in opened:
+            if prime:
+                await connection.run_sync(prime_connection)
+        return len({id(connection.sync_connection.connection.dbapi_connection) for connection in opened})
+    finally:
+        for connection in opened:
+            await connection.close()
+
+
+async def warm_up(
+    connections: int = settings.DATABASE_WARMUP_CONNECTIONS, prime: bool = settings.DATABASE_WARMUP_PRIME
+) -> None:
+    """Fill the pools before the first request, so it does not pay for connection setup.
+
+    A database that cannot be reached only logs a warning, the pools then connect on demand as before.
+    """
+    if connections <= 0:
+        return
+    start = time.perf_counter()
+    try:
+        if async_engine is not None:
+            opened = await warm_up_async_engine(async_engine, connections, prime)
+            for replica in async_replica_engines:
+                opened += await warm_up_async_engine(replica, connections, prime)
+        else:
+            opened = await asyncio.to_thread(warm_up_engine, engine, connections, prime)
+            for replica in replica_engines:
+                opened += await asyncio.to_thread(warm_up_engine, replica, connections, prime)
+    except (exc.SQLAlchemyError, OSError) as error:
+        logger.warning("Database warm-up failed, connecting on demand: %s", error)
+        return
+    logger.info("Warmed up %s database connections in %.3fs", opened, time.perf_counter() - start)
+
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async def dispose() -> None:
+    """Close the pooled connections of every engine."""
+    for db_engine in [engine, *replica_engines]:
+        db_engine.dispose()
+    for async_db_engine in [async_engine, *async_replica_engines]:
+        if async_db_engine is not None:
+            await async_db_engine.dispose()
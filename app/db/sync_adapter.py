@@ -0,0 +1,101 @@
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TypeVar
+
+from sqlalchemy.engine import Result
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+
+class SyncStreamResult:
+    """Async view of a streamed sync ``Result``, fetching each partition in the threadpool."""
+
+    def __init__(self, result: Result):
+        self.result = result
+
+    async def partitions(self, size: Optional[int] = None) -> AsyncIterator[List[Row]]:
+        """Yield lists of rows until the result is exhausted."""
+        while True:
+            rows = await run_in_threadpool(self.result.fetchmany, size)
+            if not rows:
+                break
+            yield rows
+
+
+class SyncSessionAdapter:
+    """Expose a blocking ``Session`` through the subset of the ``AsyncSession`` API used by the app.
+
+    Every call that may hit the database runs in the threadpool, so the sync backend does not stall the event loop.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def info(self) -> Dict[Any, Any]:
+        """The session's info dictionary."""
+        return self.sync_session.info
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Any:
+        """Return the engine or connection the session uses."""
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    def add(self, instance: Any) -> None:
+        """Add an instance to the session."""
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        """Add instances to the session."""
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement: Any, params: Optional[Any] = None, **kwargs: Any) -> Result:
+        """Execute a statement."""
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def stream(self, statement: Any, params: Optional[Any] = None, **kwargs: Any) -> SyncStreamResult:
+        """Execute a statement and stream its rows through a server-side cursor."""
+        kwargs["execution_options"] = {"stream_results": True, **kwargs.get("execution_options", {})}
+        return SyncStreamResult(await self.execute(statement, params, **kwargs))
+
+    async def scalar(self, statement: Any, params: Optional[Any] = None, **kwargs: Any) -> Any:
+        """Execute a statement and return the first column of the first row."""
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement: Any, params: Optional[Any] = None, **kwargs: Any) -> Any:
+        """Execute a statement and return the scalar results."""
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        """Return an instance by primary key."""
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def flush(self) -> None:
+        """Flush pending changes."""
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        """Commit the current transaction."""
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        """Roll back the current transaction."""
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance: Any) -> None:
+        """Refresh an instance from the database."""
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def close(self) -> None:
+        """Close the session."""
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a function taking the sync session in the threadpool."""
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
@@ -3,8 +3,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core import settings
+from app.db.dialects import pool_options
 
-test_engine = create_engine(settings.TEST_DATABASE_URL)
+# With the default in-memory SQLite URL every test process gets its own private database.
+test_engine = create_engine(settings.TEST_DATABASE_URL, **pool_options(settings.TEST_DATABASE_URL))
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 
@@ -1,27 +1,17 @@
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncIterator
 
-from app.core import settings
+from sqlalchemy.ext.asyncio import AsyncSession
 
-engine: Engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=settings.SQLALCHEMY_POOL_SIZE,
-    max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
-    pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from app.db.session import managed_session
+from app.db.session import new_session
 
 
-async def get_db() -> Session:
-    """Get database session."""
-    db: Session = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Get database session.
+
+    Depending on ``DATABASE_BACKEND`` this is either a native ``AsyncSession`` or a blocking session
+    wrapped in ``SyncSessionAdapter``; both expose the same awaitable API. Either routes reads marked with the
+    ``replica`` execution option to the read replicas when any are configured.
+    """
+    async with managed_session(new_session()) as db:
         yield db
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
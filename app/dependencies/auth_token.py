@@ -1,10 +1,13 @@
 from typing import Annotated
+from typing import Any
+from typing import Dict
 from typing import Union
 
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.errors import PermissionDeniedException
 from app.core.auth import user_auth
 from app.dependencies.auth_db import get_db
 from app.models import User
@@ -12,9 +15,24 @@ from app.models import User
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_current_user(
+async def get_token_claims(
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, Any]:
+    """Get verified access token claims without loading the user."""
+    return await user_auth.verify_access_token(db, token)
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_db),
 ) -> Union[User, None]:
     """Get current user."""
-    return user_auth.retrieve_user(db, token)
+    return await user_auth.retrieve_user(db, token)
+
+
+async def get_current_superuser(user: User = Depends(get_current_user)) -> User:
+    """Get current user, requiring superuser permissions."""
+    if not user.is_superuser:
+        raise PermissionDeniedException
+    return user
@@ -1,28 +1,45 @@
+from typing import Any
+from typing import Dict
 from typing import List
 from typing import Union
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
 from app.api.common import CustomAuthenticationCredential
 from app.api.errors import InvalidCredentialException
 from app.api.errors import UserCredentialsNotFound
+from app.core.auth import user_auth
+from app.core.recent_writes import recent_writes
+from app.db.routing import pin_primary
+from app.db.routing import read_your_writes
 from app.dependencies.auth_db import get_db
 from app.dependencies.auth_token import get_current_user
+from app.dependencies.auth_token import get_token_claims
 from app.models import User
 from app.models import UserCredential
 
 
-def get_current_user_credential(
+async def get_current_user_credential(
     credential: CustomAuthenticationCredential,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    claims: Dict[str, Any] = Depends(get_token_claims),
 ) -> Union[UserCredential, None]:
-    """Get current user credential."""
-    user_credential: Union[UserCredential, None] = (
-        db.query(UserCredential)
-        .filter(UserCredential.user_id == user.id, UserCredential.credential_id == credential.raw_id)
-        .scalar()
+    """Get current user credential together with its user in a single query."""
+    user_credential: Union[UserCredential, None] = await read_your_writes(
+        db,
+        lambda: db.scalar(
+            select(UserCredential)
+            .join(UserCredential.user)
+            .options(contains_eager(UserCredential.user))
+            .where(
+                user_auth.user_clause(claims),
+                UserCredential.credential_id_hash == UserCredential.hash_credential_id(credential.raw_id),
+            )
+            .execution_options(replica=True)
+        ),
     )
     if not user_credential:
         raise InvalidCredentialException
@@ -30,14 +47,48 @@ def get_current_user_credential(
     return user_credential
 
 
-def get_current_user_credentials(
-    db: Session = Depends(get_db),
+async def get_passkey_credential(
+    credential: CustomAuthenticationCredential,
+    db: AsyncSession = Depends(get_db),
+) -> UserCredential:
+    """Get the discoverable credential an assertion was made with, together with its user, without a prior login.
+
+    The credential is found through the index on its ID digest. The user handle returned by the authenticator must
+    name the credential's user, registration passes ``str(user.id)`` as the WebAuthn user ID.
+    """
+    user_credential: Union[UserCredential, None] = await read_your_writes(
+        db,
+        lambda: db.scalar(
+            select(UserCredential)
+            .join(UserCredential.user)
+            .options(contains_eager(UserCredential.user))
+            .where(UserCredential.credential_id_hash == UserCredential.hash_credential_id(credential.raw_id))
+            .execution_options(replica=True)
+        ),
+    )
+    if not user_credential or credential.response.user_handle != str(user_credential.user_id).encode():
+        raise InvalidCredentialException
+
+    return user_credential
+
+
+async def get_current_user_credentials(
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ) -> List[Union[UserCredential, None]]:
-    """Get current user credentials."""
-    user_credentials: List[Union[UserCredential, None]] = (
-        db.query(UserCredential).filter(UserCredential.user_id == user.id).all()
-    )
+    """Get current user credentials.
+
+    A replica may already list some of the credentials of a user who registered one moments ago, so the reads of
+    recent writers go to the primary.
+    """
+    if await recent_writes.contains(user.id):
+        pin_primary(db.info)
+
+    async def read() -> List[Union[UserCredential, None]]:
+        statement = select(UserCredential).where(UserCredential.user_id == user.id).execution_options(replica=True)
+        return (await db.scalars(statement)).all()
+
+    user_credentials = await read_your_writes(db, read)
 
     if not user_credentials:
         raise UserCredentialsNotFound
@@ -0,0 +1,31 @@
+from fastapi import Request
+
+from app.api.schemas.auth import UserLoginSchema
+from app.core import settings
+from app.core.rate_limit import Rate
+from app.core.rate_limit import rate_limiter
+
+LOGIN_PER_IP = Rate.parse(settings.RATE_LIMIT_LOGIN_PER_IP)
+LOGIN_PER_USERNAME = Rate.parse(settings.RATE_LIMIT_LOGIN_PER_USERNAME)
+SIGNUP_PER_IP = Rate.parse(settings.RATE_LIMIT_SIGNUP_PER_IP)
+
+
+def client_ip(request: Request) -> str:
+    """Client address, taken from X-Forwarded-For by uvicorn when the peer is listed in ``FORWARDED_ALLOW_IPS``."""
+    return request.client.host if request.client else "unknown"
+
+
+async def limit_login(request: Request, form_data: UserLoginSchema) -> None:
+    """Admit a login attempt, throttled per client IP and per username."""
+    await rate_limiter.check("login_ip", client_ip(request), LOGIN_PER_IP)
+    await rate_limiter.check("login_username", form_data.username.lower(), LOGIN_PER_USERNAME)
+
+
+async def limit_passkey_login(request: Request) -> None:
+    """Admit a passkey login ceremony, sharing the per client IP budget of password logins."""
+    await rate_limiter.check("login_ip", client_ip(request), LOGIN_PER_IP)
+
+
+async def limit_signup(request: Request) -> None:
+    """Admit a signup, throttled per client IP."""
+    await rate_limiter.check("signup_ip", client_ip(request), SIGNUP_PER_IP)
@@ -1,24 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
-from starlette.middleware import Middleware
-from starlette.middleware.sessions import SessionMiddleware
 
 from app.api.routes import api_router
+from app.api.v1 import jwks
+from app.api.v1 import metrics
 from app.core import settings
+from app.core.challenge_store import challenge_store
+from app.core.hashing import hashing_engine
+from app.core.metrics import MetricsMiddleware
+from app.core.revocation import revocation_list
+from app.db import session
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:  # pylint: disable=unused-argument
+    """Warm up the database pools and background tasks before serving, release them on shutdown.
+
+    The password hashing workers warm up in the background, so they do not delay the first response.
+    """
+    await challenge_store.start_cleanup()
+    await session.warm_up()
+    await revocation_list.start(session.new_session)
+    hashing_warm_up = asyncio.create_task(hashing_engine.warm_up()) if settings.PASSWORD_HASH_PRELOAD else None
+    yield
+    if hashing_warm_up is not None:
+        await hashing_warm_up
+    await revocation_list.stop()
+    await challenge_store.stop_cleanup()
+    hashing_engine.shutdown()
+    await session.dispose()
 
 
 def get_application() -> FastAPI:
     """Create FastAPI application."""
-    middleware = [
-        Middleware(
-            SessionMiddleware,
-            secret_key=settings.SECRET_KEY,
-            session_cookie=settings.PROJECT_NAME,
-            same_site="strict",
-            https_only=True,
-        )
-    ]
-    application = FastAPI(title=settings.PROJECT_NAME, debug=settings.DEBUG, middleware=middleware)
+    application = FastAPI(title=settings.PROJECT_NAME, debug=settings.DEBUG, lifespan=lifespan)
     application.include_router(api_router, prefix=settings.API_PREFIX)
+    application.include_router(jwks.router)
+    if settings.METRICS_ENABLED:
+        application.add_middleware(MetricsMiddleware)
+        application.include_router(metrics.router, tags=["metrics"])
 
     return application
 
@@ -1,2 +1,4 @@
+from app.models.refresh_token import RefreshToken  # noqa
+from app.models.revoked_token import RevokedToken  # noqa
 from app.models.user import User  # noqa
 from app.models.user_credential import UserCredential  # noqa
@@ -0,0 +1,34 @@
+import hashlib
+import uuid
+
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import ForeignKey
+from sqlalchemy import LargeBinary
+from sqlalchemy import Uuid
+
+from app.db.base_class import Base
+
+
+class RefreshToken(Base):
+    """Refresh token model.
+
+    Only the SHA-256 digest of the opaque token is stored. Every refresh consumes the token and issues a successor in
+    the same family, so presenting a consumed token again reveals a leak and revokes the whole family.
+    """
+
+    __tablename__ = "refresh_token"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(Uuid, nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True))
+    revoked_at = Column(DateTime(timezone=True))
+
+    @staticmethod
+    def hash_token(token: str) -> bytes:
+        """Digest under which a refresh token is stored and looked up."""
+        return hashlib.sha256(token.encode()).digest()
@@ -0,0 +1,25 @@
+import uuid
+
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import ForeignKey
+from sqlalchemy import Uuid
+
+from app.db.base_class import Base
+
+
+class RevokedToken(Base):
+    """Revoked access token model.
+
+    A row with a ``jti`` revokes that single token. A row without one is a logout everywhere, revoking every token of
+    the user issued before ``revoked_at``. Rows are only needed until ``expires_at``, when the tokens they revoke have
+    expired on their own.
+    """
+
+    __tablename__ = "revoked_token"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    jti = Column(Uuid, unique=True, index=True)
+    user_id = Column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,3 +1,4 @@
+import hashlib
 import uuid
 
 from sqlalchemy import CheckConstraint
@@ -5,33 +6,54 @@ from sqlalchemy import Column
 from sqlalchemy import ForeignKey
 from sqlalchemy import Integer
 from sqlalchemy import LargeBinary
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import Uuid
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import backref
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from webauthn.registration.verify_registration_response import VerifiedRegistration
 
+from app.api.errors import SignCountException
+from app.core.credential_keys import credential_key_cache
+from app.core.recent_writes import recent_writes
 from app.db.base_class import Base
 from app.models import User
 
 
+def credential_id_digest(context) -> bytes:
+    """Column default computing the SHA-256 digest of the credential ID being inserted."""
+    return hashlib.sha256(context.get_current_parameters()["credential_id"]).digest()
+
+
 class UserCredential(Base):
     """User Credential model."""
 
     __tablename__ = "user_credential"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
     public_key = Column(LargeBinary(), nullable=False)
     credential_id = Column(LargeBinary(), nullable=False)
+    # Fixed-width digest of the variable-length credential ID, used for indexed lookups.
+    credential_id_hash = Column(LargeBinary(32), nullable=False, unique=True, index=True, default=credential_id_digest)
     sign_count = Column(Integer(), CheckConstraint("sign_count >= 0"), default=0)
 
     user = relationship(
         "User", backref=backref("credentials", uselist=False, passive_deletes=True), foreign_keys=[user_id]
     )
 
+    @staticmethod
+    def hash_credential_id(credential_id: bytes) -> bytes:
+        """Return the digest stored in ``credential_id_hash``."""
+        return hashlib.sha256(credential_id).digest()
+
     @classmethod
-    def create_credential(cls, db: Session, user: User, registration_data: VerifiedRegistration) -> "UserCredential":
+    async def create_credential(
+        cls, db: AsyncSession, user: User, registration_data: VerifiedRegistration
+    ) -> "UserCredential":
         """Create user credential."""
         user_credential: UserCredential = cls(
             user_id=user.id,
@@ -39,11 +61,40 @@ class UserCredential(Base):
             credential_id=registration_data.credential_id,
         )
         db.add(user_credential)
-        db.commit()
+        await db.commit()
+        await recent_writes.mark(user.id)
         return user_credential
 
-    def update_sign_count(self, db: Session, sign_count: int) -> None:
-        """Increment sign count."""
-        self.sign_count = sign_count
-        db.add(self)
-        db.commit()
+    async def update_sign_count(self, db: AsyncSession, sign_count: int) -> None:
+        """Increment sign count.
+
+        The count is only advanced when it is lower than the new value, in a single conditional statement, so of
+        two concurrent assertions with the same counter only one succeeds. Authenticators without a counter always
+        report 0, which is accepted as long as the stored count is 0 too.
+        """
+        if sign_count == 0 and not self.sign_count:
+            return
+
+        updated_sign_count = (
+            await db.execute(
+                update(UserCredential)
+                .where(
+                    UserCredential.id == self.id,
+                    func.coalesce(UserCredential.sign_count, 0) < sign_count,  # pylint: disable=not-callable
+                )
+                .values(sign_count=sign_count)
+                .returning(UserCredential.sign_count)
+                .execution_options(synchronize_session=False)
+            )
+        ).scalar_one_or_none()
+        await db.commit()
+
+        if updated_sign_count is None:
+            raise SignCountException
+        set_committed_value(self, "sign_count", updated_sign_count)
+
+
+@event.listens_for(UserCredential, "after_delete")
+def invalidate_parsed_key(mapper, connection, target: UserCredential) -> None:  # pylint: disable=unused-argument
+    """Drop the parsed public key of a deleted credential."""
+    credential_key_cache.invalidate(target.credential_id_hash)
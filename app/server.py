@@ -0,0 +1,95 @@
+"""Production entry point: gunicorn managing uvicorn workers.
+
+Usage: python -m app.server
+
+Workers default to the CPU count and can be set with WEB_CONCURRENCY. The database pools and hashing processes
+configured in the settings are host-wide totals that every worker gets an equal share of. Workers use uvloop and
+httptools when they are installed.
+
+Send SIGHUP for a graceful rolling restart of the workers, SIGTERM for a graceful shutdown. With SERVER_PRELOAD the
+app is imported once in the master, so deploying new code needs a full restart.
+"""
+import importlib.util
+import logging
+import os
+from typing import Any
+from typing import Dict
+
+from decouple import config
+from gunicorn.app.base import BaseApplication
+from gunicorn.util import import_app
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def default_workers() -> int:
+    """Number of workers, WEB_CONCURRENCY or one per CPU."""
+    return max(1, config("WEB_CONCURRENCY", cast=int, default=os.cpu_count() or 1))
+
+
+def post_fork(server, worker) -> None:  # pylint: disable=unused-argument
+    """Drop connections inherited from the master, a forked socket must never be shared between processes."""
+    from app.db import session  # pylint: disable=import-outside-toplevel
+
+    for engine in [session.engine, *session.replica_engines]:
+        engine.dispose(close=False)
+    for async_engine in [session.async_engine, *session.async_replica_engines]:
+        if async_engine is not None:
+            async_engine.sync_engine.dispose(close=False)
+
+
+def when_ready(server) -> None:  # pylint: disable=unused-argument
+    """Log the event loop and HTTP parser the workers pick."""
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info("Serving with %s and %s", loop, http)
+
+
+def server_options(workers: int) -> Dict[str, Any]:
+    """Gunicorn settings for ``workers`` uvicorn workers."""
+    from app.core import settings  # pylint: disable=import-outside-toplevel
+
+    return {
+        "bind": settings.SERVER_BIND,
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": settings.SERVER_PRELOAD,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS // 10,
+        "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+        "post_fork": post_fork,
+        "when_ready": when_ready,
+    }
+
+
+class Server(BaseApplication):
+    """Gunicorn application configured from the settings instead of a config file."""
+
+    def __init__(self, app_uri: str, options: Dict[str, Any]):
+        self.app_uri = app_uri
+        self.options = options
+        super().__init__()
+
+    def init(self, parser, opts, args):
+        """Unused, the configuration comes from ``load_config``."""
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return import_app(self.app_uri)
+
+
+def main() -> None:
+    """Run the server."""
+    workers = default_workers()
+    # Settings split the pools by WEB_CONCURRENCY, so it must be set before anything imports them.
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    Server("app.main:app", server_options(workers)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import base64
+import hashlib
+import json
+import os
+import struct
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+import cbor2
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+
+FLAG_USER_PRESENT = 0x01
+FLAG_USER_VERIFIED = 0x04
+FLAG_ATTESTED_CREDENTIAL_DATA = 0x40
+
+
+def b64encode(data: bytes) -> str:
+    """Encode bytes the way the endpoints expect them."""
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def b64decode(string: str) -> bytes:
+    """Decode an unpadded base64url string."""
+    return base64.urlsafe_b64decode(string + "=" * (-len(string) % 4))
+
+
+class SoftwareAuthenticator:
+    """Software FIDO2 authenticator with a single ES256 credential.
+
+    Produces ``none`` attestation registrations and assertions accepted by ``webauthn`` verification.
+    """
+
+    def __init__(self, origin: str, credential_id: Optional[bytes] = None, user_verifying: bool = True):
+        self.origin = origin
+        self.credential_id = credential_id or os.urandom(32)
+        self.user_verifying = user_verifying
+        self.private_key = ec.generate_private_key(ec.SECP256R1())
+        self.sign_count = 0
+        self.user_handle: Optional[bytes] = None
+
+    def _cose_public_key(self) -> bytes:
+        numbers = self.private_key.public_key().public_numbers()
+        return cbor2.dumps({1: 2, 3: -7, -1: 1, -2: numbers.x.to_bytes(32, "big"), -3: numbers.y.to_bytes(32, "big")})
+
+    def _client_data(self, ceremony: str, challenge: str) -> bytes:
+        return json.dumps(
+            {"type": ceremony, "challenge": challenge.rstrip("="), "origin": self.origin, "crossOrigin": False}
+        ).encode()
+
+    def _authenticator_data(self, rp_id: str, flags: int, attested_credential_data: bytes = b"") -> bytes:
+        self.sign_count += 1
+        rp_id_hash = hashlib.sha256(rp_id.encode()).digest()
+        return rp_id_hash + bytes([flags]) + struct.pack(">I", self.sign_count) + attested_credential_data
+
+    def create(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer ``navigator.credentials.create()`` options with a registration credential."""
+        self.user_handle = b64decode(options["user"]["id"])
+        attested_credential_data = (
+            bytes(16) + struct.pack(">H", len(self.credential_id)) + self.credential_id + self._cose_public_key()
+        )
+        authenticator_data = self._authenticator_data(
+            options["rp"]["id"], FLAG_USER_PRESENT | FLAG_ATTESTED_CREDENTIAL_DATA, attested_credential_data
+        )
+        attestation_object = cbor2.dumps({"fmt": "none", "attStmt": {}, "authData": authenticator_data})
+        return {
+            "id": b64encode(self.credential_id).rstrip("="),
+            "rawId": b64encode(self.credential_id),
+            "response": {
+                "attestationObject": b64encode(attestation_object),
+                "clientDataJSON": b64encode(self._client_data("webauthn.create", options["challenge"])),
+            },
+            "type": "public-key",
+        }
+
+    def get(self, options: Dict[str, Any], rp_id: Optional[str] = None) -> Dict[str, Any]:
+        """Answer ``navigator.credentials.get()`` options with an ES256 assertion."""
+        client_data = self._client_data("webauthn.get", options["challenge"])
+        flags = FLAG_USER_PRESENT | (FLAG_USER_VERIFIED if self.user_verifying else 0)
+        authenticator_data = self._authenticator_data(rp_id or options["rpId"], flags)
+        signature = self.private_key.sign(
+            authenticator_data + hashlib.sha256(client_data).digest(), ec.ECDSA(hashes.SHA256())
+        )
+        response = {
+            "authenticatorData": b64encode(authenticator_data),
+            "clientDataJSON": b64encode(client_data),
+            "signature": b64encode(signature),
+        }
+        if self.user_handle is not None:
+            response["userHandle"] = b64encode(self.user_handle)
+        return {
+            "id": b64encode(self.credential_id).rstrip("="),
+            "rawId": b64encode(self.credential_id),
+            "response": response,
+            "type": "public-key",
+        }
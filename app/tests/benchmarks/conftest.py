@@ -0,0 +1,61 @@
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager
+from typing import AsyncIterator
+from typing import Callable
+from typing import Iterator
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import settings
+from app.core.rate_limit import rate_limiter
+from app.db.base_class import Base
+from app.db.session import managed_session
+from app.db.sync_adapter import SyncSessionAdapter
+from app.db.test_session import TestingSessionLocal
+from app.db.test_session import test_engine
+from app.dependencies.auth_db import get_db
+from app.main import app
+
+
+@pytest.fixture()
+def load_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[Callable[[], AsyncContextManager[httpx.AsyncClient]]]:
+    """Open an async client for concurrent load, with a committed session per request on the test database.
+
+    The client and its engine are opened and closed inside the event loop of the test. Rate limiting is off, as
+    every simulated user shares one client address.
+    """
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+
+    @asynccontextmanager
+    async def open_client() -> AsyncIterator[httpx.AsyncClient]:
+        async_engine = None
+        if settings.DATABASE_BACKEND == "async":
+            async_engine = create_async_engine(
+                settings.TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+                pool_size=settings.SQLALCHEMY_POOL_SIZE,
+                max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
+            )
+            session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def override_get_db() -> AsyncIterator:
+            db = session_factory() if async_engine is not None else SyncSessionAdapter(TestingSessionLocal())
+            async with managed_session(db):
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+                yield client
+        finally:
+            del app.dependency_overrides[get_db]
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    yield open_client
+
+    with test_engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):  # pylint: disable=no-member
+            connection.execute(table.delete())
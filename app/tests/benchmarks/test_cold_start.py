@@ -0,0 +1,114 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import httpx
+
+from app.core import settings
+from app.tests.benchmarks.utils import record_results
+from app.tests.benchmarks.utils import requires_benchmark
+from app.tests.benchmarks.utils import summarize
+from app.tests.utils import requires_postgres
+
+CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "16"))
+BURSTS = int(os.getenv("BENCHMARK_COLD_START_BURSTS", "10"))
+WARMUP_CONNECTIONS = int(os.getenv("BENCHMARK_WARMUP_CONNECTIONS", "16"))
+# A burst counts as fast once all its responses are within this factor of the steady state p95.
+FAST_FACTOR = float(os.getenv("BENCHMARK_FAST_FACTOR", "1.5"))
+STARTUP_TIMEOUT = 30.0
+
+
+def free_port() -> int:
+    """Return a port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client: httpx.AsyncClient, started: float) -> float:
+    """Poll the health endpoint and return the seconds from launch until it answers."""
+    while time.perf_counter() - started < STARTUP_TIMEOUT:
+        try:
+            if (await client.get(f"{settings.API_PREFIX}/health")).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.01)
+    raise TimeoutError("The server did not start")
+
+
+async def bursts(client: httpx.AsyncClient, started: float) -> List[Tuple[float, List[float]]]:
+    """Send ``BURSTS`` bursts of concurrent logins of an unknown user, a database read without hashing.
+
+    Returns the completion time of every burst since launch together with its request latencies.
+    """
+    results: List[Tuple[float, List[float]]] = []
+
+    async def login() -> float:
+        start = time.perf_counter()
+        response = await client.post(
+            f"{settings.API_PREFIX}/auth/token", json={"username": "cold-start", "password": "password"}
+        )
+        assert response.status_code == 400, response.text
+        return time.perf_counter() - start
+
+    for _ in range(BURSTS):
+        latencies = await asyncio.gather(*(login() for _ in range(CONCURRENCY)))
+        results.append((time.perf_counter() - started, list(latencies)))
+    return results
+
+
+async def measure(warmup_connections: int) -> Dict:
+    """Launch the app with ``warmup_connections`` and measure its first responses."""
+    port = free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": settings.TEST_DATABASE_URL,
+        "DATABASE_WARMUP_CONNECTIONS": str(warmup_connections),
+        "RATE_LIMIT_ENABLED": "false",
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    try:
+        limits = httpx.Limits(max_connections=CONCURRENCY)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            ready = await wait_until_ready(client, started)
+            samples = await bursts(client, started)
+    finally:
+        server.terminate()
+        server.wait()
+
+    half = len(samples) // 2
+    steady = summarize([latency for _, latencies in samples[half:] for latency in latencies])
+    fast_limit = steady["p95_ms"] * FAST_FACTOR / 1000
+    first_fast = next((finished for finished, latencies in samples if max(latencies) <= fast_limit), None)
+    return {
+        "warmup_connections": warmup_connections,
+        "ready_seconds": ready,
+        "first_burst": summarize(samples[0][1]),
+        "steady": steady,
+        "time_to_first_fast_response_seconds": first_fast,
+    }
+
+
+@requires_benchmark
+@requires_postgres
+def test_cold_start():
+    """Measure time to the first fast response after launch, with cold pools and with warmed pools."""
+    results = {
+        "backend": settings.DATABASE_BACKEND,
+        "concurrency": CONCURRENCY,
+        "cold": asyncio.run(measure(0)),
+        "warm": asyncio.run(measure(WARMUP_CONNECTIONS)),
+    }
+    record_results("cold_start", results)
+
+    assert results["warm"]["first_burst"]["max_ms"] <= results["cold"]["first_burst"]["max_ms"]
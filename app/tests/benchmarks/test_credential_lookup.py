@@ -0,0 +1,87 @@
+import os
+import random
+import time
+from typing import Callable
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import UserCredential
+from app.tests.benchmarks.utils import record_results
+from app.tests.benchmarks.utils import requires_benchmark
+from app.tests.benchmarks.utils import summarize
+from app.tests.utils import requires_postgres
+
+CREDENTIALS = int(os.getenv("BENCHMARK_CREDENTIALS", "1000000"))
+USERS = max(1, CREDENTIALS // 4)
+LOOKUPS = int(os.getenv("BENCHMARK_LOOKUPS", "500"))
+
+
+def _measure(lookup: Callable[[int], object], samples: List[int]) -> List[float]:
+    timings = []
+    for sample in samples:
+        start = time.perf_counter()
+        lookup(sample)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+@requires_benchmark
+@requires_postgres
+def test_credential_lookup_latency(db_session: Session):
+    """Measure credential lookups by user and credential ID hash against the unindexed raw ID filter."""
+    db_session.execute(
+        text(
+            'INSERT INTO "user" (id, username, email, is_active, is_superuser) '
+            "SELECT md5('user' || i)::uuid, 'user' || i, 'user' || i || '@example.com', true, false "
+            "FROM generate_series(1, :users) AS i"
+        ),
+        {"users": USERS},
+    )
+    db_session.execute(
+        text(
+            "INSERT INTO user_credential (id, user_id, public_key, credential_id, credential_id_hash, sign_count) "
+            "SELECT md5('credential' || i)::uuid, md5('user' || (i % :users + 1))::uuid, '\\x00', "
+            "decode(md5(i::text), 'hex'), sha256(decode(md5(i::text), 'hex')), 0 "
+            "FROM generate_series(1, :credentials) AS i"
+        ),
+        {"users": USERS, "credentials": CREDENTIALS},
+    )
+    db_session.execute(text('ANALYZE "user"'))
+    db_session.execute(text("ANALYZE user_credential"))
+    samples = [random.randint(1, CREDENTIALS) for _ in range(LOOKUPS)]
+    credentials = {
+        i: db_session.execute(
+            text("SELECT user_id, credential_id FROM user_credential WHERE id = md5('credential' || :i)::uuid"),
+            {"i": i},
+        ).one()
+        for i in samples
+    }
+
+    def by_hash(i: int) -> object:
+        user_id, credential_id = credentials[i]
+        return db_session.scalar(
+            select(UserCredential).where(
+                UserCredential.user_id == user_id,
+                UserCredential.credential_id_hash == UserCredential.hash_credential_id(credential_id),
+            )
+        )
+
+    def by_user(i: int) -> object:
+        return db_session.scalars(select(UserCredential).where(UserCredential.user_id == credentials[i][0])).all()
+
+    def by_raw_id(i: int) -> object:
+        return db_session.scalar(select(UserCredential).where(UserCredential.credential_id == credentials[i][1]))
+
+    results = {
+        "credentials": CREDENTIALS,
+        "users": USERS,
+        "by_credential_id_hash": summarize(_measure(by_hash, samples)),
+        "by_user_id": summarize(_measure(by_user, samples)),
+        "by_raw_credential_id_unindexed": summarize(_measure(by_raw_id, samples[: max(1, LOOKUPS // 50)])),
+    }
+    record_results("credential_lookup", results)
+
+    assert results["by_credential_id_hash"]["p50_ms"] < results["by_raw_credential_id_unindexed"]["p50_ms"]
@@ -0,0 +1,76 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from app.core import settings
+from app.tests.benchmarks.utils import record_results
+from app.tests.benchmarks.utils import requires_benchmark
+
+RUNS = int(os.getenv("BENCHMARK_IMPORT_RUNS", "5"))
+TOP = int(os.getenv("BENCHMARK_IMPORT_TOP", "15"))
+# Modules left out of the app's import, loaded by the code paths that need them.
+LAZY_MODULES = ("passlib",)
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+
+def import_app() -> Tuple[float, Dict[str, Dict[str, float]]]:
+    """Import the app in a fresh interpreter.
+
+    Returns the milliseconds the interpreter ran, and the self and cumulative milliseconds of every module.
+    """
+    env = {**os.environ, "DATABASE_URL": settings.TEST_DATABASE_URL}
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    modules = {}
+    for line in output.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            modules[name] = {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000}
+    return process_ms, modules
+
+
+def top(costs: Dict[str, List[float]]) -> Dict[str, float]:
+    """Return the ``TOP`` most expensive entries by their median cost."""
+    medians = {name: statistics.median(samples) for name, samples in costs.items()}
+    return dict(sorted(medians.items(), key=lambda item: item[1], reverse=True)[:TOP])
+
+
+@requires_benchmark
+def test_import_time():
+    """Measure the import of the app per module and per top level package."""
+    runs = [import_app() for _ in range(RUNS)]
+    modules: Dict[str, List[float]] = defaultdict(list)
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for _, run in runs:
+        per_package: Dict[str, float] = defaultdict(float)
+        for name, cost in run.items():
+            modules[name].append(cost["self_ms"])
+            per_package[name.split(".")[0]] += cost["self_ms"]
+        for package, cost in per_package.items():
+            packages[package].append(cost)
+
+    results = {
+        "runs": RUNS,
+        "process_ms": statistics.median(process_ms for process_ms, _ in runs),
+        "app_main_ms": statistics.median(run["app.main"]["cumulative_ms"] for _, run in runs),
+        "packages_self_ms": top(packages),
+        "modules_self_ms": top(modules),
+    }
+    record_results("import_time", results)
+
+    assert not [name for name in modules if name.split(".")[0] in LAZY_MODULES]
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Callable
+from typing import List
+
+import webauthn
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+from webauthn.helpers.structs import AuthenticatorSelectionCriteria
+from webauthn.helpers.structs import PublicKeyCredentialCreationOptions
+from webauthn.helpers.structs import PublicKeyCredentialDescriptor
+from webauthn.helpers.structs import PublicKeyCredentialRequestOptions
+from webauthn.helpers.structs import ResidentKeyRequirement
+
+from app.api.common import FastJSONResponse
+from app.api.common import WebAuthnOptionsResponse
+from app.api.schemas.auth import PydanticUser
+from app.core import settings
+from app.models import User
+from app.tests.benchmarks.utils import record_results
+from app.tests.benchmarks.utils import requires_benchmark
+from app.tests.benchmarks.utils import summarize
+
+ITERATIONS = int(os.getenv("BENCHMARK_RENDER_ITERATIONS", "5000"))
+
+
+def _measure(render: Callable[[], bytes]) -> List[float]:
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _compare(payload: object, response_model: type, fast_path: Callable[[], bytes]) -> dict:
+    """Time FastAPI's response model validation and encoding against ``fast_path`` rendering the same payload."""
+    field = create_response_field(name="response", type_=response_model)
+    loop = asyncio.new_event_loop()
+
+    def validated() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=payload, is_coroutine=True))
+        return JSONResponse(content).body
+
+    try:
+        baseline = summarize(_measure(validated))
+    finally:
+        loop.close()
+    fast = summarize(_measure(fast_path))
+    return {"response_model": baseline, "direct": fast, "saved_mean_ms": baseline["mean_ms"] - fast["mean_ms"]}
+
+
+@requires_benchmark
+def test_response_rendering():
+    """Measure the per-request saving of rendering options and user payloads straight to JSON bytes."""
+    registration = webauthn.generate_registration_options(
+        rp_id=settings.RP_ID,
+        rp_name=settings.RP_NAME,
+        user_id=str(uuid.uuid4()),
+        user_name="user@example.com",
+        user_display_name="user",
+        authenticator_selection=AuthenticatorSelectionCriteria(resident_key=ResidentKeyRequirement.DISCOURAGED),
+    )
+    authentication = webauthn.generate_authentication_options(
+        rp_id=settings.RP_ID,
+        allow_credentials=[PublicKeyCredentialDescriptor(id=os.urandom(64)) for _ in range(4)],
+    )
+    user = User(
+        id=uuid.uuid4(),
+        username="user",
+        email="user@example.com",
+        first_name="First",
+        last_name="Last",
+        is_active=True,
+        is_superuser=False,
+    )
+
+    results = {
+        "iterations": ITERATIONS,
+        "register_public_key": _compare(
+            registration, PublicKeyCredentialCreationOptions, lambda: WebAuthnOptionsResponse(registration).body
+        ),
+        "auth_public_key": _compare(
+            authentication, PublicKeyCredentialRequestOptions, lambda: WebAuthnOptionsResponse(authentication).body
+        ),
+        "me": _compare(
+            user,
+            PydanticUser,
+            lambda: FastJSONResponse({field: getattr(user, field) for field in PydanticUser.__fields__}).body,
+        ),
+    }
+    record_results("response_rendering", results)
+
+    for name in ("register_public_key", "auth_public_key", "me"):
+        assert results[name]["direct"]["mean_ms"] < results[name]["response_model"]["mean_ms"]
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import timedelta
+from typing import Any
+from typing import Dict
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.core.revocation import RevocationList
+from app.db.sync_adapter import SyncSessionAdapter
+from app.models import RevokedToken
+from app.tests.benchmarks.utils import record_results
+from app.tests.benchmarks.utils import requires_benchmark
+from app.tests.benchmarks.utils import summarize
+
+REVOKED = int(os.getenv("BENCHMARK_REVOKED_TOKENS", "100000"))
+CHECKS = int(os.getenv("BENCHMARK_REVOCATION_CHECKS", "2000"))
+
+
+@requires_benchmark
+def test_revocation_check_latency(db_session: Session):
+    """Measure the revocation check of a valid token against the snapshot and against a query per request."""
+    revocation_list = RevocationList(
+        capacity=REVOKED,
+        error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+        token_lifetime=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        refresh_interval=settings.REVOCATION_REFRESH_SECONDS,
+        rebuild_interval=settings.REVOCATION_REBUILD_SECONDS,
+    )
+    for _ in range(REVOKED):
+        revocation_list.filter.add(str(uuid.uuid4()).encode())
+    claims: List[Dict[str, Any]] = [
+        {"uid": str(uuid.uuid4()), "jti": str(uuid.uuid4()), "iat": time.time()} for _ in range(CHECKS)
+    ]
+
+    async def check_snapshot() -> List[float]:
+        # False positives of the filter are confirmed with the same query.
+        db = SyncSessionAdapter(db_session)
+        timings = []
+        for claim in claims:
+            start = time.perf_counter()
+            await revocation_list.is_revoked(db, claim)
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    query_timings = []
+    for claim in claims:
+        start = time.perf_counter()
+        db_session.scalar(select(RevokedToken.id).where(RevokedToken.jti == uuid.UUID(claim["jti"])))
+        query_timings.append(time.perf_counter() - start)
+
+    results = {
+        "revoked_tokens": REVOKED,
+        "filter_bytes": len(revocation_list.filter.bits),
+        "snapshot": summarize(asyncio.run(check_snapshot())),
+        "query": summarize(query_timings),
+        "confirmations": revocation_list.confirmations,
+    }
+    record_results("revocation_check", results)
+
+    assert results["snapshot"]["p50_ms"] < results["query"]["p50_ms"]
+    assert revocation_list.confirmations < CHECKS * settings.REVOCATION_FILTER_ERROR_RATE * 3
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import AsyncContextManager
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import httpx
+
+from app.core import settings
+from app.tests.authenticator import SoftwareAuthenticator
+from app.tests.benchmarks.utils import find_regressions
+from app.tests.benchmarks.utils import record_results
+from app.tests.benchmarks.utils import requires_benchmark
+from app.tests.benchmarks.utils import summarize
+from app.tests.utils import requires_postgres
+
+CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "16"))
+USERS = int(os.getenv("BENCHMARK_USERS", "100"))
+
+
+class Recorder:
+    """Collects per-endpoint latencies and failures."""
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, name: str, expected_status: int, send) -> httpx.Response:
+        """Send a request and record its latency under ``name``."""
+        start = time.perf_counter()
+        response = await send()
+        self.timings[name].append(time.perf_counter() - start)
+        if response.status_code != expected_status:
+            self.errors[name] += 1
+            raise RuntimeError(f"{name} answered {response.status_code}: {response.text}")
+        return response
+
+
+async def user_flow(client: httpx.AsyncClient, recorder: Recorder, index: int) -> None:
+    """Run signup, login, registration and authentication for one user."""
+    user = {"username": f"user{index}", "email": f"user{index}@example.com", "password": "password"}
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    prefix = settings.API_PREFIX
+
+    await recorder.request("signup", 201, lambda: client.post(f"{prefix}/auth/signup", json=user))
+    token = await recorder.request(
+        "token", 200, lambda: client.post(f"{prefix}/auth/token", json={**user, "email": None})
+    )
+    headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+    options = await recorder.request(
+        "register/public_key", 200, lambda: client.get(f"{prefix}/authn/register/public_key", headers=headers)
+    )
+    credential = authenticator.create(options.json())
+    await recorder.request(
+        "register", 201, lambda: client.post(f"{prefix}/authn/register", headers=headers, json=credential)
+    )
+    options = await recorder.request(
+        "auth/public_key", 200, lambda: client.get(f"{prefix}/authn/auth/public_key", headers=headers)
+    )
+    assertion = authenticator.get(options.json())
+    await recorder.request("auth", 200, lambda: client.post(f"{prefix}/authn/auth", headers=headers, json=assertion))
+
+
+async def run_load(client: httpx.AsyncClient) -> Dict:
+    """Drive ``USERS`` flows with at most ``CONCURRENCY`` in flight."""
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def bounded(index: int) -> None:
+        async with semaphore:
+            await user_flow(client, recorder, index)
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(bounded(index) for index in range(USERS)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    requests = sum(len(samples) for samples in recorder.timings.values())
+
+    return {
+        "backend": settings.DATABASE_BACKEND,
+        "concurrency": CONCURRENCY,
+        "users": USERS,
+        "failed_flows": sum(isinstance(outcome, Exception) for outcome in outcomes),
+        "elapsed_seconds": elapsed,
+        "throughput_rps": requests / elapsed,
+        "endpoints": {
+            name: {**summarize(samples), "errors": recorder.errors[name]} for name, samples in recorder.timings.items()
+        },
+    }
+
+
+@requires_benchmark
+@requires_postgres
+def test_webauthn_flow_load(load_client: Callable[[], AsyncContextManager[httpx.AsyncClient]]):
+    """Measure throughput and per-endpoint latency of the signup to WebAuthn authentication flow."""
+
+    async def run() -> Dict:
+        async with load_client() as client:
+            return await run_load(client)
+
+    results = asyncio.run(run())
+    record_results("webauthn_flow", results)
+
+    assert results["failed_flows"] == 0
+    assert not find_regressions(results)
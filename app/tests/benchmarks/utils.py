@@ -0,0 +1,65 @@
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+
+import pytest
+
+requires_benchmark = pytest.mark.skipif(
+    not os.getenv("RUN_BENCHMARKS"), reason="benchmarks only run with RUN_BENCHMARKS=1"
+)
+
+RESULTS_DIR = Path(os.getenv("BENCHMARK_RESULTS_DIR", "benchmark_results"))
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize latency samples in milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+def record_results(name: str, results: Dict[str, Any]) -> Path:
+    """Write machine-readable benchmark results, so runs can be compared against each other."""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{name}-{time.strftime('%Y%m%dT%H%M%S')}.json"
+    payload = {"benchmark": name, "timestamp": time.time(), "python": platform.python_version(), "results": results}
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf8")
+    print(f"\n{name}: {json.dumps(results, indent=2, sort_keys=True)}")
+    return path
+
+
+def find_regressions(results: Dict[str, Any], metric: str = "p95_ms") -> List[str]:
+    """Compare per-endpoint latencies with the results file named by ``BENCHMARK_BASELINE``.
+
+    Returns a description of every endpoint slower than the baseline by more than ``BENCHMARK_TOLERANCE``.
+    """
+    baseline_path = os.getenv("BENCHMARK_BASELINE")
+    if not baseline_path:
+        return []
+    tolerance = float(os.getenv("BENCHMARK_TOLERANCE", "0.2"))
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf8"))["results"]
+
+    regressions = []
+    for name, summary in results.get("endpoints", {}).items():
+        expected = baseline.get("endpoints", {}).get(name)
+        if expected and summary[metric] > expected[metric] * (1 + tolerance):
+            regressions.append(f"{name}: {metric} {summary[metric]:.2f} > {expected[metric]:.2f}")
+    return regressions
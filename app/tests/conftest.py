@@ -1,3 +1,4 @@
+from typing import Dict
 from typing import Generator
 
 import pytest
@@ -6,11 +7,17 @@ from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 from starlette.testclient import TestClient
 
+from app.core import settings
+from app.core.auth import user_auth
+from app.core.rate_limit import MemoryRateLimitBackend
+from app.core.rate_limit import rate_limiter
 from app.db.base_class import Base
+from app.db.sync_adapter import SyncSessionAdapter
 from app.db.test_session import TestingSessionLocal
 from app.db.test_session import test_engine
 from app.dependencies.auth_db import get_db
 from app.main import app
+from app.models import User
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -20,6 +27,14 @@ def set_test_db() -> None:
     Base.metadata.create_all(bind=test_engine)  # pylint: disable=no-member
 
 
+@pytest.fixture(autouse=True)
+def rate_limit_buckets(monkeypatch: pytest.MonkeyPatch) -> MemoryRateLimitBackend:
+    """Start every test with empty rate limit buckets."""
+    backend = MemoryRateLimitBackend(shards=settings.RATE_LIMIT_SHARDS, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    monkeypatch.setattr(rate_limiter, "backend", backend)
+    return backend
+
+
 @pytest.fixture()
 def db_session() -> Generator[Session, None, None]:
     """Create a clean database session for a test."""
@@ -45,9 +60,28 @@ def db_session() -> Generator[Session, None, None]:
 def client(db_session: sessionmaker) -> Generator[TestClient, None, None]:  # pylint: disable=redefined-outer-name
     """Create a test client for the app."""
 
-    def override_get_db():
-        yield db_session
+    async def override_get_db():
+        yield SyncSessionAdapter(db_session)
 
     app.dependency_overrides[get_db] = override_get_db
     yield TestClient(app)
     del app.dependency_overrides[get_db]
+
+
+@pytest.fixture()
+def superuser_headers(db_session: Session) -> Dict[str, str]:  # pylint: disable=redefined-outer-name
+    """Create a superuser and return its authorization headers."""
+    user = User(username="admin", email="admin@example.com", is_active=True, is_superuser=True)
+    db_session.add(user)
+    db_session.commit()
+    return {"Authorization": f"Bearer {user_auth.create_access_token(user)}"}
+
+
+@pytest.fixture()
+def auth_headers(
+    client: TestClient, db_session: Session  # pylint: disable=redefined-outer-name,unused-argument
+) -> Dict[str, str]:
+    """Sign up a user and return its authorization headers."""
+    client.post("/api/v1/auth/signup", json={"email": "test@example.com", "password": "password", "username": "test"})
+    token = client.post("/api/v1/auth/token", json={"username": "test", "password": "password"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
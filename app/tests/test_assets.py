@@ -0,0 +1,51 @@
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.api.assets import accepted_encodings
+from app.api.v1.authn import RESOURCES_DIR
+
+
+def test_client_js_is_precompressed(client: TestClient):
+    """Test that the client JS is served precompressed with caching headers."""
+    response = client.get("/api/v1/authn/webauthn_client.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.content == (RESOURCES_DIR / "webauthn_client.js").read_bytes()
+
+
+def test_index_without_compression(client: TestClient):
+    """Test that the index is served as is when the client accepts no compression."""
+    response = client.get("/api/v1/authn/", headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert response.content == (RESOURCES_DIR / "authn_html.html").read_bytes()
+
+
+def test_not_modified(client: TestClient):
+    """Test that a matching If-None-Match is answered with 304."""
+    etag = client.get("/api/v1/authn/", headers={"Accept-Encoding": "br"}).headers["etag"]
+
+    response = client.get("/api/v1/authn/", headers={"Accept-Encoding": "br", "If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+def test_accepted_encodings():
+    """Test that codings refused with any zero q-value are not accepted."""
+    assert accepted_encodings("br;q=0.0, gzip; q=0.000, deflate;q=0.5, identity") == {"deflate", "identity"}
+    assert accepted_encodings("GZIP;q=1.0, br;q=bogus") == {"gzip"}
+    assert accepted_encodings("") == set()
+
+
+def test_refused_encoding_is_not_served(client: TestClient):
+    """Test that an encoding refused with ``q=0.0`` falls back to the next accepted one."""
+    response = client.get("/api/v1/authn/webauthn_client.js", headers={"Accept-Encoding": "br;q=0.0, gzip;q=0.5"})
+
+    assert response.headers["content-encoding"] == "gzip"
@@ -43,3 +43,34 @@ def test_signup_with_not_valid_email(client: TestClient, db_session: Session):
     assert response.json() == {
         "detail": [{"loc": ["body", "email"], "msg": "value is not a valid email address", "type": "value_error.email"}]
     }
+
+
+def test_login_and_me(client: TestClient, db_session: Session):
+    """Test login endpoint and retrieving the current user with the issued token."""
+    client.post(
+        "/api/v1/auth/signup",
+        json={
+            "email": "test@example.com",
+            "password": "password",
+            "username": "test",
+            "first_name": "T",
+            "last_name": "U",
+        },
+    )
+    response = client.post("/api/v1/auth/token", json={"username": "test", "password": "password"})
+
+    assert response.status_code == status.HTTP_200_OK
+    token = response.json()["access_token"]
+
+    response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["username"] == "test"
+
+
+def test_login_with_wrong_password(client: TestClient, db_session: Session):
+    """Test login endpoint with wrong password."""
+    client.post("/api/v1/auth/signup", json={"email": "test@example.com", "password": "password", "username": "test"})
+    response = client.post("/api/v1/auth/token", json={"username": "test", "password": "wrong"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
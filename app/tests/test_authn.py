@@ -0,0 +1,151 @@
+import json
+import uuid
+from typing import Dict
+from typing import List
+
+import pytest
+import sqlalchemy
+import webauthn
+from httpx import Response
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+from webauthn.helpers.structs import PublicKeyCredentialDescriptor
+from webauthn.helpers.structs import UserVerificationRequirement
+
+from app.api.common import WebAuthnOptionsResponse
+from app.core import settings
+from app.core.hashing import hashing_engine
+from app.db.test_session import test_engine
+from app.models import UserCredential
+from app.tests.authenticator import SoftwareAuthenticator
+
+
+def register(client: TestClient, headers: Dict[str, str], authenticator: SoftwareAuthenticator) -> None:
+    """Register the authenticator's credential."""
+    options = client.get("/api/v1/authn/register/public_key", headers=headers).json()
+    response = client.post("/api/v1/authn/register", headers=headers, json=authenticator.create(options))
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+def test_register_and_authenticate(client: TestClient, db_session: Session, auth_headers: Dict[str, str]):
+    """Test the full WebAuthn registration and authentication flow."""
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    register(client, auth_headers, authenticator)
+
+    options = client.get("/api/v1/authn/auth/public_key", headers=auth_headers).json()
+    assertion = authenticator.get(options)
+    response = client.post("/api/v1/authn/auth", headers=auth_headers, json=assertion)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert db_session.query(UserCredential).one().sign_count == authenticator.sign_count
+
+    replay = client.post("/api/v1/authn/auth", headers=auth_headers, json=assertion)
+
+    assert replay.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_authenticate_with_unknown_credential(client: TestClient, db_session: Session, auth_headers: Dict[str, str]):
+    """Test that an assertion for a credential of another user is rejected."""
+    register(client, auth_headers, SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN))
+
+    options = client.get("/api/v1/authn/auth/public_key", headers=auth_headers).json()
+    response = client.post(
+        "/api/v1/authn/auth",
+        headers=auth_headers,
+        json=SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN).get(options),
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def passkey_login(client: TestClient, authenticator: SoftwareAuthenticator) -> Response:
+    """Sign in with the authenticator's discoverable credential, without a username or token."""
+    options = client.get("/api/v1/authn/passkey/public_key").json()
+    assert options["allowCredentials"] == []
+    return client.post("/api/v1/authn/passkey", json=authenticator.get(options))
+
+
+def test_passkey_login(
+    client: TestClient, db_session: Session, auth_headers: Dict[str, str], monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a passkey assertion alone issues tokens, without touching password hashing."""
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    register(client, auth_headers, authenticator)
+
+    async def no_hashing(*args):
+        raise AssertionError("The password hashing path was used")
+
+    monkeypatch.setattr(hashing_engine, "verify_and_update", no_hashing)
+    response = passkey_login(client, authenticator)
+
+    assert response.status_code == status.HTTP_200_OK
+    tokens = response.json()
+    me = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.json()["username"] == "test"
+    assert (
+        client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code
+        == status.HTTP_200_OK
+    )
+    assert db_session.query(UserCredential).one().sign_count == authenticator.sign_count
+
+
+def test_passkey_login_does_not_reload_user(client: TestClient, auth_headers: Dict[str, str]):
+    """Test that the user is not lazily loaded again once the sign count update expired it."""
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    register(client, auth_headers, authenticator)
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+        statements.append(statement)
+
+    sqlalchemy.event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        assert passkey_login(client, authenticator).status_code == status.HTTP_200_OK
+    finally:
+        sqlalchemy.event.remove(test_engine, "before_cursor_execute", record)
+
+    updated = next(
+        index for index, statement in enumerate(statements) if statement.startswith("UPDATE user_credential")
+    )
+    assert not [statement for statement in statements[updated:] if 'FROM "user"' in statement]
+
+
+def test_passkey_login_rejects_replayed_challenge(client: TestClient, auth_headers: Dict[str, str]):
+    """Test that a passkey challenge can be answered only once."""
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    register(client, auth_headers, authenticator)
+
+    options = client.get("/api/v1/authn/passkey/public_key").json()
+    assertion = authenticator.get(options)
+
+    assert client.post("/api/v1/authn/passkey", json=assertion).status_code == status.HTTP_200_OK
+    assert client.post("/api/v1/authn/passkey", json=assertion).status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_passkey_login_requires_user_verification(client: TestClient, auth_headers: Dict[str, str]):
+    """Test that a passkey login without user verification is rejected."""
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN, user_verifying=False)
+    register(client, auth_headers, authenticator)
+
+    assert passkey_login(client, authenticator).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_passkey_login_checks_user_handle(client: TestClient, auth_headers: Dict[str, str]):
+    """Test that an assertion whose user handle names another user is rejected."""
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    register(client, auth_headers, authenticator)
+    authenticator.user_handle = str(uuid.uuid4()).encode()
+
+    assert passkey_login(client, authenticator).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_options_response_matches_library_json():
+    """Test that the fast options response renders the same JSON as ``webauthn.options_to_json``."""
+    options = webauthn.generate_authentication_options(
+        rp_id=settings.RP_ID,
+        allow_credentials=[PublicKeyCredentialDescriptor(id=b"\x00\xffcredential")],
+        user_verification=UserVerificationRequirement.DISCOURAGED,
+    )
+
+    assert json.loads(WebAuthnOptionsResponse(options).body) == json.loads(webauthn.options_to_json(options))
@@ -0,0 +1,50 @@
+import asyncio
+
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.core.challenge_store import ChallengeStore
+from app.core.kv_store import MemoryKeyValueStore
+
+
+def test_challenge_can_be_consumed_once():
+    """Test that a stored challenge is returned exactly once."""
+    store = ChallengeStore(MemoryKeyValueStore(), ttl=60, cleanup_interval=60)
+
+    async def run():
+        await store.save("register", "user", b"challenge")
+        return await store.consume("register", "user"), await store.consume("register", "user")
+
+    assert asyncio.run(run()) == (b"challenge", None)
+
+
+def test_expired_challenge_is_purged():
+    """Test that expired challenges are neither returned nor kept."""
+    memory_store = MemoryKeyValueStore()
+    store = ChallengeStore(memory_store, ttl=0, cleanup_interval=60)
+
+    asyncio.run(store.save("auth", "user", b"challenge"))
+
+    assert memory_store.purge_expired() == 1
+    assert asyncio.run(store.consume("auth", "user")) is None
+
+
+def test_register_without_challenge(client: TestClient, db_session: Session):
+    """Test that registering a credential without a pending challenge is rejected."""
+    client.post("/api/v1/auth/signup", json={"email": "test@example.com", "password": "password", "username": "test"})
+    token = client.post("/api/v1/auth/token", json={"username": "test", "password": "password"}).json()["access_token"]
+
+    response = client.post(
+        "/api/v1/authn/register",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "id": "aWQ=",
+            "rawId": "aWQ=",
+            "response": {"attestationObject": "YQ==", "clientDataJSON": "YQ=="},
+            "type": "public-key",
+        },
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "set-cookie" not in response.headers
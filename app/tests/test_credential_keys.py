@@ -0,0 +1,61 @@
+import os
+from typing import Dict
+
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.core import settings
+from app.core.cache import TTLCache
+from app.core.credential_keys import CredentialKeyCache
+from app.core.credential_keys import credential_key_cache
+from app.models import User
+from app.models import UserCredential
+from app.tests.authenticator import SoftwareAuthenticator
+from app.tests.test_authn import register
+
+
+def test_cache_parses_each_key_once():
+    """Test that a key is parsed once and re-parsed when the stored COSE key changes."""
+    cache = CredentialKeyCache(TTLCache(maxsize=10, ttl=60))
+    first_key = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)._cose_public_key()
+    other_key = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)._cose_public_key()
+
+    parsed = cache.get(b"id", first_key)
+
+    assert cache.get(b"id", first_key) is parsed
+    assert cache.cache.hits == 1
+    reparsed = cache.get(b"id", other_key)
+    assert reparsed is not parsed
+    assert reparsed.cose_key == other_key
+
+
+def test_authentication_uses_cached_key(client: TestClient, db_session: Session, auth_headers: Dict[str, str]):
+    """Test that repeated assertions reuse the parsed key and that deleting the credential drops it."""
+    credential_key_cache.cache.clear()
+    authenticator = SoftwareAuthenticator(origin=settings.EXPECTED_ORIGIN)
+    register(client, auth_headers, authenticator)
+
+    for _ in range(2):
+        options = client.get("/api/v1/authn/auth/public_key", headers=auth_headers).json()
+        response = client.post("/api/v1/authn/auth", headers=auth_headers, json=authenticator.get(options))
+        assert response.status_code == status.HTTP_200_OK
+
+    credential = db_session.query(UserCredential).one()
+    assert credential_key_cache.cache.stats()["size"] == 1
+    assert credential_key_cache.cache.hits >= 1
+
+    db_session.delete(credential)
+    db_session.commit()
+    assert credential_key_cache.cache.stats()["size"] == 0
+
+
+def test_deleting_unloaded_credential(db_session: Session):
+    """Test that deleting a credential that was never cached does not fail."""
+    user = User(username="test", email="test@example.com")
+    credential = UserCredential(user=user, credential_id=os.urandom(16), public_key=b"")
+    db_session.add(credential)
+    db_session.commit()
+
+    db_session.delete(credential)
+    db_session.commit()
@@ -0,0 +1,165 @@
+import base64
+import json
+import os
+import uuid
+from typing import Dict
+
+import cbor2
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.models import User
+from app.models import UserCredential
+
+
+def create_credentials(db_session: Session, count: int) -> User:
+    """Create a user with ``count`` credentials."""
+    user = User(username="owner", email="owner@example.com", is_active=True)
+    db_session.add(user)
+    db_session.flush()
+    for sign_count in range(count):
+        db_session.add(
+            UserCredential(
+                user_id=user.id, credential_id=os.urandom(32), public_key=os.urandom(77), sign_count=sign_count
+            )
+        )
+    db_session.commit()
+    return user
+
+
+def test_export_import_roundtrip(client: TestClient, db_session: Session, superuser_headers: Dict[str, str]):
+    """Test that an NDJSON export restores deleted credentials and that re-importing it is a no-op."""
+    create_credentials(db_session, 3)
+    exported = client.get("/api/v1/admin/credentials/export", headers=superuser_headers)
+    assert exported.status_code == status.HTTP_200_OK
+    assert exported.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in exported.text.splitlines()]
+    assert sorted(record["sign_count"] for record in records) == [0, 1, 2]
+
+    before = {credential.id: credential.credential_id for credential in db_session.query(UserCredential)}
+    db_session.query(UserCredential).delete()
+    db_session.commit()
+    for _ in range(2):
+        response = client.post("/api/v1/admin/credentials/import", headers=superuser_headers, content=exported.content)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["upserted"] == 3
+
+    db_session.expire_all()
+    after = {credential.id: credential.credential_id for credential in db_session.query(UserCredential)}
+    assert after == before
+
+
+def test_import_keeps_greater_sign_count(client: TestClient, db_session: Session, superuser_headers: Dict[str, str]):
+    """Test that a CBOR import never moves a sign count backwards and reports unknown users."""
+    create_credentials(db_session, 1)
+    exported = client.get(
+        "/api/v1/admin/credentials/export", headers=superuser_headers, params={"output_format": "cbor"}
+    )
+    assert exported.headers["content-type"] == "application/cbor-seq"
+    record = cbor2.loads(exported.content)
+    credential = db_session.query(UserCredential).one()
+    credential.sign_count = 10
+    db_session.commit()
+
+    orphan = {**record, "id": str(credential.user_id), "credential_id": b"orphan", "user_id": str(credential.id)}
+    body = cbor2.dumps({**record, "sign_count": 5}) + cbor2.dumps(orphan)
+    response = client.post(
+        "/api/v1/admin/credentials/import",
+        headers={**superuser_headers, "Content-Type": "application/cbor-seq"},
+        content=body,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["processed"] == 2
+    assert report["upserted"] == 1
+    assert report["invalid"] == [{"id": orphan["id"], "error": "User does not exist"}]
+    db_session.expire_all()
+    assert db_session.query(UserCredential).one().sign_count == 10
+
+
+def test_import_reports_malformed_records(client: TestClient, db_session: Session, superuser_headers: Dict[str, str]):
+    """Test that malformed NDJSON lines are reported without aborting the import."""
+    create_credentials(db_session, 1)
+    exported = client.get("/api/v1/admin/credentials/export", headers=superuser_headers).content
+    record = json.loads(exported)
+    missing = {key: value for key, value in record.items() if key != "credential_id"}
+    bad_base64 = {**record, "credential_id": "not base64!"}
+    body = b"\n".join([b"{broken", json.dumps(missing).encode(), json.dumps(bad_base64).encode(), b"[]", exported])
+
+    response = client.post("/api/v1/admin/credentials/import", headers=superuser_headers, content=body)
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["processed"] == 5
+    assert report["upserted"] == 1
+    assert [row["id"] for row in report["invalid"]] == [None, record["id"], record["id"], None]
+    assert "credential_id" in report["invalid"][1]["error"]
+
+
+def test_import_reports_malformed_cbor(client: TestClient, db_session: Session, superuser_headers: Dict[str, str]):
+    """Test that CBOR items that are not records, and a truncated sequence, are reported."""
+    create_credentials(db_session, 1)
+    exported = client.get(
+        "/api/v1/admin/credentials/export", headers=superuser_headers, params={"output_format": "cbor"}
+    ).content
+    body = cbor2.dumps([1, 2]) + exported + exported[:10]
+
+    response = client.post(
+        "/api/v1/admin/credentials/import",
+        headers={**superuser_headers, "Content-Type": "application/cbor-seq"},
+        content=body,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["processed"] == 3
+    assert report["upserted"] == 1
+    assert [row["error"] for row in report["invalid"]] == ["Expected a record, got list", "Truncated CBOR sequence"]
+
+
+def test_import_merges_duplicates_within_batch(
+    client: TestClient, db_session: Session, superuser_headers: Dict[str, str]
+):
+    """Test that a credential repeated within a batch is upserted once with its greatest sign count."""
+    create_credentials(db_session, 1)
+    record = json.loads(client.get("/api/v1/admin/credentials/export", headers=superuser_headers).content)
+    body = "\n".join(json.dumps({**record, "sign_count": sign_count}) for sign_count in (7, 3))
+
+    response = client.post("/api/v1/admin/credentials/import", headers=superuser_headers, content=body)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["upserted"] == 1
+    assert response.json()["invalid"] == []
+    db_session.expire_all()
+    assert db_session.query(UserCredential).one().sign_count == 7
+
+
+def test_import_reports_conflicting_credentials(
+    client: TestClient, db_session: Session, superuser_headers: Dict[str, str]
+):
+    """Test that records taking the credential of another user or the id of another credential are reported."""
+    owner = create_credentials(db_session, 1)
+    other = User(username="other", email="other@example.com", is_active=True)
+    db_session.add(other)
+    db_session.commit()
+    record = json.loads(client.get("/api/v1/admin/credentials/export", headers=superuser_headers).content)
+    stolen = {**record, "id": str(uuid.uuid4()), "user_id": str(other.id), "sign_count": 50}
+    reused_id = {**record, "credential_id": base64.urlsafe_b64encode(os.urandom(32)).decode()}
+    new = {**stolen, "id": str(uuid.uuid4()), "credential_id": base64.urlsafe_b64encode(os.urandom(32)).decode()}
+    body = "\n".join(json.dumps(item) for item in (stolen, reused_id, new, {**new, "id": str(uuid.uuid4())}))
+
+    response = client.post("/api/v1/admin/credentials/import", headers=superuser_headers, content=body)
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["upserted"] == 1
+    assert report["invalid"] == [
+        {"id": stolen["id"], "error": "Credential belongs to another user"},
+        {"id": reused_id["id"], "error": "Id belongs to another credential"},
+    ]
+    db_session.expire_all()
+    credentials = {credential.user_id: credential for credential in db_session.query(UserCredential)}
+    assert credentials[owner.id].sign_count == 0
+    assert credentials[other.id].id == uuid.UUID(new["id"])
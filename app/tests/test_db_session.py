@@ -0,0 +1,88 @@
+import asyncio
+from typing import List
+
+import pytest
+import sqlalchemy
+from starlette.testclient import TestClient
+
+from app.core import settings
+from app.core.hashing import hashing_engine
+from app.core.revocation import revocation_list
+from app.db import session
+from app.db.base_class import Base
+from app.main import app
+from app.tests.utils import requires_postgres
+
+
+def test_warm_up_primes_hot_statements():
+    """Test that every warmed connection runs the hot lookups once."""
+    engine = session.create_db_engine(settings.TEST_DATABASE_URL, pool_size=2, max_overflow=0)
+    Base.metadata.create_all(bind=engine)  # pylint: disable=no-member
+    statements: List[str] = []
+    sqlalchemy.event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    opened = session.warm_up_engine(engine, connections=2, prime=True)
+
+    assert len(statements) == 4 * opened
+    assert any("user_credential JOIN" in statement for statement in statements)
+    engine.dispose()
+
+
+@requires_postgres
+def test_warm_up_fills_pool():
+    """Test that warmed connections stay in the pool for the first requests."""
+    engine = session.create_db_engine(settings.TEST_DATABASE_URL, pool_size=3, max_overflow=0)
+
+    assert session.warm_up_engine(engine, connections=3, prime=False) == 3
+    assert engine.pool.checkedin() == 3
+    engine.dispose()
+
+
+def test_warm_up_opens_single_in_memory_sqlite_connection():
+    """Test that the warm-up opens no more than the one connection of an in-memory SQLite database."""
+    engine = session.create_db_engine("sqlite://", pool_size=3, max_overflow=0)
+
+    assert session.warm_up_engine(engine, connections=3, prime=False) == 1
+    engine.dispose()
+
+
+def test_warm_up_tolerates_unreachable_database(monkeypatch: pytest.MonkeyPatch):
+    """Test that the app still starts when the database cannot be reached yet."""
+    unreachable = session.create_db_engine("postgresql://postgres@127.0.0.1:1/app", pool_size=1, max_overflow=0)
+    monkeypatch.setattr(session, "engine", unreachable)
+    monkeypatch.setattr(session, "replica_engines", [])
+    monkeypatch.setattr(session, "async_engine", None)
+
+    asyncio.run(session.warm_up(connections=1))
+
+
+def test_lifespan_warms_up_and_disposes(monkeypatch: pytest.MonkeyPatch):
+    """Test that the app warms the pools on startup and disposes them on shutdown."""
+    calls: List[str] = []
+
+    async def warm_up():
+        calls.append("warm_up")
+
+    async def dispose():
+        calls.append("dispose")
+
+    async def warm_up_hashing():
+        calls.append("warm_up_hashing")
+
+    async def start_revocation_list(session_factory):  # pylint: disable=unused-argument
+        calls.append("start_revocation_list")
+
+    async def stop_revocation_list():
+        calls.append("stop_revocation_list")
+
+    monkeypatch.setattr(session, "warm_up", warm_up)
+    monkeypatch.setattr(session, "dispose", dispose)
+    monkeypatch.setattr(hashing_engine, "warm_up", warm_up_hashing)
+    monkeypatch.setattr(revocation_list, "start", start_revocation_list)
+    monkeypatch.setattr(revocation_list, "stop", stop_revocation_list)
+
+    with TestClient(app) as client:
+        client.get("/api/v1/health")
+        assert calls == ["warm_up", "start_revocation_list", "warm_up_hashing"]
+
+    assert calls == ["warm_up", "start_revocation_list", "warm_up_hashing", "stop_revocation_list", "dispose"]
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.db.dialects import greatest
+from app.db.dialects import pool_options
+from app.models import User
+from app.models import UserCredential
+from app.tests.utils import requires_postgres
+
+
+def test_greatest_compiles_per_dialect():
+    """Test that ``greatest`` renders as GREATEST on Postgres and as the scalar MAX on SQLite."""
+    statement = select(greatest(UserCredential.sign_count, 5))
+
+    assert "greatest(user_credential.sign_count" in str(statement.compile(dialect=postgresql.dialect()))
+    assert "max(user_credential.sign_count" in str(statement.compile(dialect=sqlite.dialect()))
+
+
+def test_pool_options_share_in_memory_sqlite():
+    """Test that in-memory SQLite gets a pool of one connection and other databases keep their pool options."""
+    assert pool_options("sqlite://", pool_size=5)["pool_size"] == 1
+    assert pool_options("sqlite:////tmp/app.db", pool_size=5) == {"pool_size": 5}
+    assert pool_options("postgresql://localhost/app", pool_size=5) == {"pool_size": 5}
+
+
+def test_in_memory_sqlite_serves_one_session_at_a_time():
+    """Test that a session waits for the in-memory SQLite connection instead of joining another's transaction."""
+    engine = create_engine("sqlite://", **{**pool_options("sqlite://"), "pool_timeout": 0.1})
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    engine.dispose()
+
+
+def test_in_memory_sqlite_is_refused_for_several_workers(monkeypatch: pytest.MonkeyPatch):
+    """Test that in-memory SQLite is refused when every worker process would get its own database."""
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+
+    with pytest.raises(ValueError):
+        pool_options("sqlite://")
+
+
+@requires_postgres
+def test_sign_count_check_constraint(db_session: Session):
+    """Test that Postgres rejects a negative sign count."""
+    user = User(username="test", email="test@example.com")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(UserCredential(user_id=user.id, public_key=b"key", credential_id=b"id", sign_count=-1))
+
+    with pytest.raises(IntegrityError):
+        db_session.flush()
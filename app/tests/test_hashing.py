@@ -0,0 +1,120 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.api.errors import ServiceBusyException
+from app.core import hashing
+from app.core import settings
+from app.core.hashing import HashingEngine
+from app.core.hashing import HashProfile
+from app.core.hashing import LazyCryptContext
+from app.core.hashing import build_crypt_context
+from app.core.hashing import calibrate_profile
+from app.core.hashing import hashing_engine
+from app.models import User
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_hash_and_verify(workers: int):
+    """Test hashing and verifying a password on the threadpool and on a process pool."""
+    engine = HashingEngine(workers=workers, max_pending=4, retry_after=1)
+
+    async def run():
+        hashed = await engine.hash("password")
+        return await engine.verify("password", hashed), await engine.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+    finally:
+        engine.shutdown()
+
+    stats = engine.stats()
+    assert stats["hash"]["count"] == 1
+    assert stats["verify"]["count"] == 2
+    assert stats["verify"]["max_seconds"] > 0
+
+
+def test_hash_rejected_when_queue_is_full():
+    """Test that operations are rejected once the pending queue is full."""
+    engine = HashingEngine(workers=0, max_pending=0, retry_after=7)
+
+    with pytest.raises(ServiceBusyException) as exc_info:
+        asyncio.run(engine.hash("password"))
+
+    assert exc_info.value.headers == {"Retry-After": "7"}
+    assert engine.stats()["hash"]["rejected"] == 1
+
+
+def test_signup_when_hashing_is_busy(client: TestClient, db_session: Session, monkeypatch: pytest.MonkeyPatch):
+    """Test that signup answers 503 with Retry-After when the hashing queue is full."""
+    monkeypatch.setattr(hashing_engine, "max_pending", 0)
+
+    response = client.post(
+        "/api/v1/auth/signup", json={"email": "test@example.com", "password": "password", "username": "test"}
+    )
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == str(hashing_engine.retry_after)
+
+
+def test_importing_the_app_leaves_passlib_unloaded():
+    """Test that passlib is only imported once a password is handled."""
+    script = "import sys, app.main; print('passlib' in sys.modules)"
+    env = {**os.environ, "DATABASE_URL": settings.TEST_DATABASE_URL}
+    output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, check=True, text=True)
+
+    assert output.stdout.strip() == "False"
+
+
+def test_warm_up_builds_context(monkeypatch: pytest.MonkeyPatch):
+    """Test that warming up the engine builds the context before the first password check."""
+    context = LazyCryptContext(HashProfile("sha256_crypt", rounds=1000))
+    monkeypatch.setattr(hashing, "crypt_context", context)
+    engine = HashingEngine(workers=0, max_pending=4, retry_after=1)
+
+    assert context._context is None  # pylint: disable=protected-access
+    asyncio.run(engine.warm_up())
+    assert context._context is not None  # pylint: disable=protected-access
+    assert context.verify("password", context.hash("password"))
+
+
+def test_profile_flags_other_costs_for_update():
+    """Test that hashes of another cost or of a legacy scheme need an update, while current ones do not."""
+    context = build_crypt_context(HashProfile("sha256_crypt", rounds=2000), ["md5_crypt"])
+
+    assert not context.needs_update(context.hash("password"))
+    assert context.needs_update(build_crypt_context(HashProfile("sha256_crypt", rounds=1000)).hash("password"))
+    assert context.needs_update(build_crypt_context(HashProfile("md5_crypt")).hash("password"))
+
+
+def test_calibrate_profile():
+    """Test that calibration scales the rounds towards the target latency."""
+    profile, elapsed = calibrate_profile("sha256_crypt", target_seconds=0.005, samples=1)
+
+    assert profile.scheme == "sha256_crypt"
+    assert 1000 <= profile.rounds < 535000
+    assert elapsed > 0
+
+
+def test_login_rehashes_outdated_password(client: TestClient, db_session: Session, monkeypatch: pytest.MonkeyPatch):
+    """Test that a successful login upgrades a hash made with an outdated cost."""
+    old_hash = build_crypt_context(HashProfile("sha256_crypt", rounds=1000)).hash("password")
+    user = User(username="test", email="test@example.com", hashed_password=old_hash, is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    monkeypatch.setattr(hashing, "crypt_context", build_crypt_context(HashProfile("sha256_crypt", rounds=2000)))
+    monkeypatch.setattr(hashing_engine, "workers", 0)
+    monkeypatch.setattr(hashing_engine, "_executor", None)
+
+    response = client.post("/api/v1/auth/token", json={"username": "test", "password": "password"})
+
+    assert response.status_code == status.HTTP_200_OK
+    db_session.refresh(user)
+    assert user.hashed_password.startswith("$5$rounds=2000$")
+    assert hashing.crypt_context.verify("password", user.hashed_password)
@@ -0,0 +1,114 @@
+import json
+from pathlib import Path
+from typing import List
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.api.errors import InvalidTokenException
+from app.core import settings
+from app.core.auth import TokenHandler
+from app.core.auth import user_auth
+from app.core.cache import TTLCache
+from app.core.keys import KeyRing
+from app.core.keys import RingKey
+from app.models import User
+
+
+def make_ring(now: List[float]) -> KeyRing:
+    """Create a ring whose EdDSA key takes over from the ES256 key at t=2000, with a 100s overlap."""
+    first = ec.generate_private_key(ec.SECP256R1())
+    second = ed25519.Ed25519PrivateKey.generate()
+    return KeyRing(
+        [
+            RingKey("first", "ES256", first, first.public_key(), not_before=0),
+            RingKey("second", "EdDSA", second, second.public_key(), not_before=2000),
+        ],
+        overlap_seconds=100,
+        clock=lambda: now[0],
+    )
+
+
+@pytest.fixture()
+def token_cache():
+    """Use a fresh verified-token cache for the test."""
+    user_auth.token_cache.clear()
+    yield user_auth.token_cache
+    user_auth.token_cache.clear()
+
+
+def test_scheduled_rotation_with_overlap(
+    monkeypatch: pytest.MonkeyPatch, token_cache: TTLCache  # pylint: disable=redefined-outer-name
+):
+    """Test that a scheduled key is published early, takes over on time and its predecessor retires after overlap."""
+    now = [1000.0]
+    ring = make_ring(now)
+    monkeypatch.setattr(TokenHandler, "key_ring", ring)
+
+    assert [key["kid"] for key in ring.jwks()["keys"]] == ["first", "second"]
+    old_token = user_auth.create_access_token(User(username="test"))
+    assert jwt.get_unverified_header(old_token)["kid"] == "first"
+
+    now[0] = 2050.0
+    new_token = user_auth.create_access_token(User(username="test"))
+    assert jwt.get_unverified_header(new_token) == {"alg": "EdDSA", "kid": "second", "typ": "JWT"}
+    assert user_auth.validate_access_token(old_token)["sub"] == "test"
+    assert token_cache.stats()["size"] == 1
+
+    now[0] = 2100.0
+    assert [key["kid"] for key in ring.jwks()["keys"]] == ["second"]
+    token_cache.clear()
+    with pytest.raises(InvalidTokenException):
+        user_auth.validate_access_token(old_token)
+    assert user_auth.validate_access_token(new_token)["sub"] == "test"
+
+
+def test_jwks_verifies_tokens_locally(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    """Test that a token can be verified with nothing but the published key set."""
+    now = [2050.0]
+    monkeypatch.setattr(TokenHandler, "key_ring", make_ring(now))
+    token = user_auth.create_access_token(User(username="test"))
+
+    response = client.get("/.well-known/jwks.json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["cache-control"] == "public, max-age=50"
+    kid = jwt.get_unverified_header(token)["kid"]
+    jwk = next(jwk for jwk in response.json()["keys"] if jwk["kid"] == kid)
+    claims = jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=[jwk["alg"]], audience=settings.AUDIENCE)
+    assert claims["sub"] == "test"
+
+
+def test_key_ring_from_file(tmp_path: Path):
+    """Test loading a key ring with inline and file PEM keys."""
+    pems = [
+        key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+        for key in (ec.generate_private_key(ec.SECP256R1()), ed25519.Ed25519PrivateKey.generate())
+    ]
+    (tmp_path / "next.pem").write_bytes(pems[1])
+    keys_file = tmp_path / "keys.json"
+    keys_file.write_text(
+        json.dumps(
+            [
+                {"kid": "current", "alg": "ES256", "private_key": pems[0].decode()},
+                {"kid": "next", "alg": "EdDSA", "private_key_file": "next.pem", "not_before": "2100-01-01T00:00:00Z"},
+            ]
+        )
+    )
+
+    ring = KeyRing.from_file(str(keys_file), overlap_seconds=60)
+
+    assert ring.signing_key().kid == "current"
+    assert [key["kid"] for key in ring.jwks()["keys"]] == ["current", "next"]
+
+
+def test_legacy_secret_publishes_no_keys(client: TestClient):
+    """Test that the shared secret is never published."""
+    response = client.get("/.well-known/jwks.json")
+
+    assert response.json() == {"keys": []}
@@ -0,0 +1,73 @@
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.core import metrics
+from app.core import settings
+from app.core.auth import user_auth
+from app.main import get_application
+from app.models import User
+
+
+def test_histogram_render():
+    """Test the Prometheus text rendering of a histogram."""
+    histogram = metrics.Histogram("test_seconds", "Test.", ("operation",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(5, "a")
+
+    assert list(histogram.render()) == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{operation="a",le="0.1"} 1',
+        'test_seconds_bucket{operation="a",le="1.0"} 1',
+        'test_seconds_bucket{operation="a",le="+Inf"} 2',
+        'test_seconds_sum{operation="a"} 5.05',
+        'test_seconds_count{operation="a"} 2',
+    ]
+
+
+def test_timed_is_a_no_op_when_disabled(monkeypatch: pytest.MonkeyPatch):
+    """Test that instrumentation is skipped entirely when metrics are disabled."""
+    monkeypatch.setattr(metrics.registry, "enabled", False)
+
+    assert isinstance(metrics.timed("jwt_decode"), nullcontext)
+
+
+def test_metrics_endpoint(monkeypatch: pytest.MonkeyPatch):
+    """Test that the metrics endpoint exposes route latencies and hot-path timings."""
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    user_auth.token_cache.clear()
+    user_auth.validate_access_token(user_auth.create_access_token(User(username="test")))
+    client = TestClient(get_application())
+
+    assert client.get("/api/v1/health").status_code == status.HTTP_200_OK
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/health",status="200"}' in response.text
+    assert 'operation_duration_seconds_count{operation="jwt_decode"}' in response.text
+
+
+def test_pool_gauges_per_engine(monkeypatch: pytest.MonkeyPatch):
+    """Test that checked out connections and saturation are tracked per engine against its own capacity."""
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    first = create_engine("sqlite://", poolclass=QueuePool, pool_size=4, max_overflow=0)
+    second = create_engine("sqlite://", poolclass=QueuePool, pool_size=2, max_overflow=0)
+    metrics.instrument_engine(first, "test-first", capacity=4)
+    metrics.instrument_engine(second, "test-second", capacity=2)
+
+    with first.connect(), second.connect():
+        rendered = "\n".join(metrics.db_pool_saturation.render())
+        assert metrics.db_pool_checked_out.get("test-first") == 1
+        assert metrics.db_pool_checked_out.get("test-second") == 1
+        assert 'db_pool_saturation_ratio{engine="test-first"} 0.25' in rendered
+        assert 'db_pool_saturation_ratio{engine="test-second"} 0.5' in rendered
+
+    assert metrics.db_pool_checked_out.get("test-first") == 0
+    first.dispose()
+    second.dispose()
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app.core.auth import user_auth
+from app.core.rate_limit import MemoryRateLimitBackend
+from app.core.rate_limit import Rate
+from app.core.rate_limit import rate_limiter
+from app.dependencies import rate_limit
+from app.main import app
+from app.models import User
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rate_parse():
+    """Test parsing rates from settings."""
+    assert Rate.parse("10/minute") == Rate(10, 60)
+    assert Rate.parse("5/30") == Rate(5, 30.0)
+    assert Rate.parse("") is None
+    assert Rate.parse("0/second") is None
+
+
+def test_token_bucket_refills():
+    """Test that a bucket allows a burst of its capacity and refills over time."""
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(shards=4, max_keys=100, clock=clock)
+    rate = Rate(2, 10)
+
+    assert [backend.take("key", rate) for _ in range(3)] == [0, 0, 5.0]
+    assert backend.take("other", rate) == 0
+    clock.now += 5
+    assert backend.take("key", rate) == 0
+    assert backend.take("key", rate) == pytest.approx(5.0)
+
+
+def test_buckets_are_bounded():
+    """Test that a flood of distinct keys evicts buckets instead of growing without bound."""
+    backend = MemoryRateLimitBackend(shards=4, max_keys=8)
+
+    for index in range(100):
+        backend.take(f"key-{index}", Rate(1, 60))
+
+    assert len(backend) <= 8
+
+
+def test_login_throttled_before_hashing(
+    client: TestClient,
+    db_session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    rate_limit_buckets: MemoryRateLimitBackend,
+):
+    """Test that logins over the per-username limit are rejected without verifying the password."""
+    monkeypatch.setattr(rate_limit, "LOGIN_PER_USERNAME", Rate(2, 60))
+    # Frozen, so the time spent hashing does not refill the bucket and change Retry-After.
+    rate_limit_buckets.clock = lambda: 0.0
+    db_session.add(
+        User(username="victim", email="victim@example.com", hashed_password=user_auth.crypt_context.hash("pw"))
+    )
+    db_session.commit()
+    verify_count = user_auth.hashing_engine.stats()["verify"]["count"]
+
+    responses = [
+        client.post("/api/v1/auth/token", json={"username": "victim", "password": "guess"}),
+        client.post("/api/v1/auth/token", json={"username": "victim", "password": "guess"}),
+        client.post("/api/v1/auth/token", json={"username": "victim", "password": "guess"}),
+    ]
+
+    assert [response.status_code for response in responses] == [
+        status.HTTP_400_BAD_REQUEST,
+        status.HTTP_400_BAD_REQUEST,
+        status.HTTP_429_TOO_MANY_REQUESTS,
+    ]
+    assert responses[2].headers["Retry-After"] == "30"
+    assert user_auth.hashing_engine.stats()["verify"]["count"] == verify_count + 2
+    assert rate_limiter.stats()["login_username"]["throttled"] >= 1
+
+
+def test_signup_throttled_per_ip(client: TestClient, db_session: Session, monkeypatch: pytest.MonkeyPatch):
+    """Test that signups over the per-IP limit are rejected before the user is created."""
+    monkeypatch.setattr(rate_limit, "SIGNUP_PER_IP", Rate(1, 60))
+    client.post("/api/v1/auth/signup", json={"email": "a@example.com", "password": "password", "username": "a"})
+
+    response = client.post(
+        "/api/v1/auth/signup", json={"email": "b@example.com", "password": "password", "username": "b"}
+    )
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {"detail": "Too many requests, try again later"}
+
+
+def test_signup_throttled_per_forwarded_ip(client: TestClient, db_session: Session, monkeypatch: pytest.MonkeyPatch):
+    """Test that clients behind a trusted load balancer get a per-IP budget each."""
+    monkeypatch.setattr(rate_limit, "SIGNUP_PER_IP", Rate(1, 60))
+    proxied = TestClient(ProxyHeadersMiddleware(app, trusted_hosts="testclient"))
+
+    def signup(name: str, forwarded_for: str) -> int:
+        payload = {"email": f"{name}@example.com", "password": "password", "username": name}
+        return proxied.post("/api/v1/auth/signup", json=payload, headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    assert signup("a", "203.0.113.1") == status.HTTP_201_CREATED
+    assert signup("b", "203.0.113.2") == status.HTTP_201_CREATED
+    assert signup("c", "203.0.113.1") == status.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,191 @@
+import asyncio
+import os
+from typing import Dict
+from typing import Iterator
+
+import pytest
+import sqlalchemy
+from sqlalchemy import create_engine
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core import settings
+from app.core.cache import TTLCache
+from app.core.recent_writes import RecentWrites
+from app.db.routing import ReplicaSet
+from app.db.routing import RoutingSession
+from app.db.routing import read_your_writes
+from app.db.sync_adapter import SyncSessionAdapter
+from app.db.test_session import test_engine
+from app.dependencies import authn
+from app.dependencies.authn import get_current_user_credentials
+from app.models import User
+from app.models import UserCredential
+from app.tests.utils import requires_postgres
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def count_statements(engine: Engine) -> Dict[str, int]:
+    """Count the statements executed through ``engine``."""
+    counts = {"statements": 0}
+
+    @sqlalchemy.event.listens_for(engine, "before_cursor_execute")
+    def count(*args):  # pylint: disable=unused-argument
+        counts["statements"] += 1
+
+    return counts
+
+
+@pytest.fixture()
+def primary() -> Iterator[Connection]:
+    """Primary connection whose writes stay uncommitted, so a replica cannot see them yet."""
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture()
+def replica() -> Iterator[Engine]:
+    """Second connection pool on the test database acting as a replica."""
+    engine = create_engine(settings.TEST_DATABASE_URL)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def unreachable() -> Iterator[Engine]:
+    """Replica that refuses connections."""
+    engine = create_engine("postgresql://postgres@127.0.0.1:1/replica", connect_args={"connect_timeout": 1})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def registered() -> Iterator[User]:
+    """User with a credential committed long enough ago to have reached the replica."""
+    with Session(test_engine, expire_on_commit=False) as session:
+        user = User(username="registered", email="registered@example.com")
+        session.add(user)
+        session.flush()
+        session.add(UserCredential(user_id=user.id, credential_id=os.urandom(32), public_key=os.urandom(77)))
+        session.commit()
+    yield user
+    with test_engine.begin() as connection:
+        connection.execute(delete(UserCredential).where(UserCredential.user_id == user.id))
+        connection.execute(delete(User).where(User.id == user.id))
+
+
+def add_user(primary: Connection) -> User:  # pylint: disable=redefined-outer-name
+    """Write a user on the primary that has not reached the replica."""
+    session = RoutingSession(bind=primary)
+    user = User(username="lagging", email="lagging@example.com")
+    session.add(user)
+    session.flush()
+    return user
+
+
+def test_replica_set_round_robin_and_retry():
+    """Test that replicas take turns and a replica marked down is skipped until its retry time."""
+    clock = Clock()
+    first, second = create_engine("sqlite://"), create_engine("sqlite://")
+    replicas = ReplicaSet([first, second], retry_seconds=30, clock=clock)
+
+    assert [replicas.choose() for _ in range(4)] == [first, second, first, second]
+
+    replicas.mark_down(first)
+    assert [replicas.choose() for _ in range(2)] == [second, second]
+
+    replicas.mark_down(second)
+    assert replicas.choose() is None
+
+    clock.now = 30
+    assert {replicas.choose(), replicas.choose()} == {first, second}
+
+
+@requires_postgres
+def test_marked_reads_go_to_replica(primary: Connection, replica: Engine):  # pylint: disable=redefined-outer-name
+    """Test that only reads marked for a replica are served by it, until the session writes."""
+    replica_counts = count_statements(replica)
+    session = RoutingSession(bind=primary, replicas=ReplicaSet([replica], retry_seconds=30))
+
+    session.scalars(select(User).execution_options(replica=True)).all()
+    assert replica_counts["statements"] == 1
+
+    session.scalars(select(User)).all()
+    assert replica_counts["statements"] == 1
+
+    session.add(User(username="writer", email="writer@example.com"))
+    session.flush()
+    assert session.scalars(select(User.username).execution_options(replica=True)).all() == ["writer"]
+    assert replica_counts["statements"] == 1
+    session.close()
+
+
+@requires_postgres
+def test_read_your_writes_falls_back_to_primary(primary: Connection, replica: Engine):  # pylint: disable=W0621
+    """Test that a row missing on the replica is read from the primary."""
+    user = add_user(primary)
+    session = RoutingSession(bind=primary, replicas=ReplicaSet([replica], retry_seconds=30))
+    db = SyncSessionAdapter(session)
+
+    async def read():
+        return await db.scalar(select(User).where(User.username == "lagging").execution_options(replica=True))
+
+    assert asyncio.run(read()) is None
+    assert asyncio.run(read_your_writes(db, read)).id == user.id
+    session.close()
+
+
+@requires_postgres
+def test_unreachable_replica_fails_over(
+    primary: Connection, replica: Engine, unreachable: Engine  # pylint: disable=redefined-outer-name
+):
+    """Test that a replica refusing connections is skipped for the next replica, then for the primary."""
+    replica_counts = count_statements(replica)
+    replicas = ReplicaSet([unreachable, replica], retry_seconds=30)
+    session = RoutingSession(bind=primary, replicas=replicas)
+
+    session.scalars(select(User).execution_options(replica=True)).all()
+    assert replica_counts["statements"] == 1
+    session.close()
+
+    add_user(primary)
+    session = RoutingSession(bind=primary, replicas=ReplicaSet([unreachable], retry_seconds=30))
+    assert session.scalar(select(User.username).execution_options(replica=True)) == "lagging"
+    session.close()
+
+
+@requires_postgres
+def test_recent_writer_reads_credentials_from_primary(
+    registered: User, primary: Connection, replica: Engine, monkeypatch: pytest.MonkeyPatch  # pylint: disable=W0621
+):
+    """Test that a user who just registered a credential is not served the replica's stale, non-empty list."""
+    recent_writes = RecentWrites(TTLCache(maxsize=10, ttl=5), shared=None, window=5)
+    monkeypatch.setattr(authn, "recent_writes", recent_writes)
+    writer = RoutingSession(bind=primary)
+    writer.add(UserCredential(user_id=registered.id, credential_id=os.urandom(32), public_key=os.urandom(77)))
+    writer.flush()
+
+    def count_credentials() -> int:
+        session = RoutingSession(bind=primary, replicas=ReplicaSet([replica], retry_seconds=30))
+        credentials = asyncio.run(get_current_user_credentials(db=SyncSessionAdapter(session), user=registered))
+        session.close()
+        return len(credentials)
+
+    assert count_credentials() == 1
+    asyncio.run(recent_writes.mark(registered.id))
+    assert count_credentials() == 2
@@ -0,0 +1,74 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.core.auth import user_auth
+from app.models import RefreshToken
+from app.models import User
+
+
+@pytest.fixture()
+def refresh_token(client: TestClient, db_session: Session) -> str:
+    """Sign up and log in a user, returning the issued refresh token."""
+    client.post("/api/v1/auth/signup", json={"email": "test@example.com", "password": "password", "username": "test"})
+    response = client.post("/api/v1/auth/token", json={"username": "test", "password": "password"})
+    return response.json()["refresh_token"]
+
+
+def test_refresh_rotates_token(client: TestClient, db_session: Session, refresh_token: str):
+    """Test that a refresh returns a valid access token and a new refresh token, without hashing a password."""
+    verify_count = user_auth.hashing_engine.stats()["verify"]["count"]
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["refresh_token"] != refresh_token
+    assert user_auth.validate_access_token(body["access_token"])["sub"] == "test"
+    assert user_auth.hashing_engine.stats()["verify"]["count"] == verify_count
+    tokens = db_session.query(RefreshToken).all()
+    assert len(tokens) == 2
+    assert len({token.family_id for token in tokens}) == 1
+    assert (
+        db_session.query(RefreshToken)
+        .filter(RefreshToken.token_hash == RefreshToken.hash_token(body["refresh_token"]))
+        .one()
+    )
+
+
+def test_reused_refresh_token_revokes_family(client: TestClient, db_session: Session, refresh_token: str):
+    """Test that replaying a consumed refresh token revokes the tokens rotated from it."""
+    successor = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token}).json()["refresh_token"]
+
+    replay = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": successor})
+
+    assert replay.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    db_session.expire_all()
+    assert all(token.revoked_at for token in db_session.query(RefreshToken))
+
+
+def test_revoke_refresh_tokens(client: TestClient, db_session: Session, refresh_token: str):
+    """Test that a revoked family can no longer be refreshed."""
+    response = client.post("/api/v1/auth/refresh/revoke", json={"refresh_token": refresh_token})
+
+    assert response.status_code == status.HTTP_200_OK
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_expired_refresh_token(client: TestClient, db_session: Session, refresh_token: str):
+    """Test that an expired refresh token is rejected."""
+    db_session.query(RefreshToken).update({"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db_session.commit()
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert db_session.query(User).count() == 1
@@ -0,0 +1,171 @@
+import asyncio
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Dict
+from typing import List
+
+import pytest
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.core.auth import TokenHandler
+from app.core.auth import user_auth
+from app.core.revocation import BloomFilter
+from app.core.revocation import RevocationList
+from app.db.sync_adapter import SyncSessionAdapter
+from app.models import RevokedToken
+from app.models import User
+
+
+@pytest.fixture(autouse=True)
+def revocations(monkeypatch: pytest.MonkeyPatch) -> RevocationList:
+    """Start every test with an empty revocation snapshot."""
+    revocation_list = RevocationList(
+        capacity=1000,
+        error_rate=0.01,
+        token_lifetime=timedelta(minutes=30),
+        refresh_interval=1,
+        rebuild_interval=3600,
+    )
+    monkeypatch.setattr(TokenHandler, "revocation_list", revocation_list)
+    return revocation_list
+
+
+def login(client: TestClient) -> Dict[str, str]:
+    """Log in the test user, returning the issued tokens."""
+    return client.post("/api/v1/auth/token", json={"username": "test", "password": "password"}).json()
+
+
+def bearer(token: Dict[str, str]) -> Dict[str, str]:
+    """Authorization headers of an access token."""
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+
+@pytest.fixture()
+def tokens(client: TestClient, db_session: Session) -> List[Dict[str, str]]:
+    """Sign up a user and log in twice, as from two devices."""
+    client.post("/api/v1/auth/signup", json={"email": "test@example.com", "password": "password", "username": "test"})
+    return [login(client), login(client)]
+
+
+def test_bloom_filter():
+    """Test that the filter never misses an added item and keeps false positives near its error rate."""
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [uuid.uuid4().bytes for _ in range(1000)]
+    for item in added:
+        bloom_filter.add(item)
+
+    false_positives = sum(uuid.uuid4().bytes in bloom_filter for _ in range(10000))
+
+    assert all(item in bloom_filter for item in added)
+    assert false_positives < 300
+
+
+def test_logout(client: TestClient, db_session: Session, tokens: List[Dict[str, str]]):
+    """Test that a logout revokes only the token of the request."""
+    response = client.post("/api/v1/auth/logout", headers=bearer(tokens[0]))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens[0])).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens[1])).status_code == status.HTTP_200_OK
+    assert client.post("/api/v1/auth/logout", headers=bearer(tokens[0])).status_code == status.HTTP_401_UNAUTHORIZED
+    assert db_session.query(RevokedToken).count() == 1
+
+
+def test_logout_verifies_token_once(
+    client: TestClient, db_session: Session, tokens: List[Dict[str, str]], monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a logout decodes and revocation-checks its token a single time."""
+    checks = []
+    is_revoked = TokenHandler.revocation_list.is_revoked
+
+    async def counting_is_revoked(db, claims):
+        checks.append(claims["jti"])
+        return await is_revoked(db, claims)
+
+    monkeypatch.setattr(TokenHandler.revocation_list, "is_revoked", counting_is_revoked)
+
+    assert client.post("/api/v1/auth/logout", headers=bearer(tokens[0])).status_code == status.HTTP_200_OK
+    assert len(checks) == 1
+
+
+def test_logout_twice(
+    client: TestClient, db_session: Session, tokens: List[Dict[str, str]], revocations: RevocationList
+):
+    """Test that revoking a token already revoked by another process keeps the first revocation."""
+    claims = user_auth.validate_access_token(tokens[0]["access_token"])
+    user = db_session.query(User).one()
+    asyncio.run(revocations.revoke(SyncSessionAdapter(db_session), user.id, claims))
+    revocations.filter = BloomFilter(capacity=1000, error_rate=0.01)
+
+    response = client.post("/api/v1/auth/logout", headers=bearer(tokens[0]))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens[0])).status_code == status.HTTP_401_UNAUTHORIZED
+    assert db_session.query(RevokedToken).count() == 1
+
+
+def test_logout_everywhere(client: TestClient, db_session: Session, tokens: List[Dict[str, str]]):
+    """Test that a logout everywhere revokes every access and refresh token, but not the logins after it."""
+    response = client.post("/api/v1/auth/logout/all", headers=bearer(tokens[1]))
+
+    assert response.status_code == status.HTTP_200_OK
+    for token in tokens:
+        assert client.get("/api/v1/auth/me", headers=bearer(token)).status_code == status.HTTP_401_UNAUTHORIZED
+        response = client.post("/api/v1/auth/refresh", json={"refresh_token": token["refresh_token"]})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/api/v1/auth/me", headers=bearer(login(client))).status_code == status.HTTP_200_OK
+
+
+def test_refresh_adds_revocations_of_other_processes(
+    client: TestClient, db_session: Session, tokens: List[Dict[str, str]], revocations: RevocationList
+):
+    """Test that revocations written by another process apply after the next refresh."""
+    db = SyncSessionAdapter(db_session)
+    asyncio.run(revocations.refresh(db))
+    claims = user_auth.validate_access_token(tokens[0]["access_token"])
+    user = db_session.query(User).one()
+    now = datetime.now(timezone.utc)
+    db_session.add(
+        RevokedToken(jti=uuid.UUID(claims["jti"]), user_id=user.id, revoked_at=now, expires_at=now + timedelta(hours=1))
+    )
+    db_session.commit()
+
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens[0])).status_code == status.HTTP_200_OK
+    asyncio.run(revocations.refresh(db))
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens[0])).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get("/api/v1/auth/me", headers=bearer(tokens[1])).status_code == status.HTTP_200_OK
+
+
+def test_rebuild_drops_expired_revocations(db_session: Session, tokens: List[Dict[str, str]]):
+    """Test that a rebuild deletes the revocations of tokens that have expired."""
+    user = db_session.query(User).one()
+    now = datetime.now(timezone.utc)
+    db_session.add(RevokedToken(jti=uuid.uuid4(), user_id=user.id, revoked_at=now, expires_at=now - timedelta(hours=1)))
+    db_session.add(RevokedToken(jti=uuid.uuid4(), user_id=user.id, revoked_at=now, expires_at=now + timedelta(hours=1)))
+    db_session.commit()
+
+    revocation_list = RevocationList(1000, 0.01, timedelta(minutes=30), refresh_interval=1, rebuild_interval=3600)
+    asyncio.run(revocation_list.refresh(SyncSessionAdapter(db_session)))
+
+    assert db_session.query(RevokedToken).count() == 1
+
+
+def test_filter_miss_does_not_query(revocations: RevocationList):
+    """Test that a token missing from the filter is accepted without touching the database."""
+    claims = {"uid": str(uuid.uuid4()), "jti": str(uuid.uuid4()), "iat": 0}
+
+    assert not asyncio.run(revocations.is_revoked(object(), claims))
+    assert revocations.confirmations == 0
+
+
+def test_filter_hit_is_confirmed(db_session: Session, revocations: RevocationList):
+    """Test that a false positive of the filter is confirmed against the database."""
+    jti = str(uuid.uuid4())
+    revocations.filter.add(jti.encode())
+
+    assert not asyncio.run(revocations.is_revoked(SyncSessionAdapter(db_session), {"jti": jti, "iat": 0}))
+    assert revocations.confirmations == 1
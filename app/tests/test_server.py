@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core import settings
+from app.server import default_workers
+from app.server import server_options
+
+
+def test_default_workers(monkeypatch: pytest.MonkeyPatch):
+    """Test that workers default to the CPU count unless WEB_CONCURRENCY is set."""
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert default_workers() == (os.cpu_count() or 1)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert default_workers() == 3
+
+
+def test_server_options():
+    """Test that the server runs uvicorn workers with the configured count."""
+    options = server_options(workers=4)
+
+    assert options["workers"] == 4
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert callable(options["post_fork"])
+    assert options["forwarded_allow_ips"] == settings.FORWARDED_ALLOW_IPS
+
+
+def test_pools_are_split_between_workers():
+    """Test that the configured pool sizes are shared by all worker processes."""
+    script = "from app.core import settings; print(settings.SQLALCHEMY_POOL_SIZE, settings.SQLALCHEMY_MAX_OVERFLOW)"
+    env = {**os.environ, "WEB_CONCURRENCY": "4", "SQLALCHEMY_POOL_SIZE": "20", "SQLALCHEMY_MAX_OVERFLOW": "80"}
+
+    output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, check=True, text=True)
+
+    assert output.stdout.split() == ["5", "20"]
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+
+from app.api.errors import InvalidTokenException
+from app.core.auth import TokenHandler
+from app.core.auth import user_auth
+from app.core.cache import TTLCache
+from app.core.keys import KeyRing
+from app.models import User
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_lru_eviction_and_expiry():
+    """Test that the cache evicts the least recently used entry and honours expiry."""
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, expires_at=clock.now + 5)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    clock.now += 60
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 1, "size": 1}
+
+
+@pytest.fixture()
+def token_cache():
+    """Use a fresh verified-token cache for the test."""
+    user_auth.token_cache.clear()
+    yield user_auth.token_cache
+    user_auth.token_cache.clear()
+
+
+def test_validate_access_token_is_cached(token_cache: TTLCache):
+    """Test that a repeated token validation is answered from the cache."""
+    token = user_auth.create_access_token(User(username="test"))
+    hits = token_cache.hits
+
+    assert user_auth.validate_access_token(token)["sub"] == "test"
+    assert user_auth.validate_access_token(token)["sub"] == "test"
+    assert token_cache.hits == hits + 1
+
+
+def test_cached_token_is_not_returned_after_expiry(token_cache: TTLCache):
+    """Test that a cached token is rejected once its exp claim has passed."""
+    token = user_auth.create_access_token(User(username="test"), expires_delta=timedelta(seconds=-1))
+
+    with pytest.raises(InvalidTokenException):
+        user_auth.validate_access_token(token)
+    assert token_cache.stats()["size"] == 0
+
+
+def test_cached_token_is_not_returned_after_key_change(token_cache: TTLCache, monkeypatch: pytest.MonkeyPatch):
+    """Test that changing the signing key invalidates cached tokens."""
+    token = user_auth.create_access_token(User(username="test"))
+    user_auth.validate_access_token(token)
+
+    monkeypatch.setattr(TokenHandler, "key_ring", KeyRing.from_secret("another secret"))
+
+    with pytest.raises(InvalidTokenException):
+        user_auth.validate_access_token(token)
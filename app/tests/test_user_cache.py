@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+
+from sqlalchemy.orm import Session
+from starlette.testclient import TestClient
+
+from app.api.services.user_service import user_service
+from app.core.auth import user_auth
+from app.core.cache import TTLCache
+from app.core.kv_store import MemoryKeyValueStore
+from app.core.user_cache import UserCache
+from app.db.sync_adapter import SyncSessionAdapter
+from app.models import User
+
+
+class CountingSession:
+    """Session double that counts primary key lookups."""
+
+    def __init__(self, user: User):
+        self.user = user
+        self.lookups = 0
+        self.info = {}
+
+    async def get(self, entity, ident, **kwargs):  # pylint: disable=unused-argument
+        self.lookups += 1
+        return self.user if ident == self.user.id else None
+
+
+def test_retrieve_user_uses_identity_cache():
+    """Test that the user is looked up by primary key once and then answered from the cache."""
+    user = User(id=uuid.uuid4(), username="test", email="test@example.com", is_active=True, is_superuser=False)
+    token = user_auth.create_access_token(user)
+    db = CountingSession(user)
+
+    first = asyncio.run(user_auth.retrieve_user(db, token))
+    second = asyncio.run(user_auth.retrieve_user(db, token))
+
+    assert user_auth.validate_access_token(token)["uid"] == str(user.id)
+    assert first.id == second.id == user.id
+    assert db.lookups == 1
+
+
+def test_user_cache_falls_back_to_shared_store():
+    """Test that a worker with a cold local cache reads the user from the shared store."""
+    shared = MemoryKeyValueStore()
+    user = User(id=uuid.uuid4(), username="test", email="test@example.com", is_active=True, is_superuser=False)
+    writer = UserCache(local=TTLCache(maxsize=10, ttl=60), shared=shared, ttl=60)
+    reader = UserCache(local=TTLCache(maxsize=10, ttl=60), shared=shared, ttl=60)
+
+    asyncio.run(writer.set(user))
+    cached = asyncio.run(reader.get(user.id))
+    asyncio.run(writer.invalidate(user.id))
+
+    assert cached.username == "test"
+    assert reader.local.stats()["size"] == 1
+    assert asyncio.run(shared.get(f"user:{user.id}")) is None
+
+
+def test_deactivated_user_is_not_served_from_cache(client: TestClient, db_session: Session):
+    """Test that deactivating a user invalidates the cached identity."""
+    user = asyncio.run(
+        user_service.create_user(
+            SyncSessionAdapter(db_session),
+            {
+                "username": "test",
+                "email": "test@example.com",
+                "password": "password",
+                "first_name": "T",
+                "last_name": "U",
+            },
+        )
+    )
+    headers = {"Authorization": f"Bearer {user_auth.create_access_token(user)}"}
+    assert client.get("/api/v1/auth/me", headers=headers).json()["is_active"] is True
+
+    asyncio.run(user_service.deactivate_user(SyncSessionAdapter(db_session), user))
+
+    assert client.get("/api/v1/auth/me", headers=headers).json()["is_active"] is False
+
+
+def test_update_cached_user(db_session: Session):
+    """Test that a user answered from the identity cache is updated in place rather than inserted again."""
+    user = User(username="test", email="test@example.com", is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    cache = UserCache(local=TTLCache(maxsize=10, ttl=60), shared=None, ttl=60)
+    asyncio.run(cache.set(user))
+    cached = asyncio.run(cache.get(user.id))
+    db_session.expunge_all()
+
+    updated = asyncio.run(user_service.update_user(SyncSessionAdapter(db_session), cached, {"first_name": "Cached"}))
+
+    assert updated.id == user.id
+    assert db_session.query(User).one().first_name == "Cached"
@@ -0,0 +1,44 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.api.errors import SignCountException
+from app.db.sync_adapter import SyncSessionAdapter
+from app.models import User
+from app.models import UserCredential
+
+
+@pytest.fixture()
+def user_credential(db_session: Session) -> UserCredential:
+    """Create a user with a single credential."""
+    user = User(id=uuid.uuid4(), username="test", email="test@example.com")
+    credential = UserCredential(user_id=user.id, public_key=b"public key", credential_id=b"credential id")
+    db_session.add_all([user, credential])
+    db_session.commit()
+    return credential
+
+
+def test_credential_id_hash_is_set(user_credential: UserCredential):
+    """Test that the credential ID digest is filled in on insert."""
+    assert user_credential.credential_id_hash == UserCredential.hash_credential_id(b"credential id")
+
+
+def test_update_sign_count(db_session: Session, user_credential: UserCredential):
+    """Test that the sign count advances and a replayed count is rejected."""
+    db = SyncSessionAdapter(db_session)
+
+    asyncio.run(user_credential.update_sign_count(db, 5))
+    with pytest.raises(SignCountException):
+        asyncio.run(user_credential.update_sign_count(db, 5))
+
+    db_session.expire_all()
+    assert user_credential.sign_count == 5
+
+
+def test_update_sign_count_without_counter(db_session: Session, user_credential: UserCredential):
+    """Test that authenticators without a counter keep reporting 0."""
+    asyncio.run(user_credential.update_sign_count(SyncSessionAdapter(db_session), 0))
+
+    assert user_credential.sign_count == 0
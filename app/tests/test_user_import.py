@@ -0,0 +1,67 @@
+import json
+from typing import Dict
+
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.core.auth import user_auth
+from app.models import User
+
+
+def test_import_users(client: TestClient, db_session: Session, superuser_headers: Dict[str, str]):
+    """Test that valid records are created and conflicting or invalid ones are reported per line."""
+    records = [
+        {"username": "first", "email": "first@example.com", "password": "password"},
+        {"username": "admin", "email": "other@example.com", "password": "password"},
+        {"username": "second", "email": "not an email", "password": "password"},
+        {"username": "third", "email": "third@example.com", "password": "password", "first_name": "Third"},
+    ]
+    body = "\n".join(json.dumps(record) for record in records[:2]) + "\n{broken\n"
+    body += "\n".join(json.dumps(record) for record in records[2:]) + "\n"
+
+    response = client.post("/api/v1/admin/users/import", headers=superuser_headers, content=body)
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["processed"] == 5
+    assert report["created"] == 2
+    assert [conflict["line"] for conflict in report["conflicts"]] == [2]
+    assert [row["line"] for row in report["invalid"]] == [3, 4]
+    third = db_session.query(User).filter(User.username == "third").one()
+    assert third.first_name == "Third"
+    assert user_auth.crypt_context.verify("password", third.hashed_password)
+
+
+def test_import_users_reports_duplicates_within_batch(
+    client: TestClient, db_session: Session, superuser_headers: Dict[str, str]
+):
+    """Test that a record repeating the username or email of an earlier line of the same batch is reported."""
+    records = [
+        {"username": "first", "email": "first@example.com", "password": "password"},
+        {"username": "first", "email": "other@example.com", "password": "password"},
+        {"username": "second", "email": "first@example.com", "password": "password"},
+    ]
+    body = "\n".join(json.dumps(record) for record in records) + "\n"
+
+    response = client.post("/api/v1/admin/users/import", headers=superuser_headers, content=body)
+
+    report = response.json()
+    assert report["created"] == 1
+    assert [conflict["line"] for conflict in report["conflicts"]] == [2, 3]
+    assert db_session.query(User).filter(User.username != "admin").one().email == "first@example.com"
+
+
+def test_import_users_requires_superuser(client: TestClient, db_session: Session):
+    """Test that only superusers may import users."""
+    user = User(username="test", email="test@example.com", is_active=True, is_superuser=False)
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post(
+        "/api/v1/admin/users/import",
+        headers={"Authorization": f"Bearer {user_auth.create_access_token(user)}"},
+        content=b"",
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
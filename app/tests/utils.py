@@ -0,0 +1,7 @@
+import pytest
+
+from app.db.test_session import test_engine
+
+requires_postgres = pytest.mark.skipif(
+    test_engine.dialect.name != "postgresql", reason="needs TEST_DATABASE_URL to point at Postgres"
+)